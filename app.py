@@ -1,7 +1,9 @@
 import os
-from dash import Dash, html, dcc
+from functools import partial
+
+import diskcache
+from dash import Dash, DiskcacheManager, html, dcc
 import dash_bootstrap_components as dbc
-from bertopic import BERTopic
 
 # Importing callback functions
 from callbacks.callbacks_cluster import register_callbacks_for_cluster
@@ -9,22 +11,45 @@ from callbacks.callbacks_entity import register_callbacks_for_entity
 from callbacks.tabs_callbacks import register_tabs_callbacks
 from callbacks.routing_callbacks import register_page_routing_callbacks
 
-# Importing data processing functions
-from data_cleaning.data_loader import get_data
+# Importing the artifacts loader
+from pipeline.artifacts import load_artifacts
+from pipeline.topic_index import get_topic_result
+from utils.constants import BACKGROUND_CALLBACKS_DIR
+from utils.filter_index import FilterIndex
+from utils.topic_service import serve_topic_results
+
+# Load the data and aggregations precomputed by `python -m pipeline build`;
+# nothing is preprocessed in the web process
+artifacts = load_artifacts()
+df, min_year, max_year = (
+    artifacts["tenders"],
+    artifacts["min_year"],
+    artifacts["max_year"],
+)
+
+# Row positions of the tenders per filter value, shared by every callback's selections
+filter_index = FilterIndex(df)
 
-# Load data and prepare data
-df, min_year, max_year = get_data()
+# Background callbacks (topic fits) run as separate processes queued on a local disk
+# cache. They request their fits from this process, which runs them on its worker pool
+# and memoizes the results per selection and artifacts version
+background_callback_manager = DiskcacheManager(
+    diskcache.Cache(BACKGROUND_CALLBACKS_DIR)
+)
+serve_topic_results(partial(get_topic_result, filter_index, artifacts))
 
 # Initialize Dash app
 """
 The Dash app is initialized with:
 - suppress_callback_exceptions=True: Allows dynamic callback registration.
 - Bootstrap for styling using external_stylesheets from dash_bootstrap_components.
+- background_callback_manager: Runs the long topic modelling callbacks in the background.
 """
 app = Dash(
     __name__,
     suppress_callback_exceptions=True,
     external_stylesheets=[dbc.themes.BOOTSTRAP],
+    background_callback_manager=background_callback_manager,
 )
 app.title = "Public Tender Analysis Dashboard - Nova Scotia"
 
@@ -36,19 +61,16 @@ app.layout = html.Div(
     ]
 )
 
-# Initialize BERTopic model (lazy-loading might be considered for performance optimization)
-topic_model = BERTopic()
-
 # Register callbacks
 register_page_routing_callbacks(app)  # Callbacks for page routing are registered here
 register_tabs_callbacks(
-    app, df, min_year, max_year
+    app, df, min_year, max_year, artifacts["summary"]
 )  # Callbacks for tabs are registered here
 register_callbacks_for_cluster(
-    app, df, topic_model
+    app, df, artifacts, filter_index
 )  # Callbacks for clustering are registered here
 register_callbacks_for_entity(
-    app, df, topic_model
+    app, df, artifacts, filter_index
 )  # Callbacks for entity analysis are registered here
 
 # Run app in debug mode (toggle for production using an environment variable)
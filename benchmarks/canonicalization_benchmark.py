@@ -0,0 +1,70 @@
+"""
+Benchmark the compiled vendor/entity canonicalization against Series.replace.
+
+Run from the repository root:
+    python -m benchmarks.canonicalization_benchmark [--data FILE]
+
+Both the raw VENDOR and ENTITY columns of the export are canonicalized with the
+previous Series.replace(mapping) call and with canonicalize(); the benchmark checks
+that the outputs are identical and reports the time of each, including loading the
+mappings (text parsing versus the compiled artifact).
+"""
+
+import argparse
+import time
+
+import pandas as pd
+
+from data_cleaning.canonicalization import (
+    MAPPING_FILEPATHS,
+    canonicalize,
+    load_canonical_mappings,
+    load_mapping,
+    process_mapping,
+)
+from data_cleaning.data_loader import latest_snapshot_filepath, load_data
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--data", default=None, help="Tender CSV file.")
+    args = parser.parse_args()
+
+    raw_df = load_data(args.data or latest_snapshot_filepath())
+    print(f"Rows: {len(raw_df)}\n")
+
+    start = time.perf_counter()
+    parsed = {
+        column: process_mapping(load_mapping(filepath), column, column)
+        for column, filepath in MAPPING_FILEPATHS.items()
+    }
+    parse_seconds = time.perf_counter() - start
+
+    # Build the artifact first so the timed load reads it instead of compiling
+    load_canonical_mappings()
+    start = time.perf_counter()
+    compiled = load_canonical_mappings()
+    load_seconds = time.perf_counter() - start
+
+    print(f"{'':22}{'replace (s)':>13}{'canonicalize (s)':>18}{'identical':>11}")
+    print(f"{'Load mappings':22}{parse_seconds:13.3f}{load_seconds:18.3f}")
+    for column in MAPPING_FILEPATHS:
+        values = raw_df[column]
+
+        start = time.perf_counter()
+        replaced = values.replace(parsed[column])
+        replace_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        canonical = canonicalize(values, compiled[column])
+        canonical_seconds = time.perf_counter() - start
+
+        identical = replaced.equals(canonical) and parsed[column] == compiled[column]
+        print(
+            f"{column:22}{replace_seconds:13.3f}{canonical_seconds:18.3f}"
+            f"{str(identical):>11}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Compare memory use and callback latency of categorical versus string name columns.
+
+Run from the repository root:
+    python -m benchmarks.categorical_benchmark [--data FILE] [--repeat N]
+
+The processed DataFrame is loaded once by get_data, which stores the entity, vendor
+and cluster name columns as categoricals. A copy with those columns converted back to
+Python strings stands in for the previous loader. The dashboard callbacks are
+registered on a throwaway Dash app for each frame and called directly with the most
+frequent cluster and entity selected. The overview figures and the tender cube the
+charts are drawn from are prepared from each frame, as `python -m pipeline build`
+would, and so is the filter index the callbacks select tenders with.
+"""
+
+import argparse
+import time
+
+import pandas as pd
+from dash import Dash
+
+from callbacks.callbacks_cluster import register_callbacks_for_cluster
+from callbacks.callbacks_entity import register_callbacks_for_entity
+from data_cleaning.data_loader import get_data, latest_snapshot_filepath
+from data_cleaning.data_preprocess import CATEGORICAL_COLUMNS
+from pipeline.aggregations import (
+    build_tender_cube,
+    prepare_overview_aggregates,
+    prepare_overview_figures,
+)
+from utils.filter_index import FilterIndex
+
+# Callbacks timed by the benchmark, keyed by one of their outputs
+TIMED_CALLBACKS = {
+    "Entity/cluster-year line charts": "entity-year-average-amount.figure",
+    "Cluster filter messages": "filter-message-warning-cluster.children",
+    "Cluster entity list": "entity-list-cluster.children",
+    "Cluster bar charts": "tender-frequency-count-cluster.figure",
+    "Entity dropdown options": "entity-dropdown.options",
+    "Entity filter messages": "filter-message-warning.children",
+    "Entity bar charts": "tender-frequency-count.figure",
+}
+
+
+def registered_callbacks(df: pd.DataFrame) -> dict:
+    """Register the cluster and entity callbacks for a DataFrame and return them by output."""
+    app = Dash(__name__)
+    aggregates = prepare_overview_aggregates(df)
+    artifacts = {
+        **aggregates,
+        "overview_figures": prepare_overview_figures(aggregates),
+        "tender_cube": build_tender_cube(df),
+    }
+    filter_index = FilterIndex(df)
+    register_callbacks_for_cluster(app, df, artifacts, filter_index)
+    register_callbacks_for_entity(app, df, artifacts, filter_index)
+    callbacks = {}
+    for key, callback in app.callback_map.items():
+        # Dash wraps the callback function; __wrapped__ is the function as written
+        for output in key.strip(".").split("..."):
+            callbacks[output] = callback["callback"].__wrapped__
+    return callbacks
+
+
+def median_milliseconds(function, args: tuple, repeat: int) -> float:
+    """Run a function several times and return its median wall time in milliseconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(*args)
+        timings.append(time.perf_counter() - start)
+    return pd.Series(timings).median() * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--data", default=None, help="Tender CSV file.")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per callback.")
+    args = parser.parse_args()
+
+    categorical_df, min_year, max_year = get_data(
+        args.data or latest_snapshot_filepath()
+    )
+    string_df = categorical_df.copy()
+    for column in CATEGORICAL_COLUMNS:
+        string_df[column] = string_df[column].astype(object)
+
+    cluster = categorical_df["ENTITY_CLUSTER_NAME"].value_counts().index[0]
+    entity = categorical_df["ENTITY"].value_counts().index[0]
+    filters, data_count, years = ["GOODS"], 10, [min_year, max_year]
+    callback_args = {
+        "Entity/cluster-year line charts": (None, None, None),
+        "Cluster filter messages": (cluster, filters, data_count),
+        "Cluster entity list": (cluster,),
+        "Cluster bar charts": (cluster, filters, data_count, years),
+        "Entity dropdown options": (cluster,),
+        "Entity filter messages": (entity, filters, data_count),
+        "Entity bar charts": (entity, filters, data_count, years),
+    }
+
+    print(f"Rows: {len(categorical_df)}  cluster: {cluster}  entity: {entity}\n")
+
+    print(f"{'Memory (MB)':34}{'strings':>10}{'categorical':>13}")
+    for column in CATEGORICAL_COLUMNS + ["Whole DataFrame"]:
+        if column in CATEGORICAL_COLUMNS:
+            before = string_df[column].memory_usage(deep=True, index=False)
+            after = categorical_df[column].memory_usage(deep=True, index=False)
+        else:
+            before = string_df.memory_usage(deep=True).sum()
+            after = categorical_df.memory_usage(deep=True).sum()
+        print(f"{column:34}{before / 1e6:10.1f}{after / 1e6:13.1f}")
+
+    string_callbacks = registered_callbacks(string_df)
+    categorical_callbacks = registered_callbacks(categorical_df)
+
+    print(f"\n{'Callback latency (ms, median)':34}{'strings':>10}{'categorical':>13}")
+    for name, output in TIMED_CALLBACKS.items():
+        before = median_milliseconds(
+            string_callbacks[output], callback_args[name], args.repeat
+        )
+        after = median_milliseconds(
+            categorical_callbacks[output], callback_args[name], args.repeat
+        )
+        print(f"{name:34}{before:10.1f}{after:13.1f}")
+
+
+if __name__ == "__main__":
+    main()
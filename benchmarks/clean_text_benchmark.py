@@ -0,0 +1,79 @@
+"""
+Benchmark the batch description cleaner against the original row-by-row clean_text.
+
+Run from the repository root:
+    python -m benchmarks.clean_text_benchmark [--rows N]
+
+The legacy implementation below is a verbatim copy of the former
+data_preprocess.clean_text; the benchmark checks that both produce identical
+tokens on the dataset and reports rows/second for each.
+"""
+
+import argparse
+import re
+import string
+import time
+
+import nltk
+import pandas as pd
+
+from data_cleaning.text_cleaning import clean_texts
+from utils.constants import DATA_FILEPATH
+
+
+def legacy_clean_text(text: str) -> str:
+    """Row-by-row clean_text as it was before the batch rewrite."""
+    text = str(text)
+    text = text.lower()
+    text = re.sub(r"@\S+", "", text)
+    text = re.sub(r"http\S+", "", text)
+    text = re.sub(r"[^a-zA-Z+']", " ", text)
+    text = re.sub(r"\s+[a-zA-Z]\s+", " ", text + " ")
+    text = "".join([i for i in text if i not in string.punctuation])
+    words = nltk.tokenize.word_tokenize(text)
+    stopwords = nltk.corpus.stopwords.words("english")
+    text = " ".join([i for i in words if i not in stopwords and len(i) > 2])
+    text = re.sub(r"\s+", " ", text).strip()
+    return text
+
+
+def load_descriptions(filepath: str, rows: int = None) -> pd.Series:
+    """Load descriptions exactly as get_preprocessed_data feeds them to the cleaner."""
+    descriptions = pd.read_csv(filepath, usecols=["TENDER_DESCRIPTION"], nrows=rows)
+    return descriptions["TENDER_DESCRIPTION"].fillna("").str.lower().fillna("")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--data", default=DATA_FILEPATH, help="Tender CSV file.")
+    parser.add_argument("--rows", type=int, default=None, help="Limit rows read.")
+    args = parser.parse_args()
+
+    descriptions = load_descriptions(args.data, args.rows)
+    row_count = len(descriptions)
+
+    start = time.perf_counter()
+    legacy = descriptions.apply(legacy_clean_text)
+    legacy_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    batch = clean_texts(descriptions)
+    batch_seconds = time.perf_counter() - start
+
+    mismatches = (legacy.str.split() != batch.str.split()).sum()
+
+    print(f"Rows:              {row_count}")
+    print(
+        f"Legacy clean_text: {legacy_seconds:8.2f}s  "
+        f"{row_count / legacy_seconds:12,.0f} rows/s"
+    )
+    print(
+        f"Batch clean_texts: {batch_seconds:8.2f}s  "
+        f"{row_count / batch_seconds:12,.0f} rows/s"
+    )
+    print(f"Speedup:           {legacy_seconds / batch_seconds:8.1f}x")
+    print(f"Token mismatches:  {mismatches}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Measure the latency of on-demand topic fits against the topic latency target.
+
+Run from the repository root:
+    python -m benchmarks.topic_latency_benchmark [--data FILE] [--requests N]
+        [--target SECONDS] [--workers N]
+
+Cluster and entity selections under every category filter selection are drawn at
+random, larger selections more often, and fitted one after another on a freshly
+started TopicService with the dashboard's fit latency target (TOPIC_LATENCY_TARGET
+less TOPIC_LATENCY_OVERHEAD), as the dashboard fits selections the topic index has no
+entry for. Each latency is measured from submission to result, so the first fit of a
+worker includes loading its model and stores. The fit time estimate shared through
+the disk cache is reported before and after the run.
+"""
+
+import argparse
+import time
+
+import diskcache
+import numpy as np
+import pandas as pd
+
+from data_cleaning.data_loader import get_data, latest_snapshot_filepath
+from pipeline.aggregations import FILTER_COMBINATIONS
+from pipeline.topic_index import TOPIC_SCOPES
+from utils.constants import (
+    BACKGROUND_CALLBACKS_DIR,
+    TOPIC_LATENCY_OVERHEAD,
+    TOPIC_LATENCY_TARGET,
+)
+from utils.filter_index import FilterIndex
+from utils.topic_service import FitTimeEstimate, TopicService
+
+
+def draw_selections(filter_index: FilterIndex, requests: int) -> list:
+    """Draw selections at random with probability proportional to their size."""
+    selections, sizes = [], []
+    for scope, column in TOPIC_SCOPES.items():
+        for name in filter_index.df[column].unique():
+            for combination in FILTER_COMBINATIONS:
+                size = len(
+                    filter_index.positions(**{scope: name}, categories=combination)
+                )
+                if size:
+                    selections.append((scope, name, list(combination)))
+                    sizes.append(size)
+    sizes = np.array(sizes, dtype=float)
+    drawn = np.random.default_rng(0).choice(
+        len(selections), size=requests, p=sizes / sizes.sum()
+    )
+    return [selections[i] for i in drawn]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--data", default=None, help="Tender CSV file.")
+    parser.add_argument("--requests", type=int, default=40, help="Fits to time.")
+    parser.add_argument(
+        "--target",
+        type=float,
+        default=TOPIC_LATENCY_TARGET - TOPIC_LATENCY_OVERHEAD,
+        help="Fit latency target in seconds.",
+    )
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes.")
+    args = parser.parse_args()
+
+    df, _, _ = get_data(args.data or latest_snapshot_filepath())
+    filter_index = FilterIndex(df)
+    estimate = FitTimeEstimate(diskcache.Cache(BACKGROUND_CALLBACKS_DIR))
+    print(f"Rows: {len(df)}  latency target: {args.target:.1f} s")
+    print(f"Fit time estimate before: {estimate.seconds_per_document() * 1000:.2f} ms")
+
+    rows = []
+    with TopicService(args.workers, latency_target=args.target) as service:
+        for scope, name, filters in draw_selections(filter_index, args.requests):
+            selection_df = filter_index.select(**{scope: name}, categories=filters)
+            start = time.perf_counter()
+            result = service.fit(selection_df)
+            rows.append(
+                {
+                    "tenders": len(selection_df),
+                    "fitted": result.get("sample_size", len(selection_df)),
+                    "status": result["status"],
+                    "seconds": time.perf_counter() - start,
+                }
+            )
+
+    latencies = pd.DataFrame(rows)
+    seconds = latencies["seconds"]
+    print(f"Fit time estimate after: {estimate.seconds_per_document() * 1000:.2f} ms")
+    print(
+        f"\n{len(latencies)} fits of {latencies['tenders'].min()}-"
+        f"{latencies['tenders'].max()} tenders, "
+        f"{(latencies['fitted'] < latencies['tenders']).sum()} on a sample"
+    )
+    print(f"First fit (cold worker): {seconds.iloc[0]:.2f} s")
+    print(
+        f"Latency p50 {seconds.quantile(0.5):.2f} s  p95 {seconds.quantile(0.95):.2f} s"
+        f"  max {seconds.max():.2f} s"
+    )
+    print(f"Within target: {(seconds <= args.target).mean():.0%}")
+
+
+if __name__ == "__main__":
+    main()
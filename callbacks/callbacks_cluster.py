@@ -1,19 +1,38 @@
-import pandas as pd
 import dash
 import plotly.graph_objects as go
-import plotly.express as px
 from dash import html, Input, Output, State
 
-from utils.error_handling import return_empty_plot
+from pipeline.aggregations import (
+    apply_category_filters,
+    cube_ranges,
+    lookup_term_frequencies,
+    prepare_year_award_bars,
+    roll_up_vendors,
+)
+from pipeline.topic_index import get_topic_result
+from utils.topic_service import request_topic_result
+from utils.constants import TOPIC_JOB_POLL_INTERVAL
+from utils.error_handling import return_busy_plot, return_empty_plot
+from utils.topic_model import (
+    TOPICS_BUSY,
+    TOPICS_FAILED,
+    TOPICS_TOO_FEW,
+    topic_keyword_labels,
+    topic_word_cloud_text,
+)
 from visualizations.tender_frequency import create_tender_frequency_bar_chart
 from visualizations.topic_time_visualization import create_topic_time_visualization
 from visualizations.vendor_or_entity_vs_awarded_amounts import (
     create_awarded_amount_vs_vendor_or_entity_bar_chart,
 )
-from visualizations.wordcloud import create_word_cloud
+from visualizations.wordcloud import (
+    create_word_cloud,
+    create_word_cloud_from_frequencies,
+)
 from visualizations.year_vs_awarded_amount import (
     create_year_vs_awarded_amount_bar_chart,
 )
+from visualizations.overview_line_charts import create_entity_year_avg_chart
 from visualizations.messages_entity_analysis import (
     generate_filter_message,
     generate_vendor_frequency_message,
@@ -24,55 +43,33 @@ from visualizations.messages_entity_analysis import (
 )
 
 
-def register_callbacks_for_cluster(app, df, topic_model):
+def register_callbacks_for_cluster(app, df, artifacts, filter_index):
     """
     Registers callbacks to update various plots for descriptive analysis of awarded amounts.
     Includes Entity-Year and Cluster-Year visualizations for both average and cumulative amounts.
+    The figures of these plots and the word cloud frequencies are read from the
+    artifacts built by `python -m pipeline build`, and tenders are selected through the
+    filter index (utils.filter_index.FilterIndex) of df.
     """
 
-    def prepare_entity_year_avg(df):
-        """Prepares data for the Entity-Year Average Awarded Amount plot."""
-        # Grouping by entity and awarded year, calculating the mean of the awarded amount
-        data = (
-            df[["AWARDED_AMOUNT"]]
-            .groupby([df.ENTITY, df["AWARDED_DATE"].dt.year])
-            .mean()
-            .reset_index()
-        )
-        data.columns = ["ENTITY", "AWARDED_DATE", "AWARDED_AMOUNT"]
-        return data
-
-    def prepare_cluster_year_avg(df):
-        """Prepares data for the Cluster-Year Average Awarded Amount plot."""
-        # Grouping by entity cluster and awarded year, calculating the mean of the awarded amount
-        data = (
-            df[["AWARDED_AMOUNT"]]
-            .groupby([df.ENTITY_CLUSTER_NAME, df["AWARDED_DATE"].dt.year])
-            .mean()
-            .reset_index()
-        )
-        data.columns = ["ENTITY_CLUSTER_NAME", "AWARDED_DATE", "AWARDED_AMOUNT"]
-        return data
-
-    def prepare_cluster_year_cumulative(df):
-        """Prepares data for the Cluster-Year Cumulative Awarded Amount plot."""
-        # Grouping by entity cluster and awarded year, calculating the sum, then cumulative sum
-        data = (
-            df[["AWARDED_AMOUNT"]]
-            .groupby([df.ENTITY_CLUSTER_NAME, df["AWARDED_DATE"].dt.year])
-            .sum()
-            .groupby(level=0)
-            .cumsum()
-            .reset_index()
-        )
-        data.columns = ["ENTITY_CLUSTER_NAME", "AWARDED_DATE", "AWARDED_AMOUNT"]
-        return data
+    # Overview line charts of the current artifacts version, drawn once by the build
+    overview_figures = artifacts["overview_figures"]
+    # The Entity-Year chart draws the entities the build marked as charted (those with
+    # the largest total awarded amounts); the others can be added from a dropdown,
+    # listed by total awarded amount
+    entity_spend = artifacts["entity_spend"]
+    top_entities = entity_spend.loc[entity_spend["CHARTED"], "ENTITY"].tolist()
+    hidden_entity_options = [
+        {"label": entity, "value": entity}
+        for entity in entity_spend.loc[~entity_spend["CHARTED"], "ENTITY"]
+    ]
 
     @app.callback(
         [
             Output("entity-year-average-amount", "figure"),
             Output("cluster-year-average-amount", "figure"),
             Output("cluster-year-cumulative-amount", "figure"),
+            Output("entity-year-average-entities", "options"),
         ],
         [
             Input("entity-year-average-amount", "id"),
@@ -83,41 +80,32 @@ def register_callbacks_for_cluster(app, df, topic_model):
     def update_entity_tender_frequency(x, y, z):
         """
         Updates the visualizations for Entity-Year and Cluster-Year awarded amounts (both average and cumulative).
-        Each plot is generated using the respective data preparation functions.
+        The figures only depend on the data, so they are served as the figure JSON drawn once by the pipeline build.
         """
-
-        # Entity-Year Average Awarded Amount Plot
-        entity_year_avg = prepare_entity_year_avg(df)
-        fig_entity_avg = px.line(
-            entity_year_avg,
-            x="AWARDED_DATE",
-            y="AWARDED_AMOUNT",
-            color="ENTITY",
-            labels={"AWARDED_DATE": "TENDER DATE", "AWARDED_AMOUNT": "TENDER AMOUNT"},
-        )
-
-        # Cluster-Year Average Awarded Amount Plot
-        cluster_year_avg = prepare_cluster_year_avg(df)
-        fig_cluster_avg = px.line(
-            cluster_year_avg,
-            x="AWARDED_DATE",
-            y="AWARDED_AMOUNT",
-            color="ENTITY_CLUSTER_NAME",
-            labels={"AWARDED_DATE": "TENDER DATE", "AWARDED_AMOUNT": "TENDER AMOUNT"},
+        return (
+            overview_figures["entity_year_avg"],
+            overview_figures["cluster_year_avg"],
+            overview_figures["cluster_year_cumulative"],
+            hidden_entity_options,
         )
 
-        # Cluster-Year Cumulative Awarded Amount Plot
-        cluster_year_cumulative = prepare_cluster_year_cumulative(df)
-        fig_cluster_cum = px.line(
-            cluster_year_cumulative,
-            x="AWARDED_DATE",
-            y="AWARDED_AMOUNT",
-            color="ENTITY_CLUSTER_NAME",
-            labels={"AWARDED_DATE": "TENDER DATE", "AWARDED_AMOUNT": "TENDER AMOUNT"},
+    @app.callback(
+        Output("entity-year-average-amount", "figure", allow_duplicate=True),
+        Input("entity-year-average-entities", "value"),
+        prevent_initial_call=True,
+    )
+    def update_entity_year_average_entities(shown_entities):
+        """
+        Redraws the Entity-Year chart with the entities selected in the dropdown added as
+        lines, loading their data on demand; without a selection the figure drawn by the
+        pipeline build is served again.
+        """
+        if not shown_entities:
+            return overview_figures["entity_year_avg"]
+        return create_entity_year_avg_chart(
+            artifacts["entity_year_avg"], top_entities, shown_entities
         )
 
-        return fig_entity_avg, fig_cluster_avg, fig_cluster_cum
-
     """
     Registers Dash callbacks for updating cluster-related visualizations based on user input.
     Filters and processes data based on the selected cluster and other user inputs (filters, data count).
@@ -158,9 +146,6 @@ def register_callbacks_for_cluster(app, df, topic_model):
                 html.Span(),
             )
 
-        # Filter the DataFrame by the selected cluster
-        filtered_df = df[df["ENTITY_CLUSTER_NAME"] == selected_cluster]
-
         # If no filters are selected, return a default filter message
         if not selected_filters:
             return (
@@ -172,9 +157,10 @@ def register_callbacks_for_cluster(app, df, topic_model):
                 html.Span(),
             )
 
-        # Apply selected filters to the data
-        for filter_col in selected_filters:
-            filtered_df = filtered_df[filtered_df[filter_col] == 1]
+        # Select the tenders of the cluster with the selected filters
+        filtered_df = filter_index.select(
+            cluster=selected_cluster, categories=selected_filters
+        )
 
         # Count unique vendors in the filtered dataset
         unique_vendors_count = filtered_df["VENDOR"].nunique()
@@ -252,8 +238,8 @@ def register_callbacks_for_cluster(app, df, topic_model):
         topic_word_cloud_title = f"What are the key topics and frequently recurring themes in tender descriptions for the {selected_cluster} cluster, as identified through topic modeling?"
         topic_visualization_title = f"How have the topics in tender descriptions evolved over time for the {selected_cluster} cluster, and what trends or shifts can be identified?"
 
-        # Filter the DataFrame by the selected cluster
-        filtered_df = df[df["ENTITY_CLUSTER_NAME"] == selected_cluster]
+        # Select the tenders of the selected cluster
+        filtered_df = filter_index.select(cluster=selected_cluster)
 
         unique_entity_df = filtered_df.drop_duplicates(subset="ENTITY")
         entity_count = len(unique_entity_df)
@@ -289,7 +275,7 @@ def register_callbacks_for_cluster(app, df, topic_model):
         """
         if selected_cluster:
             # Filter the entities that belong to the selected cluster
-            entities_in_cluster = df[df["ENTITY_CLUSTER_NAME"] == selected_cluster][
+            entities_in_cluster = filter_index.select(cluster=selected_cluster)[
                 "ENTITY"
             ].unique()
 
@@ -302,6 +288,10 @@ def register_callbacks_for_cluster(app, df, topic_model):
             # Return None and hide the section if no cluster is selected
             return None, {"display": "none"}
 
+    # Cube cells of each cluster, rolled up into the vendor bar charts
+    tender_cube = artifacts["tender_cube"]
+    cell_ranges = cube_ranges(tender_cube, "ENTITY_CLUSTER_NAME")
+
     @app.callback(
         [
             Output("tender-frequency-count-cluster", "figure"),
@@ -329,95 +319,38 @@ def register_callbacks_for_cluster(app, df, topic_model):
         if not selected_cluster or not selected_filters or not selected_years:
             return go.Figure(), go.Figure(), go.Figure()
 
-        # Filter the dataframe based on the selected cluster
-        filtered_df = df[df["ENTITY_CLUSTER_NAME"] == selected_cluster]
-
-        # Apply selected filters to the data
-        for filter_col in selected_filters:
-            filtered_df = filtered_df[filtered_df[filter_col] == 1]
+        # Roll up the cube cells of the selection
+        cells = apply_category_filters(
+            tender_cube.iloc[cell_ranges.get(selected_cluster, slice(0, 0))],
+            selected_filters,
+        )
 
-        # Create the tender frequency bar chart
+        # Create the tender frequency and awarded amount vs vendor bar charts
         tender_frequency_figure = go.Figure()
-        if not filtered_df.empty:
-            # Count the frequency of tenders by vendor
-            tender_frequency = filtered_df["VENDOR"].value_counts().reset_index()
-            tender_frequency.columns = ["VENDOR", "FREQUENCY"]
+        awarded_amount_figure = go.Figure()
+        if not cells.empty:
+            tender_frequency, awarded_amount = roll_up_vendors(cells)
 
             # Create and assign the tender frequency chart
             tender_frequency_figure = create_tender_frequency_bar_chart(
                 tender_frequency, data_count, "VENDOR", "FREQUENCY"
             )
 
-        # Create the awarded amount vs vendor bar chart
-        awarded_amount_figure = go.Figure()
-        if not filtered_df.empty:
-            # Calculate total awarded amount by vendor
-            awarded_amount = (
-                filtered_df.groupby("VENDOR")["AWARDED_AMOUNT"].sum().reset_index()
-            )
-            awarded_amount = awarded_amount.sort_values(
-                by="AWARDED_AMOUNT", ascending=False
-            ).head(data_count)
-
             # Create and assign the awarded amount vs vendor chart
             awarded_amount_figure = create_awarded_amount_vs_vendor_or_entity_bar_chart(
-                awarded_amount, data_count, "VENDOR", "AWARDED_AMOUNT"
+                awarded_amount.head(data_count), data_count, "VENDOR", "AWARDED_AMOUNT"
             )
 
-        # Create the year vs awarded amount bar chart
+        # Create the year vs awarded amount bar chart, one bar per tender
         year_awarded_amount_figure = go.Figure()
-        if not filtered_df.empty:
-            # Filter data for the selected year range
-            filtered_df_year = filtered_df[
-                (filtered_df["TENDER_START_DATE"].dt.year >= selected_years[0])
-                & (filtered_df["TENDER_START_DATE"].dt.year <= selected_years[1])
-            ]
-
-            if not filtered_df_year.empty:
-                # Prepare data for tenders, including tender year and awarded amount
-                tender_data = filtered_df_year[
-                    [
-                        "TENDER_START_DATE",
-                        "AWARDED_AMOUNT",
-                        "VENDOR",
-                        "TENDER_ID",
-                        "ENTITY_CLUSTER_NAME",
-                    ]
-                ].dropna()
-
-                # Create a list to store tender data for each year
-                bar_data = []
-                for _, row in tender_data.iterrows():
-                    start_year = row["TENDER_START_DATE"].year
-                    bar_data.append(
-                        {
-                            "YEAR": start_year,
-                            "AWARDED_AMOUNT": row["AWARDED_AMOUNT"],
-                            "VENDOR": row["VENDOR"],
-                            "TENDER_ID": row["TENDER_ID"],
-                            "ENTITY_CLUSTER_NAME": row["ENTITY_CLUSTER_NAME"],
-                        }
-                    )
-
-                # Convert the list to a DataFrame
-                bar_df = pd.DataFrame(bar_data)
-
-                # Group by Year and Vendor, summing the awarded amounts
-                grouped_df = (
-                    bar_df.groupby(
-                        ["TENDER_ID", "YEAR", "VENDOR", "ENTITY_CLUSTER_NAME"]
-                    )["AWARDED_AMOUNT"]
-                    .sum()
-                    .reset_index()
-                )
-
-                # Sort by Vendor and Year
-                grouped_df = grouped_df.sort_values(
-                    by=["VENDOR", "YEAR"],
-                    key=lambda col: col.str.lower() if col.name == "VENDOR" else col,
-                )
-
-                # Create and assign the year vs awarded amount chart
+        if not cells.empty:
+            filtered_df = filter_index.select(
+                cluster=selected_cluster,
+                categories=selected_filters,
+                years=selected_years,
+            )
+            grouped_df = prepare_year_award_bars(filtered_df)
+            if not grouped_df.empty:
                 year_awarded_amount_figure = create_year_vs_awarded_amount_bar_chart(
                     grouped_df, "VENDOR"
                 )
@@ -462,7 +395,7 @@ def register_callbacks_for_cluster(app, df, topic_model):
         if triggered_id == "year-vs-awarded-amount-cluster" and bar_clickData:
             tender_id = bar_clickData["points"][0]["customdata"][0]
             # Filter the dataframe for the clicked year and vendor
-            selected_tender = df[df["TENDER_ID"] == tender_id]
+            selected_tender = filter_index.select(tender_id=tender_id)
 
             # If the selected tender exists, extract its details
             if not selected_tender.empty:
@@ -511,43 +444,23 @@ def register_callbacks_for_cluster(app, df, topic_model):
                 go.Figure()
             )  # Return an empty figure if no cluster or filters are selected
 
-        filtered_df = df[df["ENTITY_CLUSTER_NAME"] == selected_cluster]
-        for filter_col in selected_filters:
-            filtered_df = filtered_df[filtered_df[filter_col] == 1]
-
-        text = " ".join(filtered_df["TENDER_DESCRIPTION"])
+        # Word frequencies of the cluster's descriptions are precomputed per filter selection
+        frequencies = lookup_term_frequencies(
+            artifacts["cluster_term_frequencies"], selected_cluster, selected_filters
+        )
 
-        if not text.strip():  # Check if text is just whitespace
+        if not frequencies:  # Check if there are no descriptions to draw from
             return go.Figure()  # Return an empty figure if no valid text is available
 
-        return create_word_cloud(text)  # Generate the word cloud
+        return create_word_cloud_from_frequencies(frequencies)  # Generate the word cloud
 
-    @app.callback(
-        Output("topic-word-cloud-cluster", "figure"),
-        [
-            Input("cluster-dropdown", "value"),
-            Input("filter-checkbox-cluster", "value"),
-        ],
-    )
-    def update_topic_word_cloud(selected_cluster, selected_filters):
+    def topic_word_cloud_figure(topic_result):
         """
-        Updates the topic-based word cloud visualization, applying topic modeling (BERTopic) on tender descriptions.
-        Filters the data, performs topic modeling, and visualizes the most frequent words across topics.
+        Draws the topic-based word cloud from the topic model (BERTopic) of the tender descriptions,
+        visualizing the most frequent words across topics.
         """
-        if not selected_cluster or not selected_filters:
-            return (
-                go.Figure()
-            )  # Return an empty figure if no cluster or filters are selected
-
-        filtered_df = df[df["ENTITY_CLUSTER_NAME"] == selected_cluster]
-        for filter_col in selected_filters:
-            filtered_df = filtered_df[filtered_df[filter_col] == 1]
-
-        # Ensure there are enough samples for topic modeling
-        unique_descriptions = filtered_df["TENDER_DESCRIPTION"].dropna().unique()
-        if (
-            len(unique_descriptions) < 2
-        ):  # Minimum of two unique samples required for topic modeling
+        # Ensure there were enough samples for topic modeling
+        if topic_result["status"] == TOPICS_TOO_FEW:
             return go.Figure().update_layout(
                 annotations=[
                     {
@@ -563,23 +476,13 @@ def register_callbacks_for_cluster(app, df, topic_model):
                     }
                 ]
             )
-
-        # Try fitting the BERTopic model and handle potential errors
-        try:
-            topics, _ = topic_model.fit_transform(filtered_df["TENDER_DESCRIPTION"])
-            filtered_df["TOPIC"] = topics
-        except Exception as e:
+        if topic_result["status"] == TOPICS_FAILED:
             return return_empty_plot()
+        if topic_result["status"] == TOPICS_BUSY:
+            return return_busy_plot()
 
         # Collect the most frequent words across all topics
-        topic_nums = filtered_df["TOPIC"].unique()
-        words = []
-        for topic_num in topic_nums:
-            topic_words = topic_model.get_topic(topic_num)
-            if topic_words:  # Handle empty topics gracefully
-                words.extend(topic_words)
-
-        wordcloud_text = " ".join([word[0] for word in words])
+        wordcloud_text = topic_word_cloud_text(topic_result)
         if not wordcloud_text.strip():  # Check if text is just whitespace
             return go.Figure().update_layout(
                 annotations=[
@@ -599,32 +502,13 @@ def register_callbacks_for_cluster(app, df, topic_model):
 
         return create_word_cloud(wordcloud_text)  # Generate the word cloud for topics
 
-    @app.callback(
-        [
-            Output("topic-time-visualization-cluster", "figure"),
-            Output("topic-time-description-cluster", "children"),
-        ],
-        [
-            Input("cluster-dropdown", "value"),
-            Input("filter-checkbox-cluster", "value"),
-        ],
-    )
-    def update_topic_time_visualization(selected_cluster, selected_filters):
+    def topic_time_visualization(topic_result, selected_cluster):
         """
-        Updates the topic visualization over time (based on awarded year) for the selected cluster.
-        Ensures enough tender descriptions are present, fits a BERTopic model, and visualizes the topic distribution over time.
+        Draws the topic visualization over time (based on awarded year) for the selected cluster,
+        visualizing the topic distribution over time.
         """
-        if not selected_cluster or not selected_filters:
-            return go.Figure(), ""
-
-        # Filter dataframe based on the selected cluster and filters
-        filtered_df = df[df["ENTITY_CLUSTER_NAME"] == selected_cluster]
-        for filter_col in selected_filters:
-            filtered_df = filtered_df[filtered_df[filter_col] == 1]
-
-        # Ensure there are enough tender descriptions to proceed
-        unique_descriptions = filtered_df["TENDER_DESCRIPTION"].dropna().unique()
-        if len(unique_descriptions) < 2:  # Minimum of two unique descriptions required
+        # Ensure there were enough tender descriptions to proceed
+        if topic_result["status"] == TOPICS_TOO_FEW:
             return go.Figure().update_layout(
                 annotations=[
                     {
@@ -640,32 +524,113 @@ def register_callbacks_for_cluster(app, df, topic_model):
                     }
                 ]
             ), ""
-
-        # Extract the 'year' from the 'AWARDED_DATE'
-        filtered_df["AWARDED_YEAR"] = pd.to_datetime(
-            filtered_df["AWARDED_DATE"], errors="coerce"
-        ).dt.year
-
-        # Try fitting the BERTopic model and handle potential errors
-        try:
-            topics, _ = topic_model.fit_transform(filtered_df["TENDER_DESCRIPTION"])
-            filtered_df["TOPIC"] = topics
-        except Exception as e:
+        if topic_result["status"] == TOPICS_FAILED:
             return return_empty_plot(), ""
+        if topic_result["status"] == TOPICS_BUSY:
+            return return_busy_plot(), ""
+
+        # Topic occurrences by awarded year, with the keywords of each topic for display
+        topic_counts = topic_result["year_counts"]
+        topic_keywords = topic_keyword_labels(topic_result)
 
-        # Count topic occurrences by awarded year
-        topic_counts = (
-            filtered_df.groupby(["AWARDED_YEAR", "TOPIC"]).size().unstack(fill_value=0)
+        # Generate the topic-time visualization chart
+        topic_time_figure, topic_time_description = create_topic_time_visualization(
+            topic_counts, topic_keywords, selected_cluster, True
         )
 
-        # Prepare topic keywords for display
-        topic_keywords = {}
-        for topic_num in topic_counts.columns:
-            topic_keywords[topic_num] = ", ".join(
-                [word[0] for word in topic_model.get_topic(topic_num)]
+        # Report the sample a large selection was fitted on within the latency target
+        if "sample_size" in topic_result:
+            topic_time_description += (
+                f" Topics were fitted on a sample of {topic_result['sample_size']:,} of the "
+                f"{len(topic_result['topics']):,} tenders, stratified by awarded year and category; "
+                f"the remaining tenders were assigned to the closest topics."
             )
+        return topic_time_figure, topic_time_description
 
-        # Generate the topic-time visualization chart
-        return create_topic_time_visualization(
-            topic_counts, topic_keywords, selected_cluster, True
+    def draw_topic_visualizations(topic_result, selected_cluster):
+        """Draws the topic word cloud and the topic visualization over time from one topic model."""
+        topic_time_figure, topic_time_description = topic_time_visualization(
+            topic_result, selected_cluster
+        )
+        return (
+            topic_word_cloud_figure(topic_result),
+            topic_time_figure,
+            topic_time_description,
+        )
+
+    @app.callback(
+        [
+            Output("topic-word-cloud-cluster", "figure"),
+            Output("topic-time-visualization-cluster", "figure"),
+            Output("topic-time-description-cluster", "children"),
+            Output("topic-fit-request-cluster", "data"),
+        ],
+        [
+            Input("cluster-dropdown", "value"),
+            Input("filter-checkbox-cluster", "value"),
+        ],
+    )
+    def update_topic_visualizations(selected_cluster, selected_filters):
+        """
+        Updates the topic word cloud and the topic visualization over time for the selected cluster.
+        Topics that need no fit (topic index, global model, NMF/LDA backends, fits already made) are
+        drawn right away; a selection whose BERTopic model has to be fitted is handed to the
+        background job below.
+        """
+        if not selected_cluster or not selected_filters:
+            return go.Figure(), go.Figure(), "", dash.no_update
+
+        topic_result = get_topic_result(
+            filter_index,
+            artifacts,
+            "cluster",
+            selected_cluster,
+            selected_filters,
+            fit=False,
+        )
+        if topic_result is None:
+            fit_request = {"name": selected_cluster, "filters": selected_filters}
+            return go.Figure(), go.Figure(), "", fit_request
+        return (*draw_topic_visualizations(topic_result, selected_cluster), dash.no_update)
+
+    @app.callback(
+        [
+            Output("topic-word-cloud-cluster", "figure", allow_duplicate=True),
+            Output("topic-time-visualization-cluster", "figure", allow_duplicate=True),
+            Output("topic-time-description-cluster", "children", allow_duplicate=True),
+        ],
+        Input("topic-fit-request-cluster", "data"),
+        background=True,
+        interval=TOPIC_JOB_POLL_INTERVAL,
+        progress=[Output("topic-progress-cluster", "children")],
+        running=[
+            (
+                Output("topic-progress-cluster", "style"),
+                {"display": "block"},
+                {"display": "none"},
+            )
+        ],
+        cancel=[
+            Input("cluster-dropdown", "value"),
+            Input("filter-checkbox-cluster", "value"),
+            Input("url", "pathname"),
+        ],
+        prevent_initial_call=True,
+    )
+    def fit_topic_visualizations(set_progress, fit_request):
+        """
+        Draws the topic visualizations of a selection whose BERTopic model has to be fitted, as a
+        background job so no Flask worker thread waits for the fit. The fit itself runs on the
+        warm worker pool of the web process, which memoizes its result; the job reports progress
+        and is cancelled when the selection changes or the page is left.
+        """
+        tender_count = len(
+            filter_index.positions(
+                cluster=fit_request["name"], categories=fit_request["filters"]
+            )
+        )
+        set_progress((f"Fitting topics for {tender_count:,} tenders...",))
+        topic_result = request_topic_result(
+            "cluster", fit_request["name"], fit_request["filters"]
         )
+        return draw_topic_visualizations(topic_result, fit_request["name"])
@@ -1,9 +1,24 @@
-import pandas as pd
 import dash
 import plotly.graph_objects as go
 from dash import html, Input, Output, State
 
-from utils.error_handling import return_empty_plot
+from pipeline.aggregations import (
+    apply_category_filters,
+    cube_ranges,
+    prepare_year_award_bars,
+    roll_up_vendors,
+)
+from pipeline.topic_index import get_topic_result
+from utils.topic_service import request_topic_result
+from utils.constants import TOPIC_JOB_POLL_INTERVAL
+from utils.error_handling import return_busy_plot, return_empty_plot
+from utils.topic_model import (
+    TOPICS_BUSY,
+    TOPICS_FAILED,
+    TOPICS_TOO_FEW,
+    topic_keyword_labels,
+    topic_word_cloud_text,
+)
 from visualizations.tender_frequency import create_tender_frequency_bar_chart
 from visualizations.topic_time_visualization import create_topic_time_visualization
 from visualizations.vendor_or_entity_vs_awarded_amounts import (
@@ -22,10 +37,11 @@ from visualizations.messages_entity_analysis import (
 )
 
 
-def register_callbacks_for_entity(app, df, topic_model):
+def register_callbacks_for_entity(app, df, artifacts, filter_index):
     """
     Registers callbacks to update entity-related visualizations and messages.
     Includes filtering data based on selected entity and cluster, and generating related messages.
+    Tenders are selected through the filter index (utils.filter_index.FilterIndex) of df.
     """
 
     @app.callback(
@@ -38,7 +54,7 @@ def register_callbacks_for_entity(app, df, topic_model):
         If no cluster is selected, shows all entities.
         """
         if selected_cluster:
-            filtered_entities = df[df["ENTITY_CLUSTER_NAME"] == selected_cluster][
+            filtered_entities = filter_index.select(cluster=selected_cluster)[
                 "ENTITY"
             ].unique()
             return [{"label": entity, "value": entity} for entity in filtered_entities]
@@ -60,7 +76,7 @@ def register_callbacks_for_entity(app, df, topic_model):
         Provides relevant information based on whether entity and/or cluster are selected.
         """
         if selected_entity and selected_cluster:
-            filtered_df = df[df["ENTITY_CLUSTER_NAME"] == selected_cluster]
+            filtered_df = filter_index.select(cluster=selected_cluster)
             unique_entity_df = filtered_df.drop_duplicates(subset="ENTITY")
             entity_count = len(unique_entity_df)
 
@@ -70,10 +86,10 @@ def register_callbacks_for_entity(app, df, topic_model):
             )
         elif selected_entity and not selected_cluster:
             # Find the cluster for the selected entity
-            cluster_name = df.loc[
-                df["ENTITY"] == selected_entity, "ENTITY_CLUSTER_NAME"
+            cluster_name = filter_index.select(entity=selected_entity)[
+                "ENTITY_CLUSTER_NAME"
             ]
-            filtered_df = df[df["ENTITY_CLUSTER_NAME"] == cluster_name.iloc[0]]
+            filtered_df = filter_index.select(cluster=cluster_name.iloc[0])
             unique_entity_df = filtered_df.drop_duplicates(subset="ENTITY")
             entity_count = len(unique_entity_df)
 
@@ -85,7 +101,7 @@ def register_callbacks_for_entity(app, df, topic_model):
             else:
                 return "", ""
         elif selected_cluster and not selected_entity:
-            filtered_df = df[df["ENTITY_CLUSTER_NAME"] == selected_cluster]
+            filtered_df = filter_index.select(cluster=selected_cluster)
             unique_entity_df = filtered_df.drop_duplicates(subset="ENTITY")
             entity_count = len(unique_entity_df)
             return (
@@ -128,8 +144,6 @@ def register_callbacks_for_entity(app, df, topic_model):
                 html.Span(),
             )
 
-        filtered_df = df[df["ENTITY"] == selected_entity]
-
         if not selected_filters:
             return (
                 generate_filter_message(selected_filters, selected_entity),
@@ -139,8 +153,9 @@ def register_callbacks_for_entity(app, df, topic_model):
                 html.Span(),
             )
 
-        for filter_col in selected_filters:
-            filtered_df = filtered_df[filtered_df[filter_col] == 1]
+        filtered_df = filter_index.select(
+            entity=selected_entity, categories=selected_filters
+        )
 
         unique_vendors_count = filtered_df["VENDOR"].nunique()
 
@@ -210,6 +225,10 @@ def register_callbacks_for_entity(app, df, topic_model):
             topic_visualization_title,
         )
 
+    # Cube cells of each entity, rolled up into the vendor bar charts
+    tender_cube = artifacts["tender_cube"]
+    cell_ranges = cube_ranges(tender_cube, "ENTITY")
+
     @app.callback(
         [
             Output("tender-frequency-count", "figure"),
@@ -237,87 +256,38 @@ def register_callbacks_for_entity(app, df, topic_model):
         if not selected_entity or not selected_filters or not selected_years:
             return go.Figure(), go.Figure(), go.Figure()
 
-        # Filter the dataset based on the selected entity and filters
-        filtered_df = df[df["ENTITY"] == selected_entity]
-        for filter_col in selected_filters:
-            filtered_df = filtered_df[filtered_df[filter_col] == 1]
+        # Roll up the cube cells of the selection
+        cells = apply_category_filters(
+            tender_cube.iloc[cell_ranges.get(selected_entity, slice(0, 0))],
+            selected_filters,
+        )
 
-        # Create the tender frequency bar chart
+        # Create the tender frequency and awarded amount vs vendor bar charts
         tender_frequency_figure = go.Figure()
-        if not filtered_df.empty:
-            tender_frequency = filtered_df["VENDOR"].value_counts().reset_index()
-            tender_frequency.columns = ["VENDOR", "FREQUENCY"]
+        awarded_amount_figure = go.Figure()
+        if not cells.empty:
+            tender_frequency, awarded_amount = roll_up_vendors(cells)
+
+            # Create and assign the tender frequency chart
             tender_frequency_figure = create_tender_frequency_bar_chart(
                 tender_frequency, data_count, "VENDOR", "FREQUENCY"
             )
 
-        # Create the awarded amount vs vendor bar chart
-        awarded_amount_figure = go.Figure()
-        if not filtered_df.empty:
-            awarded_amount = (
-                filtered_df.groupby("VENDOR")["AWARDED_AMOUNT"].sum().reset_index()
-            )
-            awarded_amount = awarded_amount.sort_values(
-                by="AWARDED_AMOUNT", ascending=False
-            ).head(data_count)
+            # Create and assign the awarded amount vs vendor chart
             awarded_amount_figure = create_awarded_amount_vs_vendor_or_entity_bar_chart(
-                awarded_amount, data_count, "VENDOR", "AWARDED_AMOUNT"
+                awarded_amount.head(data_count), data_count, "VENDOR", "AWARDED_AMOUNT"
             )
 
-        # Create the year vs awarded amount bar chart
+        # Create the year vs awarded amount bar chart, one bar per tender
         year_awarded_amount_figure = go.Figure()
-        if not filtered_df.empty:
-            filtered_df_year = filtered_df[
-                (filtered_df["TENDER_START_DATE"].dt.year >= selected_years[0])
-                & (filtered_df["TENDER_START_DATE"].dt.year <= selected_years[1])
-            ]
-            if not filtered_df_year.empty:
-                # Prepare data for individual tenders
-                tender_data = filtered_df_year[
-                    [
-                        "TENDER_START_DATE",
-                        "AWARDED_AMOUNT",
-                        "VENDOR",
-                        "TENDER_ID",
-                        "ENTITY_CLUSTER_NAME",
-                    ]
-                ].dropna()
-
-                # Create a list to store bar data
-                bar_data = []
-
-                for _, row in tender_data.iterrows():
-                    start_year = row["TENDER_START_DATE"].year
-
-                    # Add the entire tender amount to the start year
-                    bar_data.append(
-                        {
-                            "YEAR": start_year,
-                            "AWARDED_AMOUNT": row["AWARDED_AMOUNT"],
-                            "VENDOR": row["VENDOR"],
-                            "TENDER_ID": row["TENDER_ID"],
-                            "ENTITY_CLUSTER_NAME": row["ENTITY_CLUSTER_NAME"],
-                        }
-                    )
-
-                # Convert to DataFrame
-                bar_df = pd.DataFrame(bar_data)
-
-                # Group by Year and Vendor, summing awarded amounts
-                grouped_df = (
-                    bar_df.groupby(
-                        ["TENDER_ID", "YEAR", "VENDOR", "ENTITY_CLUSTER_NAME"]
-                    )["AWARDED_AMOUNT"]
-                    .sum()
-                    .reset_index()
-                )
-
-                # Sort by Vendor and Year
-                grouped_df = grouped_df.sort_values(
-                    by=["VENDOR", "YEAR"],
-                    key=lambda col: col.str.lower() if col.name == "VENDOR" else col,
-                )
-
+        if not cells.empty:
+            filtered_df = filter_index.select(
+                entity=selected_entity,
+                categories=selected_filters,
+                years=selected_years,
+            )
+            grouped_df = prepare_year_award_bars(filtered_df)
+            if not grouped_df.empty:
                 year_awarded_amount_figure = create_year_vs_awarded_amount_bar_chart(
                     grouped_df, "VENDOR"
                 )
@@ -362,7 +332,7 @@ def register_callbacks_for_entity(app, df, topic_model):
             tender_id = bar_clickData["points"][0]["customdata"][0]
 
             # Filter the dataframe for the clicked year and vendor
-            selected_tender = df[df["TENDER_ID"] == tender_id]
+            selected_tender = filter_index.select(tender_id=tender_id)
 
             # If the selected tender exists, extract its details
             if not selected_tender.empty:
@@ -394,30 +364,13 @@ def register_callbacks_for_entity(app, df, topic_model):
         # If no valid clickData is present, or the modal is already open, return existing state
         return "", is_open, bar_clickData
 
-    @app.callback(
-        Output("topic-word-cloud", "figure"),
-        [
-            Input("entity-dropdown", "value"),
-            Input("filter-checkbox", "value"),
-        ],
-    )
-    def update_topic_word_cloud(selected_entity, selected_filters):
+    def topic_word_cloud_figure(topic_result):
         """
-        Updates the topic-based word cloud visualization based on the selected entity and filter criteria.
-        Filters the dataset by entity and selected filters, performs topic modeling, and generates a word cloud of topics.
+        Draws the topic-based word cloud from the topic model (BERTopic) of the tender descriptions,
+        visualizing the most frequent words across topics.
         """
-        if not selected_entity or not selected_filters:
-            return go.Figure()  # Return empty figure if no entity or filter is selected
-
-        filtered_df = df[df["ENTITY"] == selected_entity]
-        for filter_col in selected_filters:
-            filtered_df = filtered_df[
-                filtered_df[filter_col] == 1
-            ]  # Apply selected filters
-
-        # Ensure there are enough samples
-        unique_descriptions = filtered_df["TENDER_DESCRIPTION"].dropna().unique()
-        if len(unique_descriptions) < 2:  # Minimum of two unique descriptions required
+        # Ensure there were enough samples for topic modeling
+        if topic_result["status"] == TOPICS_TOO_FEW:
             return go.Figure().update_layout(
                 annotations=[
                     {
@@ -433,23 +386,13 @@ def register_callbacks_for_entity(app, df, topic_model):
                     }
                 ]
             )
-
-        # Try fitting the BERTopic model and handle potential errors
-        try:
-            topics, _ = topic_model.fit_transform(filtered_df["TENDER_DESCRIPTION"])
-            filtered_df["TOPIC"] = topics
-        except Exception as e:
+        if topic_result["status"] == TOPICS_FAILED:
             return return_empty_plot()
+        if topic_result["status"] == TOPICS_BUSY:
+            return return_busy_plot()
 
-        # Generate word cloud text based on the topics
-        topic_nums = filtered_df["TOPIC"].unique()
-        words = []
-        for topic_num in topic_nums:
-            topic_words = topic_model.get_topic(topic_num)
-            if topic_words:  # Handle empty topics gracefully
-                words.extend(topic_words)
-
-        wordcloud_text = " ".join([word[0] for word in words])
+        # Collect the most frequent words across all topics
+        wordcloud_text = topic_word_cloud_text(topic_result)
         if not wordcloud_text.strip():  # Check if text is just whitespace
             return go.Figure().update_layout(
                 annotations=[
@@ -467,38 +410,15 @@ def register_callbacks_for_entity(app, df, topic_model):
                 ]
             )
 
-        return create_word_cloud(wordcloud_text)
+        return create_word_cloud(wordcloud_text)  # Generate the word cloud for topics
 
-    @app.callback(
-        [
-            Output("topic-time-visualization", "figure"),
-            Output("topic-time-description", "children"),
-        ],
-        [
-            Input("entity-dropdown", "value"),
-            Input("filter-checkbox", "value"),
-        ],
-    )
-    def update_topic_time_visualization(selected_entity, selected_filters):
+    def topic_time_visualization(topic_result, selected_entity):
         """
-        Updates the visualization of topics over time (based on awarded year) for the selected entity.
-        Ensures there are enough tender descriptions and applies topic modeling to visualize topic distribution over time.
+        Draws the topic visualization over time (based on awarded year) for the selected entity,
+        visualizing the topic distribution over time.
         """
-
-        # Check if selected_entity and selected_filters are provided; return empty figure if not.
-        if not selected_entity or not selected_filters:
-            return go.Figure(), ""
-
-        # Filter the dataframe based on selected entity and filters
-        filtered_df = df[df["ENTITY"] == selected_entity]
-        for filter_col in selected_filters:
-            filtered_df = filtered_df[filtered_df[filter_col] == 1]
-
-        # Ensure there are enough tender descriptions to proceed
-        unique_descriptions = filtered_df["TENDER_DESCRIPTION"].dropna().unique()
-
-        # If there are fewer than 2 unique tender descriptions, return a message
-        if len(unique_descriptions) < 2:  # Minimum of two unique samples required
+        # Ensure there were enough tender descriptions to proceed
+        if topic_result["status"] == TOPICS_TOO_FEW:
             return go.Figure().update_layout(
                 annotations=[
                     {
@@ -514,32 +434,113 @@ def register_callbacks_for_entity(app, df, topic_model):
                     }
                 ]
             ), ""
-
-        # Extract the 'year' from 'AWARDED_DATE' to analyze topics over time
-        filtered_df["AWARDED_YEAR"] = pd.to_datetime(
-            filtered_df["AWARDED_DATE"], errors="coerce"
-        ).dt.year
-
-        # Try fitting the BERTopic model and handle potential errors
-        try:
-            topics, _ = topic_model.fit_transform(filtered_df["TENDER_DESCRIPTION"])
-            filtered_df["TOPIC"] = topics
-        except Exception as e:
+        if topic_result["status"] == TOPICS_FAILED:
             return return_empty_plot(), ""
+        if topic_result["status"] == TOPICS_BUSY:
+            return return_busy_plot(), ""
+
+        # Topic occurrences by awarded year, with the keywords of each topic for display
+        topic_counts = topic_result["year_counts"]
+        topic_keywords = topic_keyword_labels(topic_result)
 
-        # Group the data by awarded year and topic, and count occurrences
-        topic_counts = (
-            filtered_df.groupby(["AWARDED_YEAR", "TOPIC"]).size().unstack(fill_value=0)
+        # Generate the topic-time visualization chart
+        topic_time_figure, topic_time_description = create_topic_time_visualization(
+            topic_counts, topic_keywords, selected_entity
         )
 
-        # Retrieve keywords for each topic for better visualization
-        topic_keywords = {}
-        for topic_num in topic_counts.columns:
-            topic_keywords[topic_num] = ", ".join(
-                [word[0] for word in topic_model.get_topic(topic_num)]
+        # Report the sample a large selection was fitted on within the latency target
+        if "sample_size" in topic_result:
+            topic_time_description += (
+                f" Topics were fitted on a sample of {topic_result['sample_size']:,} of the "
+                f"{len(topic_result['topics']):,} tenders, stratified by awarded year and category; "
+                f"the remaining tenders were assigned to the closest topics."
             )
+        return topic_time_figure, topic_time_description
 
-        # Return the topic time visualization and the associated keywords for the selected entity
-        return create_topic_time_visualization(
-            topic_counts, topic_keywords, selected_entity
+    def draw_topic_visualizations(topic_result, selected_entity):
+        """Draws the topic word cloud and the topic visualization over time from one topic model."""
+        topic_time_figure, topic_time_description = topic_time_visualization(
+            topic_result, selected_entity
+        )
+        return (
+            topic_word_cloud_figure(topic_result),
+            topic_time_figure,
+            topic_time_description,
+        )
+
+    @app.callback(
+        [
+            Output("topic-word-cloud", "figure"),
+            Output("topic-time-visualization", "figure"),
+            Output("topic-time-description", "children"),
+            Output("topic-fit-request", "data"),
+        ],
+        [
+            Input("entity-dropdown", "value"),
+            Input("filter-checkbox", "value"),
+        ],
+    )
+    def update_topic_visualizations(selected_entity, selected_filters):
+        """
+        Updates the topic word cloud and the topic visualization over time for the selected entity.
+        Topics that need no fit (topic index, global model, NMF/LDA backends, fits already made) are
+        drawn right away; a selection whose BERTopic model has to be fitted is handed to the
+        background job below.
+        """
+        if not selected_entity or not selected_filters:
+            return go.Figure(), go.Figure(), "", dash.no_update
+
+        topic_result = get_topic_result(
+            filter_index,
+            artifacts,
+            "entity",
+            selected_entity,
+            selected_filters,
+            fit=False,
+        )
+        if topic_result is None:
+            fit_request = {"name": selected_entity, "filters": selected_filters}
+            return go.Figure(), go.Figure(), "", fit_request
+        return (*draw_topic_visualizations(topic_result, selected_entity), dash.no_update)
+
+    @app.callback(
+        [
+            Output("topic-word-cloud", "figure", allow_duplicate=True),
+            Output("topic-time-visualization", "figure", allow_duplicate=True),
+            Output("topic-time-description", "children", allow_duplicate=True),
+        ],
+        Input("topic-fit-request", "data"),
+        background=True,
+        interval=TOPIC_JOB_POLL_INTERVAL,
+        progress=[Output("topic-progress", "children")],
+        running=[
+            (
+                Output("topic-progress", "style"),
+                {"display": "block"},
+                {"display": "none"},
+            )
+        ],
+        cancel=[
+            Input("entity-dropdown", "value"),
+            Input("filter-checkbox", "value"),
+            Input("url", "pathname"),
+        ],
+        prevent_initial_call=True,
+    )
+    def fit_topic_visualizations(set_progress, fit_request):
+        """
+        Draws the topic visualizations of a selection whose BERTopic model has to be fitted, as a
+        background job so no Flask worker thread waits for the fit. The fit itself runs on the
+        warm worker pool of the web process, which memoizes its result; the job reports progress
+        and is cancelled when the selection changes or the page is left.
+        """
+        tender_count = len(
+            filter_index.positions(
+                entity=fit_request["name"], categories=fit_request["filters"]
+            )
+        )
+        set_progress((f"Fitting topics for {tender_count:,} tenders...",))
+        topic_result = request_topic_result(
+            "entity", fit_request["name"], fit_request["filters"]
         )
+        return draw_topic_visualizations(topic_result, fit_request["name"])
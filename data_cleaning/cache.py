@@ -0,0 +1,217 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from utils.constants import (
+    CACHE_DIR,
+    CLUSTER_MAPPING_FILEPATH,
+    ENTITY_FIXED_FILEPATH,
+    VENDOR_FIXED_FILEPATH,
+)
+
+# Source files whose content defines the preprocessing code version.
+# Any edit to one of them invalidates the cached DataFrame.
+_PACKAGE_DIR = os.path.dirname(os.path.abspath(__file__))
+PREPROCESSING_SOURCES = [
+    os.path.join(_PACKAGE_DIR, "data_loader.py"),
+    os.path.join(_PACKAGE_DIR, "data_preprocess.py"),
+    os.path.join(_PACKAGE_DIR, "text_cleaning.py"),
+    os.path.join(_PACKAGE_DIR, "cluster_entity_mapping.py"),
+    os.path.join(_PACKAGE_DIR, "incremental.py"),
+    os.path.join(_PACKAGE_DIR, "canonicalization.py"),
+    os.path.join(_PACKAGE_DIR, "schema.py"),
+    os.path.join(_PACKAGE_DIR, "cache.py"),
+    os.path.join(os.path.dirname(_PACKAGE_DIR), "utils", "unknown_vendor.py"),
+]
+
+# Files making up the processed store
+MANIFEST_FILENAME = "manifest.json"
+PROCESSED_FILENAME = "processed.parquet"
+ROW_KEYS_FILENAME = "row_keys.npy"
+
+
+def file_digest(filepath: str, chunk_size: int = 1 << 20) -> str:
+    """
+    Compute the SHA-256 digest of a file's content.
+
+    Args:
+        filepath (str): The file to hash.
+        chunk_size (int): Number of bytes read per iteration.
+
+    Returns:
+        str: The hexadecimal digest.
+    """
+    digest = hashlib.sha256()
+    with open(filepath, "rb") as file:
+        for chunk in iter(lambda: file.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def compute_inputs_version() -> str:
+    """
+    Hash every input other than the raw CSV that affects the preprocessed DataFrame:
+    both mapping files, the cluster mapping and the preprocessing source code.
+    Rows preprocessed under the same inputs version can be reused for a new snapshot.
+
+    Returns:
+        str: A hexadecimal content hash.
+    """
+    inputs = [
+        ENTITY_FIXED_FILEPATH,
+        VENDOR_FIXED_FILEPATH,
+        CLUSTER_MAPPING_FILEPATH,
+        *PREPROCESSING_SOURCES,
+    ]
+    digest = hashlib.sha256()
+    for filepath in inputs:
+        digest.update(file_digest(filepath).encode())
+    return digest.hexdigest()
+
+
+def compute_cache_key(data_filepath: str, inputs_version: str = None) -> str:
+    """
+    Build the cache key for a dataset from the content of every input that affects
+    the preprocessed DataFrame: the raw CSV, both mapping files, the cluster mapping
+    and the preprocessing source code.
+
+    Args:
+        data_filepath (str): The file path of the raw CSV file.
+        inputs_version (str): A precomputed compute_inputs_version() result.
+
+    Returns:
+        str: A hexadecimal content hash identifying the preprocessed output.
+    """
+    digest = hashlib.sha256(file_digest(data_filepath).encode())
+    digest.update((inputs_version or compute_inputs_version()).encode())
+    return digest.hexdigest()
+
+
+def read_manifest(cache_dir: str = CACHE_DIR):
+    """
+    Read the manifest describing the processed store.
+
+    Args:
+        cache_dir (str): The directory holding the processed store.
+
+    Returns:
+        dict | None: The manifest, or None when no store has been written.
+    """
+    filepath = os.path.join(cache_dir, MANIFEST_FILENAME)
+    if not os.path.exists(filepath):
+        return None
+    with open(filepath, "r") as file:
+        return json.load(file)
+
+
+def load_cached_frame(cache_key: str = None, cache_dir: str = CACHE_DIR):
+    """
+    Load the preprocessed DataFrame from the processed store.
+
+    Args:
+        cache_key (str): When given, the store is only used if it was built for this key.
+        cache_dir (str): The directory holding the processed store.
+
+    Returns:
+        pd.DataFrame | None: The cached DataFrame, or None when there is no usable store.
+    """
+    manifest = read_manifest(cache_dir)
+    if manifest is None or (cache_key and manifest["cache_key"] != cache_key):
+        return None
+    filepath = os.path.join(cache_dir, PROCESSED_FILENAME)
+    try:
+        return pd.read_parquet(filepath)
+    except Exception as e:
+        print(f"Ignoring unreadable cache file {filepath}: {e}")
+        return None
+
+
+def load_row_keys(cache_dir: str = CACHE_DIR):
+    """
+    Load the keys of every raw row of the snapshot the store was built from.
+
+    Args:
+        cache_dir (str): The directory holding the processed store.
+
+    Returns:
+        np.ndarray | None: The row keys ordered by raw row position, or None if missing.
+    """
+    filepath = os.path.join(cache_dir, ROW_KEYS_FILENAME)
+    if not os.path.exists(filepath):
+        return None
+    return np.load(filepath)
+
+
+def _save_array(filepath: str, array: np.ndarray):
+    """Save an array to an exact file path (np.save would append '.npy' to a path)."""
+    with open(filepath, "wb") as file:
+        np.save(file, array)
+
+
+def _save_json(filepath: str, data: dict):
+    """Save a dictionary as indented JSON."""
+    with open(filepath, "w") as file:
+        json.dump(data, file, indent=2)
+
+
+def _write_atomically(filepath: str, write):
+    """Write a file through a temporary path so a crash never leaves it truncated."""
+    tmp_filepath = f"{filepath}.tmp"
+    try:
+        write(tmp_filepath)
+    except Exception:
+        if os.path.exists(tmp_filepath):
+            os.remove(tmp_filepath)
+        raise
+    os.replace(tmp_filepath, filepath)
+
+
+def save_cached_frame(
+    df: pd.DataFrame,
+    row_keys: np.ndarray,
+    cache_key: str,
+    inputs_version: str,
+    data_filepath: str,
+    cache_dir: str = CACHE_DIR,
+):
+    """
+    Write the preprocessed DataFrame and the raw row keys to the processed store.
+    The manifest is removed first and written last, so an interrupted write leaves no
+    manifest behind and the store is rebuilt from scratch on the next start.
+
+    Args:
+        df (pd.DataFrame): The preprocessed DataFrame, indexed by raw row position.
+        row_keys (np.ndarray): Keys of every raw row of the snapshot, used for incremental ingestion.
+        cache_key (str): The key returned by compute_cache_key.
+        inputs_version (str): The compute_inputs_version() the frame was built with.
+        data_filepath (str): The raw CSV file the frame was built from.
+        cache_dir (str): The directory holding the processed store.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    manifest_filepath = os.path.join(cache_dir, MANIFEST_FILENAME)
+    if os.path.exists(manifest_filepath):
+        os.remove(manifest_filepath)
+
+    try:
+        _write_atomically(
+            os.path.join(cache_dir, PROCESSED_FILENAME),
+            lambda path: df.to_parquet(path),
+        )
+        _write_atomically(
+            os.path.join(cache_dir, ROW_KEYS_FILENAME),
+            lambda path: _save_array(path, row_keys),
+        )
+    except Exception as e:
+        print(f"Could not write the processed store in {cache_dir}: {e}")
+        return
+
+    manifest = {
+        "cache_key": cache_key,
+        "inputs_version": inputs_version,
+        "data_filepath": data_filepath,
+        "row_count": len(df),
+    }
+    _write_atomically(manifest_filepath, lambda path: _save_json(path, manifest))
@@ -0,0 +1,145 @@
+import hashlib
+import os
+import pickle
+
+import numpy as np
+import pandas as pd
+
+from data_cleaning.cache import file_digest
+from utils.constants import CACHE_DIR, ENTITY_FIXED_FILEPATH, VENDOR_FIXED_FILEPATH
+
+# Mapping file of each canonicalized column
+MAPPING_FILEPATHS = {
+    "ENTITY": ENTITY_FIXED_FILEPATH,
+    "VENDOR": VENDOR_FIXED_FILEPATH,
+}
+
+CANONICAL_FILE_PREFIX = "canonical_names_"
+
+
+def load_mapping(filepath: str) -> dict:
+    """
+    Load a key-value mapping from a file where each line is in the format 'key: value'.
+    """
+    with open(filepath, "r") as file:
+        return {
+            key.strip('"'): value.strip('"').rstrip(",")
+            for line in file
+            if ":" in line.strip()
+            for key, value in [line.strip().split(":", 1)]
+        }
+
+
+def clean_string(input_string: str) -> str:
+    """
+    Clean input string by removing quotes and commas.
+    """
+    return input_string.replace('"', "").replace(",", "")
+
+
+def process_mapping(mapping: dict, old_col: str, new_col: str) -> dict:
+    """
+    Create a cleaned mapping dictionary for replacing values.
+    Args:
+        mapping (dict): The original mapping dictionary.
+        old_col (str): The original column name.
+        new_col (str): The new column name.
+    Returns:
+        dict: A cleaned dictionary for replacing values.
+    """
+    return {clean_string(k): clean_string(v) for k, v in mapping.items()}
+
+
+def mappings_version() -> str:
+    """
+    Identify the compiled mappings by the content of both mapping files and of this
+    module, so the binary artifact is rebuilt whenever either changes.
+
+    Returns:
+        str: A short hexadecimal version string.
+    """
+    digest = hashlib.sha256(file_digest(os.path.abspath(__file__)).encode())
+    for column, filepath in MAPPING_FILEPATHS.items():
+        digest.update(f"{column}:{file_digest(filepath)}".encode())
+    return digest.hexdigest()[:16]
+
+
+def canonical_filepath(cache_dir: str = CACHE_DIR) -> str:
+    """Return the file path of the compiled mappings."""
+    return os.path.join(cache_dir, f"{CANONICAL_FILE_PREFIX}{mappings_version()}.pkl")
+
+
+def compile_mappings() -> dict:
+    """
+    Parse both mapping files into raw -> canonical name dictionaries.
+
+    Returns:
+        dict: One raw -> canonical dictionary per column name in MAPPING_FILEPATHS.
+    """
+    return {
+        column: process_mapping(
+            load_mapping(filepath), f"OLD_{column}", f"NEW_{column}"
+        )
+        for column, filepath in MAPPING_FILEPATHS.items()
+    }
+
+
+def load_canonical_mappings(cache_dir: str = CACHE_DIR) -> dict:
+    """
+    Load the compiled raw -> canonical name dictionaries. The mapping files are parsed
+    only when no artifact exists for their current content; the dictionaries are then
+    pickled and artifacts of older versions are removed.
+
+    Args:
+        cache_dir (str): The directory holding cache files.
+
+    Returns:
+        dict: One raw -> canonical dictionary per column name in MAPPING_FILEPATHS.
+    """
+    filepath = canonical_filepath(cache_dir)
+    if os.path.exists(filepath):
+        try:
+            with open(filepath, "rb") as file:
+                return pickle.load(file)
+        except Exception as e:
+            print(f"Ignoring unreadable compiled mappings {filepath}: {e}")
+
+    mappings = compile_mappings()
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_filepath = f"{filepath}.tmp"
+        with open(tmp_filepath, "wb") as file:
+            pickle.dump(mappings, file, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_filepath, filepath)
+        for filename in os.listdir(cache_dir):
+            stale = os.path.join(cache_dir, filename)
+            if filename.startswith(CANONICAL_FILE_PREFIX) and stale != filepath:
+                os.remove(stale)
+    except Exception as e:
+        print(f"Could not write the compiled mappings {filepath}: {e}")
+    return mappings
+
+
+def canonicalize(values: pd.Series, mapping: dict) -> pd.Series:
+    """
+    Replace raw names by their canonical name, leaving unmapped names unchanged.
+    Equivalent to values.replace(mapping), but the dictionary is looked up once per
+    distinct name: the column is factorized, the uniques are mapped, and the result
+    is expanded back to every row with the factorized codes.
+
+    Args:
+        values (pd.Series): The raw names.
+        mapping (dict): Canonical names keyed by raw name.
+
+    Returns:
+        pd.Series: The canonical names, aligned with the input index.
+    """
+    codes, uniques = pd.factorize(values)
+    canonical = np.array([mapping.get(name, name) for name in uniques], dtype=object)
+
+    raw = values.to_numpy(dtype=object)
+    result = canonical.take(codes) if len(canonical) else raw.copy()
+    # Missing values have the code -1 and are kept as they were
+    missing = codes < 0
+    result[missing] = raw[missing]
+    return pd.Series(result, index=values.index, dtype=object, name=values.name)
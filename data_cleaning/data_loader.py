@@ -1,40 +1,75 @@
+import argparse
+import glob
+import os
+
 import pandas as pd
 
+from data_cleaning.cache import (
+    compute_cache_key,
+    compute_inputs_version,
+    load_cached_frame,
+    load_row_keys,
+    read_manifest,
+    save_cached_frame,
+)
 from data_cleaning.cluster_entity_mapping import map_cluster_with_entity
-from data_cleaning.data_preprocess import get_preprocessed_data, calculate_duration
-from utils.constants import DATA_FILEPATH
+from data_cleaning.data_preprocess import (
+    get_preprocessed_data,
+    calculate_duration,
+    encode_categorical_columns,
+)
+from data_cleaning.schema import read_tender_csv
+from data_cleaning.incremental import (
+    compute_row_keys,
+    find_new_rows,
+    merge_processed,
+    summarize_ingestion,
+)
+from utils.constants import DATA_FILEPATH, SNAPSHOT_GLOB
 
 
 def load_data(filepath: str) -> pd.DataFrame:
     """
-    Loads a CSV file into a pandas DataFrame.
+    Loads the columns of a tender export used by the dashboard into a pandas DataFrame,
+    with the types declared in data_cleaning.schema. Rows and values that do not match
+    the schema are reported.
     Args:
         filepath (str): The file path of the CSV file to load.
     Returns:
-        pd.DataFrame: A pandas DataFrame containing the data from the CSV file.
+        pd.DataFrame: A pandas DataFrame containing the typed data from the CSV file.
     """
-    return pd.read_csv(filepath)
+    return read_tender_csv(filepath)
 
 
-def get_data(filepath: str = DATA_FILEPATH):
+def latest_snapshot_filepath(pattern: str = SNAPSHOT_GLOB) -> str:
     """
-    Loads and preprocesses data, including calculating the duration and mapping clusters to entities.
-    This function processes the dataset by loading the data, preprocessing it, calculating the
-    duration of tenders, and mapping each entity to its respective cluster. It also determines the
-    minimum and maximum years from the 'TENDER_START_DATE' column.
+    Finds the newest dated Awarded_Public_Tenders export.
     Args:
-        filepath (str): The file path of the CSV file to load. Defaults to DATA_FILEPATH.
+        pattern (str): Glob pattern matching the snapshot files; their names end with a YYYYMMDD date.
     Returns:
-        pd.DataFrame: A processed DataFrame with additional columns such as 'ENTITY_CLUSTER_NAME' and 'DURATION'.
-        int: The minimum year from the 'TENDER_START_DATE' column.
-        int: The maximum year from the 'TENDER_START_DATE' column.
+        str: The file path of the newest snapshot, or DATA_FILEPATH when none is found.
     """
+    snapshots = sorted(glob.glob(pattern))
+    return snapshots[-1] if snapshots else DATA_FILEPATH
 
-    # Load the initial dataset
-    initial_dataset = load_data(filepath)
+
+def process_raw_data(
+    raw_df: pd.DataFrame, workers: int = 1, use_memo: bool = True
+) -> pd.DataFrame:
+    """
+    Runs the full preprocessing pipeline on raw tender rows. Every step works row by row,
+    so any subset of a snapshot can be processed on its own.
+    Args:
+        raw_df (pd.DataFrame): Raw tender rows, indexed by their position in the snapshot.
+        workers (int): Number of processes used to clean tender descriptions.
+        use_memo (bool): Whether to reuse descriptions cleaned by earlier runs.
+    Returns:
+        pd.DataFrame: The preprocessed DataFrame with 'DURATION' and 'ENTITY_CLUSTER_NAME' columns,
+            and entity, vendor and cluster names stored as categoricals.
+    """
 
     # Preprocess the data (cleaning, filling missing values, etc.)
-    df = get_preprocessed_data(initial_dataset)
+    df = get_preprocessed_data(raw_df, workers, use_memo)
 
     # Calculate the duration for each tender
     df = calculate_duration(df)
@@ -42,8 +77,111 @@ def get_data(filepath: str = DATA_FILEPATH):
     # Map entities to clusters
     df = map_cluster_with_entity(df)
 
+    # Store entity, vendor and cluster names as categoricals
+    return encode_categorical_columns(df)
+
+
+def ingest_snapshot(
+    filepath: str,
+    workers: int = 1,
+    inputs_version: str = None,
+    cache_key: str = None,
+) -> pd.DataFrame:
+    """
+    Brings the processed store up to date with a snapshot and returns the preprocessed data.
+    When the store was built with the same mappings and preprocessing code, only rows that
+    were inserted or changed since the stored snapshot are preprocessed and merged in, so the
+    cost depends on the size of the delta. Otherwise the whole snapshot is preprocessed.
+    Args:
+        filepath (str): The file path of the snapshot CSV file.
+        workers (int): Number of processes used to clean tender descriptions.
+        inputs_version (str): A precomputed compute_inputs_version() result.
+        cache_key (str): A precomputed compute_cache_key() result for the snapshot.
+    Returns:
+        pd.DataFrame: The preprocessed DataFrame for the snapshot.
+    """
+    inputs_version = inputs_version or compute_inputs_version()
+    cache_key = cache_key or compute_cache_key(filepath, inputs_version)
+
+    raw_df = load_data(filepath)
+    row_keys = compute_row_keys(raw_df)
+
+    manifest = read_manifest()
+    stored_df, stored_row_keys = None, None
+    if manifest is not None and manifest["inputs_version"] == inputs_version:
+        stored_df, stored_row_keys = load_cached_frame(), load_row_keys()
+
+    if stored_df is None or stored_row_keys is None:
+        print(f"Preprocessing the full snapshot {filepath}.")
+        df = process_raw_data(raw_df, workers)
+    else:
+        new_positions = find_new_rows(row_keys, stored_row_keys)
+        print(
+            summarize_ingestion(
+                raw_df, new_positions, stored_df, stored_row_keys, row_keys
+            )
+        )
+        processed_delta = process_raw_data(raw_df.iloc[new_positions], workers)
+        # Concatenating categoricals with different categories falls back to strings
+        df = encode_categorical_columns(
+            merge_processed(stored_df, stored_row_keys, row_keys, processed_delta)
+        )
+
+    save_cached_frame(df, row_keys, cache_key, inputs_version, filepath)
+    return df
+
+
+def get_data(filepath: str = DATA_FILEPATH, use_cache: bool = True, workers: int = 1):
+    """
+    Loads and preprocesses data, including calculating the duration and mapping clusters to entities.
+    This function processes the dataset by loading the data, preprocessing it, calculating the
+    duration of tenders, and mapping each entity to its respective cluster. It also determines the
+    minimum and maximum years from the 'TENDER_START_DATE' column.
+
+    The preprocessed DataFrame is kept in a Parquet processed store keyed by a content hash of the
+    CSV, the mapping files, the cluster mapping and the preprocessing code, so a warm start skips
+    preprocessing entirely. A new snapshot only preprocesses its inserted or changed rows, and a
+    change to any other input rebuilds the store.
+    Args:
+        filepath (str): The file path of the CSV file to load. Defaults to DATA_FILEPATH.
+        use_cache (bool): Whether to read and write the processed store and the
+            persistent description memo.
+        workers (int): Number of processes used to clean tender descriptions on a cache miss.
+            Inputs too small to benefit from a process pool are cleaned serially.
+    Returns:
+        pd.DataFrame: A processed DataFrame with additional columns such as 'ENTITY_CLUSTER_NAME' and 'DURATION'.
+        int: The minimum year from the 'TENDER_START_DATE' column.
+        int: The maximum year from the 'TENDER_START_DATE' column.
+    """
+    if use_cache:
+        inputs_version = compute_inputs_version()
+        cache_key = compute_cache_key(filepath, inputs_version)
+        df = load_cached_frame(cache_key)
+        if df is None:
+            df = ingest_snapshot(filepath, workers, inputs_version, cache_key)
+    else:
+        df = process_raw_data(load_data(filepath), workers, use_memo=False)
+
     # Get the minimum and maximum years based on the 'TENDER_START_DATE'
     min_year = df["TENDER_START_DATE"].dt.year.min()
     max_year = df["TENDER_START_DATE"].dt.year.max()
 
     return df, min_year, max_year
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Ingest a tender snapshot into the processed store."
+    )
+    parser.add_argument(
+        "snapshot",
+        nargs="?",
+        default=None,
+        help="Snapshot CSV file. Defaults to the newest Awarded_Public_Tenders export.",
+    )
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+
+    snapshot = args.snapshot or latest_snapshot_filepath()
+    df, min_year, max_year = get_data(snapshot, workers=args.workers)
+    print(f"{snapshot}: {len(df)} preprocessed tenders from {min_year} to {max_year}.")
@@ -1,53 +1,41 @@
-import re
-import string
 import pandas as pd
-import nltk
-from utils.constants import ENTITY_FIXED_FILEPATH, VENDOR_FIXED_FILEPATH
+from data_cleaning.canonicalization import canonicalize, load_canonical_mappings
+from data_cleaning.text_cleaning import clean_texts, clean_texts_memoized
 from utils.unknown_vendor import vendors_to_exclude
 
-# Download required NLTK resources
-# nltk.download('punkt', quiet=True)
+# Low-cardinality text columns stored as categoricals (integer codes into a dictionary
+# of distinct values): a few hundred entities and ~12k vendors repeated over 125k+ rows
+CATEGORICAL_COLUMNS = [
+    "ENTITY",
+    "VENDOR",
+    "ENTITY_CLUSTER_NAME",
+    "TYPO_MIXED_ENTITY",
+    "TYPO_MIXED_VENDOR",
+]
+
+# Download required NLTK resources (descriptions are tokenized with a regex, so punkt is not needed)
 # nltk.download('stopwords', quiet=True)
 
 
-def load_mapping(filepath: str) -> dict:
-    """
-    Load a key-value mapping from a file where each line is in the format 'key: value'.
-    """
-    with open(filepath, "r") as file:
-        return {
-            key.strip('"'): value.strip('"').rstrip(",")
-            for line in file
-            if ":" in line.strip()
-            for key, value in [line.strip().split(":", 1)]
-        }
-
-
-def clean_string(input_string: str) -> str:
-    """
-    Clean input string by removing quotes and commas.
-    """
-    return input_string.replace('"', "").replace(",", "")
-
-
-def process_mapping(mapping: dict, old_col: str, new_col: str) -> dict:
+def calculate_duration(df: pd.DataFrame) -> pd.DataFrame:
     """
-    Create a cleaned mapping dictionary for replacing values.
-    Args:
-        mapping (dict): The original mapping dictionary.
-        old_col (str): The original column name.
-        new_col (str): The new column name.
-    Returns:
-        dict: A cleaned dictionary for replacing values.
+    Calculate the duration between 'TENDER_START_DATE' and 'TENDER_CLOSE_DATE' in days.
     """
-    return {clean_string(k): clean_string(v) for k, v in mapping.items()}
+    df["DURATION"] = (df["TENDER_CLOSE_DATE"] - df["TENDER_START_DATE"]).dt.days
+    return df
 
 
-def calculate_duration(df: pd.DataFrame) -> pd.DataFrame:
+def encode_categorical_columns(df: pd.DataFrame) -> pd.DataFrame:
     """
-    Calculate the duration between 'TENDER_START_DATE' and 'TENDER_CLOSE_DATE' in days.
+    Convert the CATEGORICAL_COLUMNS to the pandas 'category' dtype, so comparisons,
+    groupbys and value counts on them work on integer codes instead of strings.
+    Columns that are already categorical only drop their unused categories.
     """
-    df["DURATION"] = (df["TENDER_CLOSE_DATE"] - df["TENDER_START_DATE"]).dt.days
+    for column in CATEGORICAL_COLUMNS:
+        if isinstance(df[column].dtype, pd.CategoricalDtype):
+            df[column] = df[column].cat.remove_unused_categories()
+        else:
+            df[column] = df[column].astype("category")
     return df
 
 
@@ -88,30 +76,29 @@ def preprocess_dates_and_amounts(df: pd.DataFrame) -> pd.DataFrame:
 def clean_text(text: str) -> str:
     """
     Clean and preprocess the input text by performing various text transformations.
+    Single-value counterpart of clean_descriptions, which should be preferred for columns.
     Args:
         text (str): The text to clean.
     Returns:
         str: The cleaned text.
     """
-    text = str(text)  # Ensure the input is a string
-    text = text.lower()  # Convert all characters to lower case
-    text = re.sub(r"@\S+", "", text)  # Remove Twitter handles
-    text = re.sub(r"http\S+", "", text)  # Remove URLs
-    text = re.sub(
-        r"[^a-zA-Z+']", " ", text
-    )  # Keep only alphabetic characters and apostrophes
-    text = re.sub(r"\s+[a-zA-Z]\s+", " ", text + " ")  # Keep words with length > 1 only
-    text = "".join(
-        [i for i in text if i not in string.punctuation]
-    )  # Remove punctuation
-    words = nltk.tokenize.word_tokenize(text)  # Tokenize the text
-    stopwords = nltk.corpus.stopwords.words("english")  # Load stopwords
-    # Remove stopwords and keep words with length > 2
-    text = " ".join([i for i in words if i not in stopwords and len(i) > 2])
-    text = re.sub(
-        "\s+", " ", text
-    ).strip()  # Remove repeated, leading, and trailing spaces
-    return text
+    return clean_texts(pd.Series([text], dtype=object)).iloc[0]
+
+
+def clean_descriptions(
+    descriptions: pd.Series, workers: int = 1, use_memo: bool = True
+) -> pd.Series:
+    """
+    Clean a column of tender descriptions in one batch. Each distinct description is
+    cleaned once, and descriptions seen by earlier runs come from the persistent memo.
+    Args:
+        descriptions (pd.Series): The raw tender descriptions, without missing values.
+        workers (int): Number of processes used for cleaning. 1 cleans serially.
+        use_memo (bool): Whether to read and update the persistent description memo.
+    Returns:
+        pd.Series: The cleaned descriptions, aligned with the input index.
+    """
+    return clean_texts_memoized(descriptions, workers, use_memo)
 
 
 def clean_entity_and_vendor(df: pd.DataFrame) -> pd.DataFrame:
@@ -137,24 +124,23 @@ def clean_unknown_vendor(df: pd.DataFrame) -> pd.DataFrame:
     return df
 
 
-def get_preprocessed_data(df: pd.DataFrame) -> pd.DataFrame:
+def get_preprocessed_data(
+    df: pd.DataFrame, workers: int = 1, use_memo: bool = True
+) -> pd.DataFrame:
     """
     Preprocess the input DataFrame:
     - Replace 'VENDOR' and 'ENTITY' values using mappings.
     - Rename columns and add fixed values.
     Args:
         df (pd.DataFrame): The raw DataFrame containing tender data.
+        workers (int): Number of processes used to clean tender descriptions.
+        use_memo (bool): Whether to reuse descriptions cleaned by earlier runs.
     Returns:
         pd.DataFrame: A cleaned and transformed DataFrame.
     """
 
-    # Load and process mappings for entity and vendor
-    entity_mapping = process_mapping(
-        load_mapping(ENTITY_FIXED_FILEPATH), "OLD_ENTITY", "NEW_ENTITY"
-    )
-    vendor_mapping = process_mapping(
-        load_mapping(VENDOR_FIXED_FILEPATH), "OLD_VENDOR", "NEW_VENDOR"
-    )
+    # Load the compiled mappings for entity and vendor
+    mappings = load_canonical_mappings()
 
     # Rename and update columns
     processed_df = df.rename(
@@ -162,8 +148,12 @@ def get_preprocessed_data(df: pd.DataFrame) -> pd.DataFrame:
     ).copy()
 
     # Replace vendor and entity names based on mappings
-    processed_df["VENDOR"] = processed_df["TYPO_MIXED_VENDOR"].replace(vendor_mapping)
-    processed_df["ENTITY"] = processed_df["TYPO_MIXED_ENTITY"].replace(entity_mapping)
+    processed_df["VENDOR"] = canonicalize(
+        processed_df["TYPO_MIXED_VENDOR"], mappings["VENDOR"]
+    )
+    processed_df["ENTITY"] = canonicalize(
+        processed_df["TYPO_MIXED_ENTITY"], mappings["ENTITY"]
+    )
 
     # Clean and fill missing tender descriptions
     processed_df["TENDER_DESCRIPTION"] = (
@@ -172,8 +162,8 @@ def get_preprocessed_data(df: pd.DataFrame) -> pd.DataFrame:
     # Preserve original tender descriptions for reference
     processed_df["UNCLEANED_TENDER_DESCRIPTION"] = processed_df["TENDER_DESCRIPTION"]
     # Clean tender descriptions
-    processed_df["TENDER_DESCRIPTION"] = (
-        processed_df["UNCLEANED_TENDER_DESCRIPTION"].fillna("").apply(clean_text)
+    processed_df["TENDER_DESCRIPTION"] = clean_descriptions(
+        processed_df["UNCLEANED_TENDER_DESCRIPTION"].fillna(""), workers, use_memo
     )
     # Clean and remove irrelevant vendor and entity records
     processed_df = clean_entity_and_vendor(processed_df)
@@ -0,0 +1,105 @@
+import numpy as np
+import pandas as pd
+
+
+def compute_row_keys(raw_df: pd.DataFrame) -> np.ndarray:
+    """
+    Compute a key for every raw row of a snapshot. The key combines a hash of the whole
+    row (including 'TENDER_ID') with the row's occurrence number among identical rows,
+    so exact duplicates still get distinct keys.
+
+    Args:
+        raw_df (pd.DataFrame): The raw snapshot as returned by load_data.
+
+    Returns:
+        np.ndarray: One uint64 key per raw row, in row order.
+    """
+    row_hash = pd.util.hash_pandas_object(raw_df, index=False)
+    occurrence = row_hash.groupby(row_hash).cumcount()
+    return pd.util.hash_pandas_object(
+        pd.DataFrame(
+            {"ROW_HASH": row_hash.to_numpy(), "OCCURRENCE": occurrence.to_numpy()}
+        ),
+        index=False,
+    ).to_numpy()
+
+
+def find_new_rows(row_keys: np.ndarray, stored_row_keys: np.ndarray) -> np.ndarray:
+    """
+    Find the raw rows of a snapshot that are not in the stored dataset, either because
+    they were inserted or because their content changed.
+
+    Args:
+        row_keys (np.ndarray): Keys of the new snapshot's rows.
+        stored_row_keys (np.ndarray): Keys of the stored snapshot's rows.
+
+    Returns:
+        np.ndarray: Positions of the new or changed rows in the new snapshot.
+    """
+    return np.flatnonzero(~np.isin(row_keys, stored_row_keys))
+
+
+def merge_processed(
+    stored_df: pd.DataFrame,
+    stored_row_keys: np.ndarray,
+    row_keys: np.ndarray,
+    processed_delta: pd.DataFrame,
+) -> pd.DataFrame:
+    """
+    Merge freshly preprocessed rows into the stored preprocessed DataFrame.
+    Stored rows whose raw row is missing from the new snapshot (removed or changed) are
+    dropped, the remaining ones are re-indexed to their position in the new snapshot,
+    and the result is ordered like a full rebuild of the new snapshot.
+
+    Args:
+        stored_df (pd.DataFrame): The stored preprocessed DataFrame, indexed by raw row position.
+        stored_row_keys (np.ndarray): Keys of the stored snapshot's rows.
+        row_keys (np.ndarray): Keys of the new snapshot's rows.
+        processed_delta (pd.DataFrame): The preprocessed new or changed rows, indexed by raw row position.
+
+    Returns:
+        pd.DataFrame: The preprocessed DataFrame for the new snapshot.
+    """
+    new_positions = pd.Index(row_keys).get_indexer(stored_row_keys[stored_df.index])
+    kept = new_positions >= 0
+    kept_df = stored_df[kept].set_axis(new_positions[kept])
+    return pd.concat([kept_df, processed_delta]).sort_index()
+
+
+def summarize_ingestion(
+    raw_df: pd.DataFrame,
+    new_positions: np.ndarray,
+    stored_df: pd.DataFrame,
+    stored_row_keys: np.ndarray,
+    row_keys: np.ndarray,
+) -> str:
+    """
+    Describe an incremental ingestion in one line. Stored rows of the dataset whose key
+    is missing from the new snapshot have left it; a new row counts as changed when it
+    takes the place of a departed row with the same 'TENDER_ID', and as inserted
+    otherwise (e.g. a new tender or a further line item of an existing one).
+
+    Args:
+        raw_df (pd.DataFrame): The new raw snapshot.
+        new_positions (np.ndarray): Positions of the new or changed rows.
+        stored_df (pd.DataFrame): The stored preprocessed DataFrame, indexed by raw row position.
+        stored_row_keys (np.ndarray): Keys of the stored snapshot's rows.
+        row_keys (np.ndarray): Keys of the new snapshot's rows.
+
+    Returns:
+        str: The summary message.
+    """
+    departed = ~np.isin(stored_row_keys[stored_df.index], row_keys)
+    departed_counts = stored_df["TENDER_ID"][departed].astype(str).value_counts()
+    new_counts = raw_df["TENDER_ID"].iloc[new_positions].astype(str).value_counts()
+    # Pair new and departed rows of the same tender one to one
+    changed_count = int(
+        np.minimum(
+            new_counts, departed_counts.reindex(new_counts.index, fill_value=0)
+        ).sum()
+    )
+    return (
+        f"Incremental ingestion: {len(raw_df)} rows in snapshot, "
+        f"{len(new_positions) - changed_count} inserted, {changed_count} changed, "
+        f"{int(departed.sum()) - changed_count} removed."
+    )
@@ -0,0 +1,168 @@
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from pyarrow import csv as pa_csv
+
+# Columns of the Awarded Public Tenders export used by the dashboard and their types.
+# Every other column of the export is skipped while parsing.
+TEXT_COLUMNS = ["TENDER_ID", "TENDER_DESCRIPTION", "ENTITY", "VENDOR"]
+FLAG_COLUMNS = ["GOODS", "SERVICE", "CONSTRUCTION"]
+DATE_COLUMNS = ["TENDER_START_DATE", "TENDER_CLOSE_DATE", "AWARDED_DATE"]
+AMOUNT_COLUMNS = ["AWARDED_AMOUNT"]
+
+TENDER_SCHEMA = {
+    **{column: pa.string() for column in TEXT_COLUMNS},
+    **{column: pa.string() for column in FLAG_COLUMNS},
+    # Dates are parsed with DATE_FORMAT after reading so mismatches can be reported
+    **{column: pa.string() for column in DATE_COLUMNS},
+    **{column: pa.float64() for column in AMOUNT_COLUMNS},
+}
+
+# Timestamp format of the open data portal's CSV export, e.g. "10/04/2024 12:00:00 AM"
+DATE_FORMAT = "%m/%d/%Y %I:%M:%S %p"
+FLAG_VALUES = {"Y", "N"}
+
+# Values read as missing, the same as pandas.read_csv's default na_values
+NA_VALUES = [
+    "",
+    "#N/A",
+    "#N/A N/A",
+    "#NA",
+    "-1.#IND",
+    "-1.#QNAN",
+    "-NaN",
+    "-nan",
+    "1.#IND",
+    "1.#QNAN",
+    "<NA>",
+    "N/A",
+    "NA",
+    "NULL",
+    "NaN",
+    "None",
+    "n/a",
+    "nan",
+    "null",
+]
+
+# Number of offending values shown per column in the schema report
+REPORT_EXAMPLES = 3
+
+
+def _read_arrow_csv(
+    filepath: str, column_types: dict, invalid_rows: list
+) -> pd.DataFrame:
+    """Parse the schema's columns of a CSV file with the multithreaded Arrow reader."""
+
+    def skip_invalid_row(row):
+        invalid_rows.append(row.text)
+        return "skip"
+
+    table = pa_csv.read_csv(
+        filepath,
+        parse_options=pa_csv.ParseOptions(
+            newlines_in_values=True, invalid_row_handler=skip_invalid_row
+        ),
+        convert_options=pa_csv.ConvertOptions(
+            column_types=column_types,
+            include_columns=list(column_types),
+            null_values=NA_VALUES,
+            strings_can_be_null=True,
+        ),
+    )
+    return table.to_pandas()
+
+
+def _mismatch(values: pd.Series, valid: pd.Series) -> tuple:
+    """Count non-missing values that fail a check and collect a few examples."""
+    mismatched = values.notna() & ~valid
+    examples = values[mismatched].head(REPORT_EXAMPLES).tolist()
+    return int(mismatched.sum()), examples
+
+
+def enforce_schema(df: pd.DataFrame) -> dict:
+    """
+    Cast the columns of a freshly read tender export to their schema types in place.
+    Values that do not match the schema are reported instead of being coerced silently:
+    dates that do not follow DATE_FORMAT are still parsed leniently, while non-numeric
+    amounts and unknown category flags keep the previous behaviour (missing amount, flag 0).
+
+    Args:
+        df (pd.DataFrame): Columns read as declared in TENDER_SCHEMA (amounts possibly as text).
+
+    Returns:
+        dict: Number of mismatching values and examples, keyed by column name.
+    """
+    report = {}
+
+    # Arrow returns None for missing strings; pandas code downstream expects NaN
+    for column in TEXT_COLUMNS + FLAG_COLUMNS:
+        df[column] = df[column].where(df[column].notna(), np.nan)
+
+    for column in DATE_COLUMNS:
+        raw = df[column]
+        parsed = pd.to_datetime(raw, format=DATE_FORMAT, errors="coerce")
+        count, examples = _mismatch(raw, parsed.notna())
+        if count:
+            report[column] = (count, examples)
+            fallback = raw.notna() & parsed.isna()
+            parsed[fallback] = pd.to_datetime(
+                raw[fallback], format="mixed", errors="coerce"
+            )
+        df[column] = parsed
+
+    for column in AMOUNT_COLUMNS:
+        if not pd.api.types.is_float_dtype(df[column]):
+            raw = df[column]
+            df[column] = pd.to_numeric(raw, errors="coerce")
+            count, examples = _mismatch(raw, df[column].notna())
+            if count:
+                report[column] = (count, examples)
+
+    for column in FLAG_COLUMNS:
+        count, examples = _mismatch(df[column], df[column].isin(FLAG_VALUES))
+        if count:
+            report[column] = (count, examples)
+
+    return report
+
+
+def print_schema_report(filepath: str, report: dict, invalid_rows: list):
+    """Print the rows and values of a tender export that did not match the schema."""
+    if not report and not invalid_rows:
+        return
+    print(f"Schema check for {filepath}:")
+    if invalid_rows:
+        print(
+            f"  {len(invalid_rows)} rows with the wrong number of fields skipped, "
+            f"e.g. {invalid_rows[:REPORT_EXAMPLES]}"
+        )
+    for column, (count, examples) in report.items():
+        print(f"  {column}: {count} values do not match the schema, e.g. {examples}")
+
+
+def read_tender_csv(filepath: str) -> pd.DataFrame:
+    """
+    Read the columns of a tender export used by the dashboard with explicit types.
+    The file is parsed by the Arrow CSV reader restricted to the schema's columns. If an
+    amount cannot be parsed as a number, the columns are re-read as text and converted
+    value by value so the offending rows can be reported.
+
+    Args:
+        filepath (str): The file path of the CSV export.
+
+    Returns:
+        pd.DataFrame: The typed tender columns, indexed by row position.
+    """
+    invalid_rows = []
+    try:
+        df = _read_arrow_csv(filepath, TENDER_SCHEMA, invalid_rows)
+    except pa.ArrowInvalid:
+        invalid_rows = []
+        df = _read_arrow_csv(
+            filepath, {column: pa.string() for column in TENDER_SCHEMA}, invalid_rows
+        )
+
+    report = enforce_schema(df)
+    print_schema_report(filepath, report, invalid_rows)
+    return df
@@ -0,0 +1,239 @@
+import hashlib
+import multiprocessing
+import os
+import re
+import string
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+import nltk
+
+from data_cleaning.cache import file_digest
+from utils.constants import CACHE_DIR
+
+# Patterns are compiled once and applied to the whole description column
+MENTION_PATTERN = re.compile(r"@\S+")  # Twitter handles
+URL_PATTERN = re.compile(r"http\S+")  # URLs
+# Anything but letters, '+' and apostrophes
+NON_ALPHA_PATTERN = re.compile(r"[^a-zA-Z+']")
+SINGLE_CHAR_PATTERN = re.compile(r"\s+[a-zA-Z]\s+")  # Single-letter words
+PUNCTUATION_TABLE = str.maketrans("", "", string.punctuation)
+
+# Contractions split by nltk.word_tokenize that can still occur once the text is
+# reduced to lowercase letters and spaces ("cannot" -> "can not", "gonna" -> "gon na").
+# Splitting them the same way keeps the whitespace tokenizer token-identical to
+# word_tokenize.
+CONTRACTION_PATTERN = re.compile(
+    r"\b(can(?=not\b)|gim(?=me\b)|gon(?=na\b)|got(?=ta\b)|lem(?=me\b)|wan(?=na\b))"
+)
+
+MIN_TOKEN_LENGTH = 3
+
+# Below this many rows the process pool start-up costs more than it saves
+PARALLEL_MIN_ROWS = 20000
+# Chunks handed to each worker; more than one per worker evens out uneven text lengths
+CHUNKS_PER_WORKER = 4
+
+MEMO_FILE_PREFIX = "description_memo_"
+
+
+@lru_cache(maxsize=None)
+def english_stopwords() -> frozenset:
+    """
+    Load the NLTK English stopword list once as a frozen set for O(1) membership checks.
+
+    Returns:
+        frozenset: The English stopwords.
+    """
+    return frozenset(nltk.corpus.stopwords.words("english"))
+
+
+def normalize_texts(texts: pd.Series) -> pd.Series:
+    """
+    Apply the character-level normalization of clean_text to a whole column using
+    vectorized string operations.
+
+    Args:
+        texts (pd.Series): The raw texts.
+
+    Returns:
+        pd.Series: Lowercase texts containing only letters and spaces.
+    """
+    texts = texts.astype(str).str.lower()
+    texts = texts.str.replace(MENTION_PATTERN, "", regex=True)
+    texts = texts.str.replace(URL_PATTERN, "", regex=True)
+    texts = texts.str.replace(NON_ALPHA_PATTERN, " ", regex=True)
+    texts = (texts + " ").str.replace(SINGLE_CHAR_PATTERN, " ", regex=True)
+    texts = texts.str.translate(PUNCTUATION_TABLE)
+    return texts.str.replace(CONTRACTION_PATTERN, r"\1 ", regex=True)
+
+
+def clean_texts(texts: pd.Series) -> pd.Series:
+    """
+    Clean a column of texts in one batch. The output is token-identical to applying
+    data_preprocess.clean_text to every row.
+
+    Args:
+        texts (pd.Series): The raw texts.
+
+    Returns:
+        pd.Series: The cleaned texts, aligned with the input index.
+    """
+    stopwords = english_stopwords()
+    tokenized = normalize_texts(texts).str.split()
+
+    # Remove stopwords and keep words with length > 2
+    cleaned = [
+        " ".join(
+            [
+                word
+                for word in words
+                if len(word) >= MIN_TOKEN_LENGTH and word not in stopwords
+            ]
+        )
+        for words in tokenized
+    ]
+    return pd.Series(cleaned, index=texts.index, dtype=object)
+
+
+def clean_texts_parallel(texts: pd.Series, workers: int) -> pd.Series:
+    """
+    Clean a column of texts on several cores. The column is split into contiguous chunks
+    that are cleaned in a process pool and reassembled in their original order, so the
+    result is identical to clean_texts. Small inputs, a single worker, or platforms
+    without the fork start method fall back to serial cleaning.
+
+    Args:
+        texts (pd.Series): The raw texts.
+        workers (int): Number of worker processes.
+
+    Returns:
+        pd.Series: The cleaned texts, aligned with the input index.
+    """
+    # Workers are forked so they inherit the loaded modules instead of re-importing
+    # the entry point (app.py loads the dataset at import time)
+    can_fork = "fork" in multiprocessing.get_all_start_methods()
+    if workers <= 1 or len(texts) < PARALLEL_MIN_ROWS or not can_fork:
+        return clean_texts(texts)
+
+    chunk_count = min(workers * CHUNKS_PER_WORKER, len(texts))
+    bounds = np.linspace(0, len(texts), chunk_count + 1, dtype=int)
+    chunks = [texts.iloc[start:end] for start, end in zip(bounds[:-1], bounds[1:])]
+
+    # Load the stopwords before forking so every worker inherits them
+    english_stopwords()
+    with ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context("fork")
+    ) as executor:
+        # map() yields results in submission order, keeping the output deterministic
+        cleaned_chunks = list(executor.map(clean_texts, chunks))
+
+    return pd.concat(cleaned_chunks)
+
+
+def cleaning_version() -> str:
+    """
+    Identify the cleaning behaviour by the content of this module and the stopword list,
+    so memoized results are never reused after either changes.
+
+    Returns:
+        str: A short hexadecimal version string.
+    """
+    digest = hashlib.sha256(file_digest(os.path.abspath(__file__)).encode())
+    digest.update("\n".join(sorted(english_stopwords())).encode())
+    return digest.hexdigest()[:16]
+
+
+def memo_filepath(cache_dir: str = CACHE_DIR) -> str:
+    """Return the Parquet file path of the persistent description memo."""
+    return os.path.join(cache_dir, f"{MEMO_FILE_PREFIX}{cleaning_version()}.parquet")
+
+
+def load_cleaning_memo(cache_dir: str = CACHE_DIR) -> dict:
+    """
+    Load the persistent raw -> cleaned description dictionary.
+
+    Args:
+        cache_dir (str): The directory holding cache files.
+
+    Returns:
+        dict: Cleaned descriptions keyed by raw description; empty when no memo exists.
+    """
+    filepath = memo_filepath(cache_dir)
+    if not os.path.exists(filepath):
+        return {}
+    try:
+        memo = pd.read_parquet(filepath)
+    except Exception as e:
+        print(f"Ignoring unreadable description memo {filepath}: {e}")
+        return {}
+    return dict(zip(memo["RAW"], memo["CLEANED"]))
+
+
+def save_cleaning_memo(memo: dict, cache_dir: str = CACHE_DIR):
+    """
+    Persist the raw -> cleaned description dictionary and remove memos written by
+    other cleaning versions.
+
+    Args:
+        memo (dict): Cleaned descriptions keyed by raw description.
+        cache_dir (str): The directory holding cache files.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    filepath = memo_filepath(cache_dir)
+    tmp_filepath = f"{filepath}.tmp"
+    memo_df = pd.DataFrame({"RAW": list(memo.keys()), "CLEANED": list(memo.values())})
+    memo_df.to_parquet(tmp_filepath)
+    os.replace(tmp_filepath, filepath)
+
+    for filename in os.listdir(cache_dir):
+        stale = os.path.join(cache_dir, filename)
+        if filename.startswith(MEMO_FILE_PREFIX) and stale != filepath:
+            os.remove(stale)
+
+
+def clean_texts_memoized(
+    texts: pd.Series, workers: int = 1, use_memo: bool = True
+) -> pd.Series:
+    """
+    Clean a column of texts once per distinct value. The column is factorized, only the
+    unique texts missing from the persistent memo are cleaned, and the results are
+    mapped back to every row through the factorized codes. Prints how much work the
+    deduplication and the memo saved.
+
+    Args:
+        texts (pd.Series): The raw texts, without missing values.
+        workers (int): Number of processes used to clean unseen texts.
+        use_memo (bool): Whether to read and update the persistent memo.
+
+    Returns:
+        pd.Series: The cleaned texts, aligned with the input index.
+    """
+    codes, uniques = pd.factorize(texts)
+    unique_texts = pd.Series(uniques, dtype=object)
+
+    memo = load_cleaning_memo() if use_memo else {}
+    cleaned = unique_texts.map(memo).astype(object)
+    unseen = cleaned.isna()
+    if unseen.any():
+        fresh = clean_texts_parallel(unique_texts[unseen], workers)
+        cleaned[unseen] = fresh
+        if use_memo:
+            memo.update(zip(unique_texts[unseen], fresh))
+            save_cleaning_memo(memo)
+
+    row_count, unique_count, unseen_count = len(texts), len(unique_texts), unseen.sum()
+    if row_count:
+        print(
+            f"Description cleaning: {row_count} rows, {unique_count} unique "
+            f"({1 - unique_count / row_count:.1%} of rows deduplicated); "
+            f"memo hits {unique_count - unseen_count}/{unique_count} "
+            f"({(unique_count - unseen_count) / max(unique_count, 1):.1%}), "
+            f"cleaned {unseen_count} new descriptions."
+        )
+
+    return pd.Series(
+        cleaned.to_numpy(dtype=object).take(codes), index=texts.index, dtype=object
+    )
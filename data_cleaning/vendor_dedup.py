@@ -0,0 +1,278 @@
+import argparse
+import re
+import time
+from collections import Counter
+
+import numpy as np
+
+from data_cleaning.canonicalization import clean_string, load_mapping, process_mapping
+from data_cleaning.data_loader import latest_snapshot_filepath, load_data
+from utils.constants import GENERATED_VENDOR_MAPPING_FILEPATH, VENDOR_FIXED_FILEPATH
+
+# Trailing words that do not tell two vendors apart ("ABC Paving Ltd." == "ABC Paving Limited")
+LEGAL_SUFFIXES = {
+    "co",
+    "company",
+    "corp",
+    "corporation",
+    "inc",
+    "incorporated",
+    "limited",
+    "llc",
+    "llp",
+    "ltd",
+    "ltee",
+}
+NON_ALNUM_PATTERN = re.compile(r"[^a-z0-9]+")
+
+NGRAM_SIZE = 3
+# Character n-grams shared by more names than this are too common to block on
+MAX_POSTINGS = 200
+# Minimum Dice overlap of n-gram sets for a pair to be scored with the edit distance
+MIN_NGRAM_OVERLAP = 0.5
+# Maximum edit distance, relative to the longer name, for two names to be merged
+MAX_DISTANCE_RATIO = 0.15
+
+
+def normalize_vendor(name: str) -> str:
+    """
+    Reduce a vendor name to the form used for matching: lowercase alphanumeric words,
+    '&' spelled 'and', without trailing legal suffixes.
+
+    Args:
+        name (str): The raw vendor name.
+
+    Returns:
+        str: The normalized name; empty when nothing but punctuation or suffixes remains.
+    """
+    words = NON_ALNUM_PATTERN.sub(" ", name.lower().replace("&", " and ")).split()
+    while words and words[-1] in LEGAL_SUFFIXES:
+        words.pop()
+    return " ".join(words)
+
+
+def ngrams(text: str) -> set:
+    """Return the set of character n-grams of a text padded with one space on each side."""
+    padded = f" {text} "
+    return {padded[i : i + NGRAM_SIZE] for i in range(len(padded) - NGRAM_SIZE + 1)}
+
+
+def candidate_pairs(keys: list) -> np.ndarray:
+    """
+    Find pairs of normalized names worth scoring without comparing all pairs. Names are
+    blocked by an inverted index of their character n-grams: only names sharing
+    n-grams become candidates, and pairs whose n-gram sets overlap too little
+    (Dice coefficient below MIN_NGRAM_OVERLAP) are discarded.
+
+    Args:
+        keys (list): The distinct normalized names.
+
+    Returns:
+        np.ndarray: An (m, 2) array of candidate index pairs (i < j) into keys.
+    """
+    postings = {}
+    for index, key in enumerate(keys):
+        for gram in ngrams(key):
+            postings.setdefault(gram, []).append(index)
+
+    # The overlap is measured on the n-grams kept for blocking only
+    gram_counts = np.zeros(len(keys), dtype=np.int64)
+    pair_codes = []
+    for ids in postings.values():
+        if len(ids) <= MAX_POSTINGS:
+            ids = np.asarray(ids, dtype=np.int64)
+            gram_counts[ids] += 1
+            first, second = np.triu_indices(len(ids), 1)
+            pair_codes.append(ids[first] * len(keys) + ids[second])
+    if not pair_codes:
+        return np.empty((0, 2), dtype=np.int64)
+
+    # A pair appears once per shared n-gram, so counting codes gives the overlap
+    codes, shared = np.unique(np.concatenate(pair_codes), return_counts=True)
+    first, second = np.divmod(codes, len(keys))
+    dice = 2 * shared / (gram_counts[first] + gram_counts[second])
+    keep = dice >= MIN_NGRAM_OVERLAP
+    return np.column_stack([first[keep], second[keep]])
+
+
+def bounded_edit_distance(a: str, b: str, max_distance: int) -> int:
+    """
+    Compute the Levenshtein distance between two strings, giving up early once it is
+    certain to exceed max_distance. Only the diagonal band of width 2 * max_distance + 1
+    of the dynamic programming table is filled.
+
+    Returns:
+        int: The edit distance, or max_distance + 1 when it is larger than max_distance.
+    """
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    too_far = max_distance + 1
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        low, high = max(1, i - max_distance), min(len(b), i + max_distance)
+        current = [too_far] * (len(b) + 1)
+        if i <= max_distance:
+            current[0] = i
+        for j in range(low, high + 1):
+            current[j] = min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (a[i - 1] != b[j - 1]),
+            )
+        if min(current[low - 1 : high + 1]) > max_distance:
+            return too_far
+        previous = current
+    return min(previous[len(b)], too_far)
+
+
+def normalized_edit_distance(a: str, b: str, max_ratio: float) -> float:
+    """
+    Edit distance divided by the length of the longer string, or 1.0 when it exceeds
+    max_ratio.
+    """
+    longest = max(len(a), len(b))
+    max_distance = int(max_ratio * longest)
+    distance = bounded_edit_distance(a, b, max_distance)
+    return distance / longest if distance <= max_distance else 1.0
+
+
+def build_vendor_mapping(
+    vendor_counts: Counter,
+    curated: dict = None,
+    max_distance_ratio: float = MAX_DISTANCE_RATIO,
+) -> dict:
+    """
+    Map every vendor spelling to a canonical name.
+    Spellings are grouped by their normalized form, and each group is matched against
+    the groups already processed (most tenders first) through candidate_pairs and the
+    normalized edit distance. A group within max_distance_ratio of a processed group
+    joins its canonical name; otherwise its most frequent spelling becomes a new
+    canonical name. Spellings of the curated mapping keep their canonical name, and
+    new spellings close to them join it.
+
+    Args:
+        vendor_counts (Counter): Number of tenders per raw vendor spelling.
+        curated (dict): Hand-curated raw -> canonical pairs, as returned by process_mapping.
+        max_distance_ratio (float): Maximum normalized edit distance for a match.
+
+    Returns:
+        dict: The canonical name of every spelling in vendor_counts and curated.
+    """
+    curated = {raw: canonical.strip() for raw, canonical in (curated or {}).items()}
+    names = Counter({name: 0 for name in curated})
+    names.update(vendor_counts)
+
+    groups = {}
+    for name, count in names.items():
+        key = normalize_vendor(name)
+        if key:
+            groups.setdefault(key, Counter())[name] += count
+    keys = sorted(groups, key=lambda key: (-sum(groups[key].values()), key))
+    position = {key: index for index, key in enumerate(keys)}
+
+    neighbours = {}
+    for first, second in candidate_pairs(keys):
+        neighbours.setdefault(first, []).append(second)
+        neighbours.setdefault(second, []).append(first)
+
+    # Canonical name of every processed group; curated groups are processed first
+    canonical_of = {}
+    for key in keys:
+        curated_names = [name for name in groups[key] if name in curated]
+        if curated_names:
+            top = max(curated_names, key=lambda name: (names[name], name))
+            canonical_of[position[key]] = curated[top]
+
+    for index, key in enumerate(keys):
+        if index in canonical_of:
+            continue
+        best_distance, best_match = 1.0, None
+        for other in neighbours.get(index, []):
+            if other in canonical_of:
+                distance = normalized_edit_distance(
+                    key, keys[other], max_distance_ratio
+                )
+                if distance < best_distance:
+                    best_distance, best_match = distance, other
+        if best_match is not None:
+            canonical_of[index] = canonical_of[best_match]
+        else:
+            # Most frequent spelling, preferring ones the mapping format keeps intact
+            canonical_of[index] = max(
+                groups[key],
+                key=lambda name: (clean_string(name) == name, groups[key][name], name),
+            ).strip()
+
+    mapping = {}
+    for name in names:
+        if name in curated:
+            mapping[name] = curated[name]
+        elif normalize_vendor(name):
+            mapping[name] = canonical_of[position[normalize_vendor(name)]]
+        else:
+            mapping[name] = name.strip()
+    return mapping
+
+
+def write_mapping(mapping: dict, filepath: str, name: str = "vendor_mapping") -> int:
+    """
+    Write a mapping in the format read by load_mapping. Spellings that the format
+    cannot represent (containing ':', '"' or ',') are left out.
+
+    Args:
+        mapping (dict): Canonical names keyed by raw name.
+        filepath (str): The output file path.
+        name (str): The variable name on the first line of the file.
+
+    Returns:
+        int: The number of spellings left out.
+    """
+    skipped = 0
+    with open(filepath, "w") as file:
+        file.write(f"{name} = {{\n")
+        for raw in sorted(mapping, key=str.lower):
+            if ":" in raw or clean_string(raw) != raw:
+                skipped += 1
+                continue
+            file.write(f'    "{raw}": "{clean_string(mapping[raw])}",\n')
+        file.write("}\n")
+    return skipped
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Build a vendor mapping by fuzzy deduplication of vendor names."
+    )
+    parser.add_argument(
+        "snapshots",
+        nargs="*",
+        help="Snapshot CSV files. Defaults to the newest Awarded_Public_Tenders export.",
+    )
+    parser.add_argument("--output", default=GENERATED_VENDOR_MAPPING_FILEPATH)
+    parser.add_argument(
+        "--curated",
+        default=VENDOR_FIXED_FILEPATH,
+        help="Hand-curated mapping whose pairs are kept. Pass '' to ignore it.",
+    )
+    parser.add_argument("--max-distance", type=float, default=MAX_DISTANCE_RATIO)
+    args = parser.parse_args()
+
+    vendor_counts = Counter()
+    for snapshot in args.snapshots or [latest_snapshot_filepath()]:
+        vendor_counts.update(load_data(snapshot)["VENDOR"].dropna())
+    curated = (
+        process_mapping(load_mapping(args.curated), "OLD_VENDOR", "NEW_VENDOR")
+        if args.curated
+        else {}
+    )
+
+    start = time.perf_counter()
+    mapping = build_vendor_mapping(vendor_counts, curated, args.max_distance)
+    seconds = time.perf_counter() - start
+
+    skipped = write_mapping(mapping, args.output)
+    print(
+        f"Mapped {len(mapping)} vendor spellings to {len(set(mapping.values()))} "
+        f"vendors in {seconds:.1f}s ({skipped} spellings not representable); "
+        f"wrote {args.output}."
+    )
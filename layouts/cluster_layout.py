@@ -256,6 +256,14 @@ def create_cluster_layout(df, min_year, max_year, summary_data):
                         ),
                         width=12,
                     ),
+                    dbc.Col(
+                        dcc.Dropdown(
+                            id="entity-year-average-entities",
+                            multi=True,
+                            placeholder="Show more organizations...",
+                        ),
+                        width=12,
+                    ),
                     dbc.Col(
                         dcc.Loading(
                             id="loading-entity-year-average-amount",
@@ -267,7 +275,9 @@ def create_cluster_layout(df, min_year, max_year, summary_data):
                     dbc.Col(
                         html.P(
                             [
-                                "This line graph visualizes the average expenditure on tenders over time (by year) for different public organizations in Nova Scotia, Canada.",
+                                "This line graph visualizes the average expenditure on tenders over time (by year) for different public organizations in Nova Scotia, Canada. "
+                                "Lines are drawn for the organizations with the largest total awarded amounts; the gray band spans the yearly averages of all other organizations, "
+                                "and the dropdown above adds any of them as a line.",
                                 html.Ul(
                                     [
                                         html.Li(
@@ -390,6 +400,10 @@ def create_cluster_layout(df, min_year, max_year, summary_data):
             ),
             html.Div(id="word-cloud-entity-cluster"),
             dbc.Col(html.H4(id="topic-word-cloud-title-cluster"), width=12),
+            # Progress of the background job fitting the topics of a selection, and the
+            # selection it fits (set when the topics cannot be served right away)
+            html.Div(id="topic-progress-cluster", className="text-muted", style={"display": "none"}),
+            dcc.Store(id="topic-fit-request-cluster"),
             dcc.Loading(
                 id="loading-topic-word-cloud-cluster",
                 type="circle",
@@ -146,6 +146,10 @@ def create_entity_layout(df, min_year, max_year):
             ),
             html.Div(id="filter-message-amount-plot"),
             dbc.Col(html.H4(id="topic-word-cloud-title-entity"), width=12),
+            # Progress of the background job fitting the topics of a selection, and the
+            # selection it fits (set when the topics cannot be served right away)
+            html.Div(id="topic-progress", className="text-muted", style={"display": "none"}),
+            dcc.Store(id="topic-fit-request"),
             dcc.Loading(
                 id="loading-topic-word-cloud",
                 type="circle",
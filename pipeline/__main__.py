@@ -0,0 +1,29 @@
+import argparse
+import os
+
+from pipeline.build import build_artifacts
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        prog="python -m pipeline",
+        description="Offline pipeline producing the artifacts loaded by the dashboard.",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build_parser = commands.add_parser(
+        "build", help="Ingest a snapshot and build a new artifacts version."
+    )
+    build_parser.add_argument(
+        "snapshot",
+        nargs="?",
+        default=None,
+        help="Snapshot CSV file. Defaults to the newest Awarded_Public_Tenders export.",
+    )
+    build_parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    build_parser.add_argument(
+        "--force", action="store_true", help="Rebuild even if artifacts are up to date."
+    )
+    args = parser.parse_args()
+
+    if args.command == "build":
+        build_artifacts(args.snapshot, workers=args.workers, force=args.force)
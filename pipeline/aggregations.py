@@ -0,0 +1,347 @@
+import json
+from itertools import combinations
+
+import pandas as pd
+
+from utils.constants import CATEGORY_COLUMNS, ENTITY_CHART_TOP_N
+from visualizations.overview_line_charts import (
+    create_awarded_amount_line_chart,
+    create_entity_year_avg_chart,
+)
+from visualizations.wordcloud import word_cloud_frequencies
+
+# Every non-empty selection of the filter checklists
+FILTER_COMBINATIONS = [
+    combination
+    for size in range(1, len(CATEGORY_COLUMNS) + 1)
+    for combination in combinations(sorted(CATEGORY_COLUMNS), size)
+]
+
+
+def filter_key(selected_filters) -> str:
+    """Identify a checklist selection independently of the order it was clicked in."""
+    return "+".join(sorted(selected_filters))
+
+
+def apply_category_filters(df: pd.DataFrame, selected_filters) -> pd.DataFrame:
+    """Keep the tenders flagged with every selected category."""
+    for filter_col in selected_filters:
+        df = df[df[filter_col] == 1]
+    return df
+
+
+def prepare_entity_year_avg(df: pd.DataFrame) -> pd.DataFrame:
+    """Prepares data for the Entity-Year Average Awarded Amount plot."""
+    # Grouping by entity and awarded year, calculating the mean of the awarded amount
+    data = (
+        df[["AWARDED_AMOUNT"]]
+        .groupby([df.ENTITY, df["AWARDED_DATE"].dt.year], observed=True)
+        .mean()
+        .reset_index()
+    )
+    data.columns = ["ENTITY", "AWARDED_DATE", "AWARDED_AMOUNT"]
+    return data
+
+
+def prepare_entity_spend(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Prepares the total awarded amount of each entity, largest first, with CHARTED
+    marking the ENTITY_CHART_TOP_N entities drawn as lines in the Entity-Year chart.
+    """
+    data = (
+        df.groupby("ENTITY", observed=True)["AWARDED_AMOUNT"]
+        .sum()
+        .sort_values(ascending=False, kind="stable")
+        .reset_index()
+    )
+    data["ENTITY"] = data["ENTITY"].astype(str)
+    data["CHARTED"] = data.index < ENTITY_CHART_TOP_N
+    return data
+
+
+def prepare_cluster_year_avg(df: pd.DataFrame) -> pd.DataFrame:
+    """Prepares data for the Cluster-Year Average Awarded Amount plot."""
+    # Grouping by entity cluster and awarded year, calculating the mean of the awarded amount
+    data = (
+        df[["AWARDED_AMOUNT"]]
+        .groupby([df.ENTITY_CLUSTER_NAME, df["AWARDED_DATE"].dt.year], observed=True)
+        .mean()
+        .reset_index()
+    )
+    data.columns = ["ENTITY_CLUSTER_NAME", "AWARDED_DATE", "AWARDED_AMOUNT"]
+    return data
+
+
+def prepare_cluster_year_cumulative(df: pd.DataFrame) -> pd.DataFrame:
+    """Prepares data for the Cluster-Year Cumulative Awarded Amount plot."""
+    # Grouping by entity cluster and awarded year, calculating the sum, then cumulative sum
+    data = (
+        df[["AWARDED_AMOUNT"]]
+        .groupby([df.ENTITY_CLUSTER_NAME, df["AWARDED_DATE"].dt.year], observed=True)
+        .sum()
+        .groupby(level=0, observed=True)
+        .cumsum()
+        .reset_index()
+    )
+    data.columns = ["ENTITY_CLUSTER_NAME", "AWARDED_DATE", "AWARDED_AMOUNT"]
+    return data
+
+
+def prepare_overview_aggregates(df: pd.DataFrame) -> dict:
+    """
+    Prepares the data of the Entity-Year and Cluster-Year overview line charts.
+
+    Args:
+        df (pd.DataFrame): The preprocessed tenders.
+
+    Returns:
+        dict: The aggregated DataFrames keyed by chart name.
+    """
+    return {
+        "entity_year_avg": prepare_entity_year_avg(df),
+        "entity_spend": prepare_entity_spend(df),
+        "cluster_year_avg": prepare_cluster_year_avg(df),
+        "cluster_year_cumulative": prepare_cluster_year_cumulative(df),
+    }
+
+
+# Column drawn as one line per value in each cluster overview line chart
+OVERVIEW_CHART_COLORS = {
+    "cluster_year_avg": "ENTITY_CLUSTER_NAME",
+    "cluster_year_cumulative": "ENTITY_CLUSTER_NAME",
+}
+
+
+def prepare_overview_figures(aggregates: dict) -> dict:
+    """
+    Draws the Entity-Year and Cluster-Year overview line charts once, so the dashboard
+    serves them without rebuilding the figures.
+
+    Args:
+        aggregates (dict): The DataFrames returned by prepare_overview_aggregates.
+
+    Returns:
+        dict: The JSON-serializable figure of each chart, keyed by chart name. The
+            Entity-Year chart draws the entities marked CHARTED in entity_spend only.
+    """
+    entity_spend = aggregates["entity_spend"]
+    top_entities = entity_spend.loc[entity_spend["CHARTED"], "ENTITY"]
+    figures = {
+        "entity_year_avg": create_entity_year_avg_chart(
+            aggregates["entity_year_avg"], top_entities.tolist()
+        )
+    }
+    for name, color in OVERVIEW_CHART_COLORS.items():
+        figures[name] = create_awarded_amount_line_chart(aggregates[name], color)
+    return {name: json.loads(figure.to_json()) for name, figure in figures.items()}
+
+
+def summarize_tenders(df: pd.DataFrame, min_year: int, max_year: int) -> dict:
+    """
+    Collect the summary statistics shown at the top of the cluster analysis tab.
+
+    Args:
+        df (pd.DataFrame): The preprocessed tenders.
+        min_year (int): The first tender start year.
+        max_year (int): The last tender start year.
+
+    Returns:
+        dict: JSON-serializable summary statistics.
+    """
+    return {
+        "total_entities": int(df["ENTITY"].nunique()),
+        "total_vendors": int(df["VENDOR"].nunique()),
+        "min_awarded_amount": float(df["AWARDED_AMOUNT"].min()),
+        "max_awarded_amount": float(df["AWARDED_AMOUNT"].max()),
+        "min_awarded_year": int(min_year),
+        "max_awarded_year": int(max_year),
+    }
+
+
+def cluster_term_frequencies(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Compute the word cloud frequencies of the tender descriptions of every cluster and
+    every selection of the category filters.
+
+    Args:
+        df (pd.DataFrame): The preprocessed tenders.
+
+    Returns:
+        pd.DataFrame: One row per (ENTITY_CLUSTER_NAME, FILTERS, TERM) with its FREQUENCY.
+    """
+    tables = []
+    for cluster, cluster_df in df.groupby("ENTITY_CLUSTER_NAME", observed=True):
+        for combination in FILTER_COMBINATIONS:
+            filtered_df = apply_category_filters(cluster_df, combination)
+            text = " ".join(filtered_df["TENDER_DESCRIPTION"])
+            frequencies = word_cloud_frequencies(text) if text.strip() else {}
+            tables.append(
+                pd.DataFrame(
+                    {
+                        "ENTITY_CLUSTER_NAME": cluster,
+                        "FILTERS": filter_key(combination),
+                        "TERM": list(frequencies.keys()),
+                        "FREQUENCY": list(frequencies.values()),
+                    }
+                )
+            )
+    table = pd.concat(tables, ignore_index=True)
+    for column in ["ENTITY_CLUSTER_NAME", "FILTERS"]:
+        table[column] = table[column].astype("category")
+    return table
+
+
+def lookup_term_frequencies(
+    term_frequencies: pd.DataFrame, selected_cluster: str, selected_filters
+) -> dict:
+    """
+    Look up the precomputed word cloud frequencies of a cluster and filter selection.
+
+    Args:
+        term_frequencies (pd.DataFrame): The table returned by cluster_term_frequencies.
+        selected_cluster (str): The selected cluster.
+        selected_filters (list): The selected category filters.
+
+    Returns:
+        dict: Frequency of each term; empty when the selection has no descriptions.
+    """
+    rows = term_frequencies[
+        (term_frequencies["ENTITY_CLUSTER_NAME"] == selected_cluster)
+        & (term_frequencies["FILTERS"] == filter_key(selected_filters))
+    ]
+    return dict(zip(rows["TERM"], rows["FREQUENCY"]))
+
+
+# Dimensions of the tender cube; its cells are sorted by cluster and entity, so the
+# cells of one cluster or entity form a contiguous range
+CUBE_DIMENSIONS = [
+    "ENTITY_CLUSTER_NAME",
+    "ENTITY",
+    "VENDOR",
+    "GOODS",
+    "SERVICE",
+    "CONSTRUCTION",
+]
+
+
+def build_tender_cube(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Aggregate the tenders into a cube of tender counts and awarded amounts per entity,
+    vendor and category flags, from which the vendor bar charts of any selection are
+    rolled up. The cluster of each cell follows from its entity.
+
+    Args:
+        df (pd.DataFrame): The preprocessed tenders.
+
+    Returns:
+        pd.DataFrame: One row per non-empty cell with its CUBE_DIMENSIONS, TENDER_COUNT
+            and AWARDED_AMOUNT, sorted by ENTITY_CLUSTER_NAME and ENTITY. Tenders
+            without a vendor are kept in cells with a missing vendor.
+    """
+    cube = (
+        df.groupby(CUBE_DIMENSIONS, observed=True, dropna=False)
+        .agg(
+            TENDER_COUNT=("AWARDED_AMOUNT", "size"),
+            AWARDED_AMOUNT=("AWARDED_AMOUNT", "sum"),
+        )
+        .reset_index()
+    )
+    return cube.sort_values(
+        ["ENTITY_CLUSTER_NAME", "ENTITY"], kind="stable"
+    ).reset_index(drop=True)
+
+
+def cube_ranges(cube: pd.DataFrame, column: str) -> dict:
+    """
+    Locate the cells of each cluster or entity in the tender cube.
+
+    Args:
+        cube (pd.DataFrame): The cube returned by build_tender_cube.
+        column (str): 'ENTITY_CLUSTER_NAME' or 'ENTITY'.
+
+    Returns:
+        dict: A slice of cube positions per value of the column.
+    """
+    return {
+        value: slice(positions[0], positions[-1] + 1)
+        for value, positions in cube.groupby(column, observed=True).indices.items()
+    }
+
+
+def roll_up_vendors(cells: pd.DataFrame) -> tuple:
+    """
+    Roll up cells of the tender cube into the vendor bar charts of a selection.
+
+    Args:
+        cells (pd.DataFrame): The cube cells of the selection.
+
+    Returns:
+        tuple: The tender count ('VENDOR', 'FREQUENCY') and the awarded amount
+            ('VENDOR', 'AWARDED_AMOUNT') of every vendor of the selection, each sorted
+            in descending order.
+    """
+    vendors = cells.groupby("VENDOR", observed=True)[
+        ["TENDER_COUNT", "AWARDED_AMOUNT"]
+    ].sum()
+    tender_frequency = (
+        vendors["TENDER_COUNT"]
+        .sort_values(ascending=False, kind="stable")
+        .reset_index()
+    )
+    tender_frequency.columns = ["VENDOR", "FREQUENCY"]
+    awarded_amount = (
+        vendors["AWARDED_AMOUNT"]
+        .sort_values(ascending=False, kind="stable")
+        .reset_index()
+    )
+    return tender_frequency, awarded_amount
+
+
+def prepare_year_award_bars(filtered_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Prepares the bars of the Year vs Awarded Amount chart: one bar per tender, so each
+    bar opens the details of its tender.
+
+    Args:
+        filtered_df (pd.DataFrame): The selected tenders started in the selected year
+            range.
+
+    Returns:
+        pd.DataFrame: 'TENDER_ID', 'YEAR', 'VENDOR', 'ENTITY_CLUSTER_NAME' and
+            'AWARDED_AMOUNT' per tender, sorted by vendor (case-insensitively) and year.
+    """
+    tender_data = filtered_df[
+        [
+            "TENDER_START_DATE",
+            "AWARDED_AMOUNT",
+            "VENDOR",
+            "TENDER_ID",
+            "ENTITY_CLUSTER_NAME",
+        ]
+    ].dropna()
+
+    bar_df = pd.DataFrame(
+        {
+            "YEAR": tender_data["TENDER_START_DATE"].dt.year,
+            "AWARDED_AMOUNT": tender_data["AWARDED_AMOUNT"],
+            # Plain strings, so grouping does not expand every category
+            "VENDOR": tender_data["VENDOR"].astype(str),
+            "TENDER_ID": tender_data["TENDER_ID"],
+            "ENTITY_CLUSTER_NAME": tender_data["ENTITY_CLUSTER_NAME"].astype(str),
+        }
+    )
+
+    # Group by tender, summing the awarded amounts
+    grouped_df = (
+        bar_df.groupby(["TENDER_ID", "YEAR", "VENDOR", "ENTITY_CLUSTER_NAME"])[
+            "AWARDED_AMOUNT"
+        ]
+        .sum()
+        .reset_index()
+    )
+
+    # Sort by Vendor and Year
+    return grouped_df.sort_values(
+        by=["VENDOR", "YEAR"],
+        key=lambda col: col.str.lower() if col.name == "VENDOR" else col,
+    )
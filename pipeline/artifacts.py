@@ -0,0 +1,172 @@
+import glob
+import hashlib
+import json
+import os
+import shutil
+
+import pandas as pd
+from scipy import sparse
+
+from data_cleaning.cache import compute_cache_key, file_digest
+from utils.constants import ARTIFACTS_DIR
+
+# Source files whose content defines how artifacts are derived from the processed data
+_PIPELINE_DIR = os.path.dirname(os.path.abspath(__file__))
+_ROOT_DIR = os.path.dirname(_PIPELINE_DIR)
+PIPELINE_SOURCES = sorted(glob.glob(os.path.join(_PIPELINE_DIR, "*.py"))) + [
+    os.path.join(_ROOT_DIR, "visualizations", "wordcloud.py"),
+    os.path.join(_ROOT_DIR, "visualizations", "overview_line_charts.py"),
+    os.path.join(_ROOT_DIR, "utils", "topic_model.py"),
+    os.path.join(_ROOT_DIR, "utils", "topic_service.py"),
+    os.path.join(_ROOT_DIR, "utils", "embedding_store.py"),
+    os.path.join(_ROOT_DIR, "utils", "lightweight_topics.py"),
+    os.path.join(_ROOT_DIR, "utils", "constants.py"),
+]
+
+# Layout of the artifacts the dashboard reads, recorded in each version's manifest.
+# Increment it whenever an artifact is added, removed or changes its columns or keys,
+# so the dashboard refuses versions built for another layout instead of failing in a
+# callback.
+ARTIFACTS_SCHEMA = 2
+
+# Pointer to the version served by the dashboard
+CURRENT_FILENAME = "CURRENT"
+# Number of published versions kept on disk, including the current one
+KEPT_VERSIONS = 3
+
+
+def compute_artifacts_version(data_filepath: str) -> str:
+    """
+    Identify the artifacts built from a snapshot by the snapshot, the preprocessing
+    inputs (see compute_cache_key) and the pipeline code.
+
+    Args:
+        data_filepath (str): The snapshot CSV file.
+
+    Returns:
+        str: A short hexadecimal version string.
+    """
+    digest = hashlib.sha256(compute_cache_key(data_filepath).encode())
+    for filepath in PIPELINE_SOURCES:
+        digest.update(file_digest(filepath).encode())
+    return digest.hexdigest()[:16]
+
+
+def version_dir(version: str, artifacts_dir: str = ARTIFACTS_DIR) -> str:
+    """Return the directory holding one version of the artifacts."""
+    return os.path.join(artifacts_dir, version)
+
+
+def current_version(artifacts_dir: str = ARTIFACTS_DIR):
+    """
+    Read the version currently served by the dashboard.
+
+    Returns:
+        str | None: The version, or None when nothing has been published.
+    """
+    filepath = os.path.join(artifacts_dir, CURRENT_FILENAME)
+    if not os.path.exists(filepath):
+        return None
+    with open(filepath, "r") as file:
+        return file.read().strip() or None
+
+
+def publish_version(version: str, artifacts_dir: str = ARTIFACTS_DIR):
+    """
+    Point the dashboard at a fully written version and remove the oldest versions
+    beyond KEPT_VERSIONS. The pointer is replaced atomically, so a starting web process
+    always sees a complete version.
+    """
+    tmp_filepath = os.path.join(artifacts_dir, f"{CURRENT_FILENAME}.tmp")
+    with open(tmp_filepath, "w") as file:
+        file.write(version)
+    os.replace(tmp_filepath, os.path.join(artifacts_dir, CURRENT_FILENAME))
+
+    versions = sorted(
+        (
+            entry
+            for entry in os.scandir(artifacts_dir)
+            if entry.is_dir() and not entry.name.endswith(".tmp")
+        ),
+        key=lambda entry: entry.stat().st_mtime,
+        reverse=True,
+    )
+    for entry in versions[KEPT_VERSIONS:]:
+        if entry.name != version:
+            shutil.rmtree(entry.path, ignore_errors=True)
+
+
+def save_frame(df: pd.DataFrame, output_dir: str, name: str):
+    """Save a DataFrame artifact as Parquet."""
+    df.to_parquet(os.path.join(output_dir, f"{name}.parquet"))
+
+
+def load_frame(input_dir: str, name: str) -> pd.DataFrame:
+    """Load a DataFrame artifact saved by save_frame."""
+    return pd.read_parquet(os.path.join(input_dir, f"{name}.parquet"))
+
+
+def save_matrix(matrix, output_dir: str, name: str):
+    """Save a sparse matrix artifact in SciPy's compressed format."""
+    sparse.save_npz(os.path.join(output_dir, f"{name}.npz"), matrix)
+
+
+def load_matrix(input_dir: str, name: str):
+    """Load a sparse matrix artifact saved by save_matrix."""
+    return sparse.load_npz(os.path.join(input_dir, f"{name}.npz")).tocsr()
+
+
+def save_json(data: dict, output_dir: str, name: str):
+    """Save a dictionary artifact as indented JSON."""
+    with open(os.path.join(output_dir, f"{name}.json"), "w") as file:
+        json.dump(data, file, indent=2)
+
+
+def load_json(input_dir: str, name: str) -> dict:
+    """Load a dictionary artifact saved by save_json."""
+    with open(os.path.join(input_dir, f"{name}.json"), "r") as file:
+        return json.load(file)
+
+
+def load_artifacts(artifacts_dir: str = ARTIFACTS_DIR) -> dict:
+    """
+    Load the current version of the dashboard artifacts. Nothing is computed here;
+    the artifacts are written by `python -m pipeline build`.
+
+    Args:
+        artifacts_dir (str): The directory holding the versioned artifacts.
+
+    Returns:
+        dict: The artifacts listed in the version's manifest keyed by name, plus
+            'version', 'min_year' and 'max_year'.
+
+    Raises:
+        FileNotFoundError: When no version is published.
+        RuntimeError: When the current version was built for another ARTIFACTS_SCHEMA.
+    """
+    version = current_version(artifacts_dir)
+    if version is None or not os.path.isdir(version_dir(version, artifacts_dir)):
+        raise FileNotFoundError(
+            f"No dashboard artifacts found in {artifacts_dir}. "
+            "Run `python -m pipeline build` first."
+        )
+
+    input_dir = version_dir(version, artifacts_dir)
+    manifest = load_json(input_dir, "manifest")
+    if manifest.get("schema") != ARTIFACTS_SCHEMA:
+        raise RuntimeError(
+            f"Dashboard artifacts {version} in {artifacts_dir} use schema "
+            f"{manifest.get('schema', 1)}, but the dashboard reads schema "
+            f"{ARTIFACTS_SCHEMA}. Run `python -m pipeline build` to rebuild them."
+        )
+    artifacts = {"version": version, "manifest": manifest}
+    for name in manifest["frames"]:
+        artifacts[name] = load_frame(input_dir, name)
+    for name in manifest.get("matrices", []):
+        artifacts[name] = load_matrix(input_dir, name)
+    for name in manifest["documents"]:
+        artifacts[name] = load_json(input_dir, name)
+
+    artifacts["min_year"] = artifacts["summary"]["min_awarded_year"]
+    artifacts["max_year"] = artifacts["summary"]["max_awarded_year"]
+    return artifacts
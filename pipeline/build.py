@@ -0,0 +1,209 @@
+import os
+import shutil
+import time
+from datetime import datetime, timezone
+
+import pandas as pd
+from scipy import sparse
+
+from data_cleaning.data_loader import get_data, latest_snapshot_filepath
+from pipeline.aggregations import (
+    build_tender_cube,
+    cluster_term_frequencies,
+    prepare_overview_aggregates,
+    prepare_overview_figures,
+    summarize_tenders,
+)
+from pipeline.artifacts import (
+    ARTIFACTS_SCHEMA,
+    compute_artifacts_version,
+    current_version,
+    publish_version,
+    save_frame,
+    save_json,
+    save_matrix,
+    version_dir,
+)
+from pipeline.global_topics import build_global_topics
+from pipeline.topic_index import build_topic_index
+from utils.embedding_store import EmbeddingStore, ReducedEmbeddings
+from utils.lightweight_topics import document_term_matrix
+from utils.topic_service import load_embedding_model
+from utils.constants import ARTIFACTS_DIR
+
+
+def build_tender_artifacts(
+    df: pd.DataFrame, min_year: int, max_year: int, workers: int
+) -> dict:
+    """The preprocessed tenders and their summary statistics."""
+    return {"tenders": df, "summary": summarize_tenders(df, min_year, max_year)}
+
+
+def build_overview_artifacts(
+    df: pd.DataFrame, min_year: int, max_year: int, workers: int
+) -> dict:
+    """
+    The data of the Entity-Year and Cluster-Year overview line charts, and the charts
+    themselves as figure JSON.
+    """
+    aggregates = prepare_overview_aggregates(df)
+    return {**aggregates, "overview_figures": prepare_overview_figures(aggregates)}
+
+
+def build_tender_cube_artifacts(
+    df: pd.DataFrame, min_year: int, max_year: int, workers: int
+) -> dict:
+    """The tender cube the vendor bar charts of every selection are rolled up from."""
+    return {"tender_cube": build_tender_cube(df)}
+
+
+def build_term_frequency_artifacts(
+    df: pd.DataFrame, min_year: int, max_year: int, workers: int
+) -> dict:
+    """The word cloud frequencies of every cluster and category filter selection."""
+    return {"cluster_term_frequencies": cluster_term_frequencies(df)}
+
+
+def build_document_term_artifacts(
+    df: pd.DataFrame, min_year: int, max_year: int, workers: int
+) -> dict:
+    """The term counts of every description, shared by the lightweight topic backends."""
+    counts, terms = document_term_matrix(df["TENDER_DESCRIPTION"])
+    return {"document_term_matrix": counts, "document_terms": {"terms": terms}}
+
+
+def build_embedding_artifacts(
+    df: pd.DataFrame, min_year: int, max_year: int, workers: int
+) -> dict:
+    """
+    Add the descriptions without a stored sentence embedding to the embedding store,
+    and their UMAP reductions to the reduced embeddings, so topic fits look them up
+    instead of computing them.
+    """
+    store = EmbeddingStore()
+    embedding_model = load_embedding_model(store.model_name)
+    if embedding_model is None:
+        print("sentence-transformers is not installed; descriptions are not embedded.")
+        added = 0
+    else:
+        added = store.add(df["TENDER_DESCRIPTION"], embedding_model)
+    print(f"Embedded {added} new descriptions ({len(store)} stored).")
+
+    # Reduce the new embeddings once, so topic fits can skip UMAP
+    reduced_embeddings = ReducedEmbeddings(store)
+    try:
+        reduced = reduced_embeddings.update()
+        print(f"Reduced {reduced} new embeddings ({len(reduced_embeddings)} stored).")
+    except ImportError:
+        print("umap-learn is not installed; embeddings are not reduced.")
+    return {
+        "embedding_store": {
+            "model": store.model_name,
+            "stored": len(store),
+            "added": added,
+            "reduced": len(reduced_embeddings),
+            "umap_params": reduced_embeddings.params,
+        }
+    }
+
+
+def build_topic_index_artifacts(
+    df: pd.DataFrame, min_year: int, max_year: int, workers: int
+) -> dict:
+    """The topic models of every cluster, entity and category filter selection."""
+    return build_topic_index(df, workers=workers)
+
+
+def build_global_topic_artifacts(
+    df: pd.DataFrame, min_year: int, max_year: int, workers: int
+) -> dict:
+    """The corpus-wide topic model projected onto selections in "global" topic mode."""
+    return build_global_topics(df)
+
+
+# Build steps in execution order. Each step receives the preprocessed tenders, the year
+# range and the number of worker processes of the build, and returns its artifacts by
+# name: DataFrames are saved as Parquet, sparse matrices as NPZ, and dictionaries as JSON.
+BUILD_STEPS = [
+    ("Tenders and summary", build_tender_artifacts),
+    ("Overview aggregates", build_overview_artifacts),
+    ("Tender cube", build_tender_cube_artifacts),
+    ("Word cloud term frequencies", build_term_frequency_artifacts),
+    ("Document-term matrix", build_document_term_artifacts),
+    ("Description embeddings", build_embedding_artifacts),
+    ("Topic index", build_topic_index_artifacts),
+    ("Global topic model", build_global_topic_artifacts),
+]
+
+
+def build_artifacts(
+    snapshot: str = None,
+    workers: int = 1,
+    force: bool = False,
+    artifacts_dir: str = ARTIFACTS_DIR,
+) -> str:
+    """
+    Run the offline pipeline: ingest and preprocess a snapshot, run every build step,
+    and publish the results as a new artifacts version for the dashboard. Nothing is
+    rebuilt when the current version already matches the snapshot and the code.
+
+    Args:
+        snapshot (str): The snapshot CSV file. Defaults to the newest export.
+        workers (int): Number of processes used to clean tender descriptions and to
+            fit the topic index.
+        force (bool): Whether to rebuild an up-to-date version.
+        artifacts_dir (str): The directory holding the versioned artifacts.
+
+    Returns:
+        str: The published version.
+    """
+    snapshot = snapshot or latest_snapshot_filepath()
+    version = compute_artifacts_version(snapshot)
+    output_dir = version_dir(version, artifacts_dir)
+    if (
+        not force
+        and current_version(artifacts_dir) == version
+        and os.path.isdir(output_dir)
+    ):
+        print(f"Artifacts {version} for {snapshot} are up to date.")
+        return version
+
+    start = time.perf_counter()
+    df, min_year, max_year = get_data(snapshot, workers=workers)
+    print(f"Ingestion and preprocessing: {time.perf_counter() - start:.1f}s")
+
+    # Write into a staging directory so a failed build never leaves a partial version
+    staging_dir = f"{output_dir}.tmp"
+    shutil.rmtree(staging_dir, ignore_errors=True)
+    os.makedirs(staging_dir)
+
+    manifest = {
+        "version": version,
+        "schema": ARTIFACTS_SCHEMA,
+        "snapshot": snapshot,
+        "built_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "row_count": len(df),
+        "frames": [],
+        "matrices": [],
+        "documents": [],
+    }
+    for step_name, step in BUILD_STEPS:
+        start = time.perf_counter()
+        for name, artifact in step(df, min_year, max_year, workers).items():
+            if isinstance(artifact, pd.DataFrame):
+                save_frame(artifact, staging_dir, name)
+                manifest["frames"].append(name)
+            elif sparse.issparse(artifact):
+                save_matrix(artifact, staging_dir, name)
+                manifest["matrices"].append(name)
+            else:
+                save_json(artifact, staging_dir, name)
+                manifest["documents"].append(name)
+        print(f"{step_name}: {time.perf_counter() - start:.1f}s")
+    save_json(manifest, staging_dir, "manifest")
+
+    shutil.rmtree(output_dir, ignore_errors=True)
+    os.replace(staging_dir, output_dir)
+    publish_version(version, artifacts_dir)
+    print(f"Published artifacts {version} for {snapshot} ({len(df)} tenders).")
+    return version
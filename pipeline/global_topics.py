@@ -0,0 +1,510 @@
+import json
+import os
+import shutil
+from datetime import datetime, timezone
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from utils.constants import (
+    GLOBAL_TOP_TOPICS,
+    GLOBAL_TOPIC_NEW_TOPIC_DOCUMENTS,
+    GLOBAL_TOPIC_REFIT_SHARE,
+    GLOBAL_TOPICS_DIR,
+)
+from utils.embedding_store import EmbeddingStore, text_keys
+from utils.topic_model import (
+    MIN_UNIQUE_DESCRIPTIONS,
+    TOPICS_OK,
+    TOPICS_TOO_FEW,
+    awarded_years,
+)
+from utils.topic_service import TopicService
+
+# Files making up the state of the global topic model
+ASSIGNMENTS_FILENAME = "assignments.npz"
+CENTROIDS_FILENAME = "centroids.npz"
+KEYWORDS_FILENAME = "keywords.parquet"
+META_FILENAME = "meta.json"
+
+# BERTopic's topic of descriptions matching no topic
+OUTLIER_TOPIC = -1
+# A new description joins its most similar topic when it is at least as similar to the
+# topic's centroid as this quantile of the descriptions the topic was formed from
+ASSIGN_QUANTILE = 0.05
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    """Scale vectors to unit length, so dot products are cosine similarities."""
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def _topic_membership(positions: np.ndarray, topic_count: int):
+    """A sparse topics x descriptions indicator matrix of topic memberships."""
+    return sparse.csr_matrix(
+        (np.ones(len(positions)), (positions, np.arange(len(positions)))),
+        shape=(topic_count, len(positions)),
+    )
+
+
+def _keyword_frame(topic_words: dict) -> pd.DataFrame:
+    """Flatten the (word, score) pairs of topics into TOPIC, RANK, WORD, SCORE rows."""
+    return pd.DataFrame(
+        [
+            (int(topic_num), rank, word, score)
+            for topic_num, words in sorted(topic_words.items())
+            for rank, (word, score) in enumerate(words)
+        ],
+        columns=["TOPIC", "RANK", "WORD", "SCORE"],
+    )
+
+
+def _fit_with_service(filtered_df: pd.DataFrame):
+    """
+    Fit a BERTopic model on tenders with the topic service.
+
+    Returns:
+        dict | None: The fit_topics result, or None when the fit failed.
+    """
+    with TopicService(workers=1) as service:
+        result = service.fit(filtered_df)
+    if result["status"] != TOPICS_OK:
+        print(f"Global topic model not fitted: {result['status']}")
+        return None
+    return result
+
+
+class GlobalTopicModel:
+    """
+    The corpus-wide topic model, kept up to date across snapshots.
+
+    Topics are assigned per unique description, addressed by its content hash (see
+    utils.embedding_store.text_keys), and each topic is represented by the centroid of
+    the normalized sentence embeddings of its descriptions. New descriptions are folded
+    in by assigning them to the most similar centroid; those similar to no topic are
+    held as pending outliers until enough of them gather to be clustered into new
+    topics. A full refit is left to build_global_topics, once enough descriptions were
+    folded in since the last one.
+    """
+
+    def __init__(self, keys, topics, pending, centroids, keywords, meta):
+        self.keys = keys
+        self.topics = topics
+        self.pending = pending
+        self.centroid_topics = centroids["topics"]
+        self.centroid_sums = centroids["sums"]
+        self.centroid_sizes = centroids["sizes"]
+        self.thresholds = centroids["thresholds"]
+        self.keywords = keywords
+        self.meta = meta
+        self.index = pd.Index(keys)
+
+    @classmethod
+    def load(cls, directory: str = GLOBAL_TOPICS_DIR):
+        """
+        Load the state saved by save.
+
+        Returns:
+            GlobalTopicModel | None: The model, or None when none was saved.
+        """
+        meta_filepath = os.path.join(directory, META_FILENAME)
+        if not os.path.exists(meta_filepath):
+            return None
+        with open(meta_filepath, "r") as file:
+            meta = json.load(file)
+        assignments = np.load(os.path.join(directory, ASSIGNMENTS_FILENAME))
+        centroids = dict(np.load(os.path.join(directory, CENTROIDS_FILENAME)))
+        keywords = pd.read_parquet(os.path.join(directory, KEYWORDS_FILENAME))
+        return cls(
+            assignments["keys"],
+            assignments["topics"],
+            assignments["pending"],
+            centroids,
+            keywords,
+            meta,
+        )
+
+    def save(self, directory: str = GLOBAL_TOPICS_DIR):
+        """Write the state, replacing the previous one only once fully written."""
+        staging_dir = f"{directory}.tmp"
+        shutil.rmtree(staging_dir, ignore_errors=True)
+        os.makedirs(staging_dir)
+        np.savez(
+            os.path.join(staging_dir, ASSIGNMENTS_FILENAME),
+            keys=self.keys,
+            topics=self.topics,
+            pending=self.pending,
+        )
+        np.savez(
+            os.path.join(staging_dir, CENTROIDS_FILENAME),
+            topics=self.centroid_topics,
+            sums=self.centroid_sums,
+            sizes=self.centroid_sizes,
+            thresholds=self.thresholds,
+        )
+        self.keywords.to_parquet(os.path.join(staging_dir, KEYWORDS_FILENAME))
+        with open(os.path.join(staging_dir, META_FILENAME), "w") as file:
+            json.dump(self.meta, file, indent=2)
+        shutil.rmtree(directory, ignore_errors=True)
+        os.replace(staging_dir, directory)
+
+    @classmethod
+    def fit(
+        cls,
+        df: pd.DataFrame,
+        descriptions: np.ndarray,
+        keys: np.ndarray,
+        vectors: np.ndarray,
+        model_name: str,
+    ):
+        """
+        Fit the model from scratch on every tender.
+
+        Args:
+            df (pd.DataFrame): The preprocessed tenders.
+            descriptions (np.ndarray): The unique descriptions of the tenders.
+            keys (np.ndarray): The text keys of the descriptions.
+            vectors (np.ndarray): The normalized embeddings of the descriptions, or
+                None when they are not stored; no centroids are computed then.
+            model_name (str): The sentence embedding model of the vectors.
+
+        Returns:
+            GlobalTopicModel | None: The model, or None when the fit failed.
+        """
+        result = _fit_with_service(df)
+        if result is None:
+            return None
+        description_topics = pd.Series(
+            result["topics"].to_numpy(), index=df["TENDER_DESCRIPTION"].to_numpy()
+        )
+        description_topics = description_topics[~description_topics.index.duplicated()]
+        topics = description_topics.reindex(descriptions).to_numpy(dtype=int)
+
+        model = cls(
+            keys,
+            topics,
+            np.zeros(len(keys), dtype=bool),
+            {
+                "topics": np.array([], dtype=int),
+                "sums": np.empty((0, 0 if vectors is None else vectors.shape[1])),
+                "sizes": np.array([], dtype=int),
+                "thresholds": np.array([]),
+            },
+            # The outliers have keywords but no centroid
+            _keyword_frame(
+                {
+                    topic_num: words
+                    for topic_num, words in result["keywords"].items()
+                    if topic_num == OUTLIER_TOPIC
+                }
+            ),
+            {
+                "embedding_model": model_name,
+                "fitted_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                "fitted_documents": len(keys),
+                "folded_documents": 0,
+                "next_topic": int(topics.max(initial=OUTLIER_TOPIC)) + 1,
+            },
+        )
+        model._add_topics(topics, vectors, result["keywords"])
+        return model
+
+    def _add_topics(self, topics: np.ndarray, vectors: np.ndarray, keywords: dict):
+        """
+        Add the centroids and keywords of newly formed topics.
+
+        Args:
+            topics (np.ndarray): The new topic of each member description, or
+                OUTLIER_TOPIC for descriptions joining none.
+            vectors (np.ndarray): The normalized embeddings of the descriptions.
+            keywords (dict): The (word, score) pairs of each new topic.
+        """
+        topic_ids = np.unique(topics[topics != OUTLIER_TOPIC])
+        self.keywords = pd.concat(
+            [
+                self.keywords,
+                _keyword_frame(
+                    {topic_num: keywords[topic_num] for topic_num in topic_ids}
+                ),
+            ],
+            ignore_index=True,
+        )
+        if vectors is None or not len(topic_ids):
+            return
+
+        members = topics != OUTLIER_TOPIC
+        positions = np.searchsorted(topic_ids, topics[members])
+        member_vectors = vectors[members]
+        sums = _topic_membership(positions, len(topic_ids)) @ member_vectors
+        similarities = np.einsum(
+            "ij,ij->i", member_vectors, _normalize(sums)[positions]
+        )
+        thresholds = (
+            pd.Series(similarities).groupby(positions).quantile(ASSIGN_QUANTILE)
+        )
+        self.centroid_topics = np.concatenate([self.centroid_topics, topic_ids])
+        self.centroid_sums = np.concatenate([self.centroid_sums, sums])
+        self.centroid_sizes = np.concatenate(
+            [self.centroid_sizes, np.bincount(positions, minlength=len(topic_ids))]
+        )
+        self.thresholds = np.concatenate([self.thresholds, thresholds.to_numpy()])
+
+    def needs_refit(self, keys: np.ndarray, model_name: str) -> str:
+        """
+        Tell whether folding in descriptions would drift too far from the last full
+        fit.
+
+        Returns:
+            str: The reason for a full refit, or an empty string.
+        """
+        if self.meta["embedding_model"] != model_name:
+            return f"the embedding model changed to {model_name}"
+        new_count = int((self.index.get_indexer(keys) < 0).sum())
+        folded = self.meta["folded_documents"] + new_count
+        if folded >= GLOBAL_TOPIC_REFIT_SHARE * self.meta["fitted_documents"]:
+            return (
+                f"{folded} descriptions were added since the last full fit on "
+                f"{self.meta['fitted_documents']}"
+            )
+        return ""
+
+    def fold_in(
+        self,
+        df: pd.DataFrame,
+        descriptions: np.ndarray,
+        keys: np.ndarray,
+        vectors: np.ndarray,
+    ) -> dict:
+        """
+        Assign the descriptions that are new to the model to its topics, updating the
+        topic centroids, and cluster the pending outliers into new topics once there
+        are GLOBAL_TOPIC_NEW_TOPIC_DOCUMENTS of them.
+
+        Args:
+            df (pd.DataFrame): The preprocessed tenders.
+            descriptions (np.ndarray): The unique descriptions of the tenders.
+            keys (np.ndarray): The text keys of the descriptions.
+            vectors (np.ndarray): The normalized embeddings of the descriptions.
+
+        Returns:
+            dict: Counts of the 'new' descriptions, those 'assigned' to a topic, the
+                'new_topics' formed, and the descriptions still 'pending'.
+        """
+        new = self.index.get_indexer(keys) < 0
+        new_vectors = vectors[new]
+        new_topics = np.full(len(new_vectors), OUTLIER_TOPIC)
+        assigned = np.zeros(len(new_vectors), dtype=bool)
+        if len(self.centroid_topics) and len(new_vectors):
+            similarities = new_vectors @ _normalize(self.centroid_sums).T
+            best = similarities.argmax(axis=1)
+            best_similarities = similarities[np.arange(len(best)), best]
+            assigned = best_similarities >= self.thresholds[best]
+            new_topics[assigned] = self.centroid_topics[best[assigned]]
+            # Move the centroids towards the descriptions they gained
+            self.centroid_sums = self.centroid_sums + (
+                _topic_membership(best[assigned], len(self.centroid_topics))
+                @ new_vectors[assigned]
+            )
+            self.centroid_sizes = self.centroid_sizes + np.bincount(
+                best[assigned], minlength=len(self.centroid_topics)
+            )
+
+        self.keys = np.concatenate([self.keys, keys[new]])
+        self.topics = np.concatenate([self.topics, new_topics])
+        self.pending = np.concatenate([self.pending, ~assigned])
+        self.index = pd.Index(self.keys)
+        self.meta["folded_documents"] += int(new.sum())
+
+        positions = self.index.get_indexer(keys)
+        pending = self.pending[positions]
+        formed = 0
+        if pending.sum() >= GLOBAL_TOPIC_NEW_TOPIC_DOCUMENTS:
+            formed = self._form_topics(
+                df, descriptions[pending], positions[pending], vectors[pending]
+            )
+        return {
+            "new": int(new.sum()),
+            "assigned": int(assigned.sum()),
+            "new_topics": formed,
+            "pending": int(self.pending[positions].sum()),
+        }
+
+    def _form_topics(
+        self,
+        df: pd.DataFrame,
+        descriptions: np.ndarray,
+        positions: np.ndarray,
+        vectors: np.ndarray,
+    ) -> int:
+        """
+        Cluster pending descriptions into new topics; descriptions joining none stay
+        pending.
+
+        Returns:
+            int: Number of topics formed.
+        """
+        pool_df = df[df["TENDER_DESCRIPTION"].isin(descriptions)].drop_duplicates(
+            "TENDER_DESCRIPTION"
+        )
+        result = _fit_with_service(pool_df)
+        if result is None:
+            return 0
+        pool_topics = (
+            pd.Series(
+                result["topics"].to_numpy(),
+                index=pool_df["TENDER_DESCRIPTION"].to_numpy(),
+            )
+            .reindex(descriptions)
+            .to_numpy(dtype=int)
+        )
+        # Number the new topics after the existing ones
+        formed_topics = np.unique(pool_topics[pool_topics != OUTLIER_TOPIC])
+        topic_ids = dict(
+            zip(
+                formed_topics,
+                range(
+                    self.meta["next_topic"],
+                    self.meta["next_topic"] + len(formed_topics),
+                ),
+            )
+        )
+        topics = np.array(
+            [topic_ids.get(topic_num, OUTLIER_TOPIC) for topic_num in pool_topics]
+        )
+        self._add_topics(
+            topics,
+            vectors,
+            {
+                topic_ids[topic_num]: result["keywords"][topic_num]
+                for topic_num in formed_topics
+            },
+        )
+        members = topics != OUTLIER_TOPIC
+        self.topics[positions[members]] = topics[members]
+        self.pending[positions[members]] = False
+        self.meta["next_topic"] += len(formed_topics)
+        return len(formed_topics)
+
+    def description_topics(self, keys: np.ndarray) -> np.ndarray:
+        """Return the topic of each description key."""
+        return self.topics[self.index.get_indexer(keys)]
+
+
+def build_global_topics(df: pd.DataFrame, state_dir: str = GLOBAL_TOPICS_DIR) -> dict:
+    """
+    Bring the corpus-wide topic model up to date with the tenders, so every selection
+    of the dashboard shares the same topic ids.
+
+    Descriptions new since the previous build are folded into the saved model (see
+    GlobalTopicModel); the model is refitted from scratch when none was saved, when the
+    descriptions have no stored embedding, or once GLOBAL_TOPIC_REFIT_SHARE of its
+    descriptions were folded in since its last full fit.
+
+    Args:
+        df (pd.DataFrame): The preprocessed tenders.
+        state_dir (str): The directory holding the saved global topic model.
+
+    Returns:
+        dict: 'global_topics', the TOPIC and AWARDED_YEAR of each tender (indexed like
+            df), 'global_topic_keywords', the keywords of each topic (TOPIC, RANK,
+            WORD, SCORE), and 'global_topic_update', how the model was updated. Empty
+            when the fit failed.
+    """
+    descriptions = pd.unique(df["TENDER_DESCRIPTION"])
+    keys = text_keys(descriptions)
+    store = EmbeddingStore()
+    try:
+        vectors = _normalize(np.asarray(store.get(descriptions), dtype=np.float32))
+    except KeyError:
+        vectors = None
+
+    model = GlobalTopicModel.load(state_dir)
+    if model is None:
+        reason = "no global topic model was saved"
+    elif vectors is None:
+        reason = "the descriptions have no stored embeddings"
+    else:
+        reason = model.needs_refit(keys, store.model_name)
+
+    if reason:
+        print(f"Refitting the global topic model: {reason}.")
+        model = GlobalTopicModel.fit(df, descriptions, keys, vectors, store.model_name)
+        if model is None:
+            return {}
+        update = {"refit": True, "reason": reason}
+    else:
+        update = {"refit": False, **model.fold_in(df, descriptions, keys, vectors)}
+        print(
+            f"Folded {update['new']} new descriptions into the global topic model: "
+            f"{update['assigned']} assigned, {update['new_topics']} new topics, "
+            f"{update['pending']} pending."
+        )
+    # Without embeddings there are no centroids to fold new descriptions into
+    if vectors is not None:
+        model.save(state_dir)
+
+    tender_topics = model.description_topics(keys)[
+        pd.Index(descriptions).get_indexer(df["TENDER_DESCRIPTION"])
+    ]
+    topics = pd.DataFrame(
+        {"TOPIC": tender_topics, "AWARDED_YEAR": awarded_years(df)}, index=df.index
+    )
+    print(f"Global topic model: {topics['TOPIC'].nunique()} topics")
+    return {
+        "global_topics": topics,
+        "global_topic_keywords": model.keywords,
+        "global_topic_update": {**model.meta, **update},
+    }
+
+
+def project_global_topics(artifacts: dict, filtered_df: pd.DataFrame):
+    """
+    Aggregate the global topic model over a selection of tenders: the selection's most
+    frequent topics, their keywords and their counts per awarded year.
+
+    Args:
+        artifacts (dict): The loaded dashboard artifacts.
+        filtered_df (pd.DataFrame): The selected tenders.
+
+    Returns:
+        dict | None: The result in the shape returned by utils.topic_model.fit_topics,
+            limited to the GLOBAL_TOP_TOPICS most frequent topics, or None when no
+            global topic model was built.
+    """
+    if "global_topics" not in artifacts:
+        return None
+    unique_descriptions = filtered_df["TENDER_DESCRIPTION"].dropna().unique()
+    if len(unique_descriptions) < MIN_UNIQUE_DESCRIPTIONS:
+        return {"status": TOPICS_TOO_FEW}
+
+    selection = artifacts["global_topics"].loc[filtered_df.index]
+    top_topics = selection["TOPIC"].value_counts().index[:GLOBAL_TOP_TOPICS]
+
+    keyword_rows = artifacts["global_topic_keywords"]
+    keyword_rows = keyword_rows[keyword_rows["TOPIC"].isin(top_topics)].sort_values(
+        ["TOPIC", "RANK"]
+    )
+    topic_words = {
+        int(topic_num): list(zip(rows["WORD"], rows["SCORE"]))
+        for topic_num, rows in keyword_rows.groupby("TOPIC")
+    }
+
+    year_counts = (
+        selection[selection["TOPIC"].isin(top_topics)]
+        .groupby(["AWARDED_YEAR", "TOPIC"])
+        .size()
+        .unstack(fill_value=0)
+    )
+    year_counts.index = year_counts.index.astype(int)
+    return {
+        "status": TOPICS_OK,
+        "topics": selection["TOPIC"],
+        # Most frequent topics first
+        "keywords": {
+            int(topic_num): topic_words.get(int(topic_num), [])
+            for topic_num in top_topics
+        },
+        "year_counts": year_counts,
+    }
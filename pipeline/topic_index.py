@@ -0,0 +1,265 @@
+import pandas as pd
+
+from pipeline.aggregations import (
+    FILTER_COMBINATIONS,
+    apply_category_filters,
+    filter_key,
+)
+from pipeline.global_topics import project_global_topics
+from utils.constants import (
+    TOPIC_BACKEND,
+    TOPIC_MODE,
+    TOPIC_QUEUE_TIMEOUT,
+    TOPIC_RESULT_CACHE_SIZE,
+)
+from utils.lightweight_topics import fit_lightweight_topics
+from utils.lru_cache import LRUCache
+from utils.topic_model import TOPICS_BUSY, TOPICS_FAILED, TOPICS_OK
+from utils.topic_service import TopicService, TopicServiceBusy, get_topic_service
+
+# Selections the topic visualizations are drawn for, keyed by scope, with the column
+# the selection filters on
+TOPIC_SCOPES = {"cluster": "ENTITY_CLUSTER_NAME", "entity": "ENTITY"}
+# Columns identifying one selection in every topic index table
+SELECTION_COLUMNS = ["SCOPE", "NAME", "FILTERS"]
+
+# Topic results shared by the topic word cloud and topic timeline callbacks, which
+# fire together for every selection. Failed fits are not kept, so they are retried
+topic_result_cache = LRUCache(
+    TOPIC_RESULT_CACHE_SIZE,
+    cacheable=lambda result: result["status"] != TOPICS_FAILED,
+)
+
+
+def build_topic_index(df: pd.DataFrame, workers: int = None) -> dict:
+    """
+    Fit a topic model for every cluster and every entity under every selection of the
+    category filters, and flatten the results into tables the callbacks look up. The
+    fits run in parallel on a TopicService.
+
+    Args:
+        df (pd.DataFrame): The preprocessed tenders.
+        workers (int): Number of worker processes. Defaults to the number of CPUs.
+
+    Returns:
+        dict: The topic index tables:
+            'topic_status': the outcome of each selection (SCOPE, NAME, FILTERS, STATUS);
+            'topic_assignments': the topic of each tender of each selection (ROW is the
+                tender's index label);
+            'topic_keywords': the keywords of each topic (ORDER is the topic's order of
+                first appearance, RANK the keyword's position);
+            'topic_year_counts': tenders per awarded year and topic.
+    """
+    jobs = []
+    with TopicService(workers) as service:
+        print(f"Fitting topic models on {service.workers} worker processes")
+        for scope, column in TOPIC_SCOPES.items():
+            for name, selection_df in df.groupby(column, observed=True):
+                for combination in FILTER_COMBINATIONS:
+                    # Submitting blocks while the service queue is full, so only a
+                    # bounded number of selections are held in memory
+                    future = service.submit(
+                        apply_category_filters(selection_df, combination)
+                    )
+                    jobs.append((scope, name, filter_key(combination), future))
+
+        status_rows, assignments, keywords, year_counts = [], [], [], []
+        for scope, name, filters, future in jobs:
+            result = future.result()
+            status_rows.append((scope, name, filters, result["status"]))
+            if result["status"] != TOPICS_OK:
+                continue
+
+            assignments.append(
+                pd.DataFrame(
+                    {
+                        "ROW": result["topics"].index,
+                        "TOPIC": result["topics"].to_numpy(),
+                    }
+                ).assign(SCOPE=scope, NAME=name, FILTERS=filters)
+            )
+            keywords.append(
+                pd.DataFrame(
+                    [
+                        (order, topic_num, rank, word, score)
+                        for order, (topic_num, topic_words) in enumerate(
+                            result["keywords"].items()
+                        )
+                        for rank, (word, score) in enumerate(topic_words)
+                    ],
+                    columns=["ORDER", "TOPIC", "RANK", "WORD", "SCORE"],
+                ).assign(SCOPE=scope, NAME=name, FILTERS=filters)
+            )
+            # Only non-zero counts are stored; the lookup fills the gaps back in
+            counts = result["year_counts"].stack()
+            year_counts.append(
+                counts[counts > 0]
+                .rename("COUNT")
+                .reset_index()
+                .assign(SCOPE=scope, NAME=name, FILTERS=filters)
+            )
+
+    tables = {
+        "topic_status": pd.DataFrame(
+            status_rows, columns=SELECTION_COLUMNS + ["STATUS"]
+        ),
+        "topic_assignments": _concat_selection_tables(assignments, ["ROW", "TOPIC"]),
+        "topic_keywords": _concat_selection_tables(
+            keywords, ["ORDER", "TOPIC", "RANK", "WORD", "SCORE"]
+        ),
+        "topic_year_counts": _concat_selection_tables(
+            year_counts, ["AWARDED_YEAR", "TOPIC", "COUNT"]
+        ),
+    }
+    for table in tables.values():
+        for column in SELECTION_COLUMNS:
+            table[column] = table[column].astype("category")
+    return tables
+
+
+def _concat_selection_tables(tables: list, columns: list) -> pd.DataFrame:
+    """Concatenate per-selection tables with the selection columns first."""
+    if not tables:
+        return pd.DataFrame(columns=SELECTION_COLUMNS + columns)
+    return pd.concat(tables, ignore_index=True)[SELECTION_COLUMNS + columns]
+
+
+def _selection_rows(table: pd.DataFrame, scope: str, name: str, filters: str):
+    """Return the rows of a topic index table belonging to one selection."""
+    return table[
+        (table["SCOPE"] == scope)
+        & (table["NAME"] == name)
+        & (table["FILTERS"] == filters)
+    ]
+
+
+def lookup_topic_result(artifacts: dict, scope: str, name: str, selected_filters):
+    """
+    Look up the precomputed topic model of a cluster or entity and filter selection.
+
+    Args:
+        artifacts (dict): The loaded dashboard artifacts.
+        scope (str): 'cluster' or 'entity'.
+        name (str): The selected cluster or entity.
+        selected_filters (list): The selected category filters.
+
+    Returns:
+        dict | None: The result in the shape returned by utils.topic_model.fit_topics,
+            or None when the index has no entry for the selection.
+    """
+    if "topic_status" not in artifacts:
+        return None
+    filters = filter_key(selected_filters)
+    status = _selection_rows(artifacts["topic_status"], scope, name, filters)
+    if status.empty:
+        return None
+    if status["STATUS"].iloc[0] != TOPICS_OK:
+        return {"status": status["STATUS"].iloc[0]}
+
+    assignments = _selection_rows(artifacts["topic_assignments"], scope, name, filters)
+    keyword_rows = _selection_rows(
+        artifacts["topic_keywords"], scope, name, filters
+    ).sort_values(["ORDER", "RANK"])
+    keywords = {}
+    for topic_num, topic_words in keyword_rows.groupby("TOPIC", sort=False):
+        keywords[int(topic_num)] = list(zip(topic_words["WORD"], topic_words["SCORE"]))
+
+    year_counts = _selection_rows(
+        artifacts["topic_year_counts"], scope, name, filters
+    ).pivot(index="AWARDED_YEAR", columns="TOPIC", values="COUNT")
+    # Years of different selections share one column, so restore integer years
+    year_counts = year_counts.fillna(0).astype(int)
+    year_counts.index = year_counts.index.astype(int)
+    return {
+        "status": TOPICS_OK,
+        "topics": pd.Series(
+            assignments["TOPIC"].to_numpy(),
+            index=pd.Index(assignments["ROW"].to_numpy()),
+            name="TOPIC",
+        ),
+        "keywords": keywords,
+        "year_counts": year_counts,
+    }
+
+
+def get_topic_result(
+    filter_index,
+    artifacts: dict,
+    scope: str,
+    name: str,
+    selected_filters,
+    fit: bool = True,
+    cancelled=None,
+) -> dict:
+    """
+    Return the topic model of a cluster or entity and filter selection. With the "nmf"
+    or "lda" TOPIC_BACKEND it is fitted on the spot from the shared document-term
+    matrix. With BERTopic, in "global" TOPIC_MODE it is projected from the corpus-wide
+    model; otherwise it comes from the topic index when the index has an entry for the
+    selection, and is fitted on the topic service when it does not.
+
+    Results are memoized by selection, sorted filters and artifacts version, so the
+    callbacks of one selection share a single lookup or fit, and concurrent requests
+    for a selection being fitted wait for that fit.
+
+    Args:
+        filter_index (utils.filter_index.FilterIndex): The filter index of the
+            preprocessed tenders.
+        artifacts (dict): The loaded dashboard artifacts.
+        scope (str): 'cluster' or 'entity'.
+        name (str): The selected cluster or entity.
+        selected_filters (list): The selected category filters.
+        fit (bool): Whether to fit a BERTopic model on the topic service when the
+            selection has no result that can be served right away. When False, the
+            call never waits for a fit and returns None instead.
+        cancelled (callable): Cancels the fit of this call once it returns True (see
+            utils.topic_service.TopicService.fit); the call then raises CancelledError.
+
+    Returns:
+        dict | None: The result in the shape returned by utils.topic_model.fit_topics.
+            It is shared between callers and must not be modified. Its status is
+            TOPICS_BUSY when the topic service queue stays full.
+    """
+
+    def immediate_topic_result():
+        positions = filter_index.positions(**{scope: name}, categories=selected_filters)
+        if TOPIC_BACKEND in ("nmf", "lda") and "document_term_matrix" in artifacts:
+            return fit_lightweight_topics(
+                filter_index.df.iloc[positions],
+                artifacts["document_term_matrix"],
+                artifacts["document_terms"]["terms"],
+                positions,
+                TOPIC_BACKEND,
+            )
+        result = None
+        if TOPIC_MODE == "global":
+            result = project_global_topics(artifacts, filter_index.df.iloc[positions])
+        if result is None:
+            result = lookup_topic_result(artifacts, scope, name, selected_filters)
+        return result
+
+    def compute_topic_result():
+        result = immediate_topic_result()
+        if result is None:
+            filtered_df = filter_index.select(
+                **{scope: name}, categories=selected_filters
+            )
+            result = get_topic_service().fit(
+                filtered_df, timeout=TOPIC_QUEUE_TIMEOUT, cancelled=cancelled
+            )
+        return result
+
+    key = (artifacts.get("version"), scope, name, filter_key(selected_filters))
+    if not fit:
+        # Only results that need no fit are computed, so a selection being fitted for
+        # another request is not waited for
+        result = topic_result_cache.get(key)
+        if result is None:
+            result = immediate_topic_result()
+            if result is not None:
+                topic_result_cache.get_or_compute(key, lambda: result)
+        return result
+    try:
+        return topic_result_cache.get_or_compute(key, compute_topic_result)
+    except TopicServiceBusy:
+        return {"status": TOPICS_BUSY}
@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+
+from data_cleaning.canonicalization import (
+    MAPPING_FILEPATHS,
+    canonicalize,
+    load_canonical_mappings,
+    load_mapping,
+    process_mapping,
+)
+
+
+def test_canonicalize_matches_series_replace():
+    mapping = {"Acme Ltd.": "Acme", "ACME": "Acme", "Acme": "Acme Limited", "B": ""}
+    values = pd.Series(
+        ["Acme Ltd.", None, "ACME", "Unmapped", np.nan, "Acme", "B", "Acme Ltd."],
+        index=[5, 3, 8, 1, 0, 2, 7, 4],
+        name="VENDOR",
+    )
+
+    pd.testing.assert_series_equal(
+        canonicalize(values, mapping), values.replace(mapping)
+    )
+
+
+def test_canonicalize_handles_empty_and_all_missing_columns():
+    mapping = {"Acme Ltd.": "Acme"}
+    empty = pd.Series([], dtype=object)
+    pd.testing.assert_series_equal(canonicalize(empty, mapping), empty.replace(mapping))
+
+    # Series.replace downcasts an all-missing column to float; the values match
+    missing = pd.Series([None, np.nan], dtype=object)
+    pd.testing.assert_series_equal(
+        canonicalize(missing, mapping), missing.replace(mapping), check_dtype=False
+    )
+
+
+def test_compiled_mappings_canonicalize_like_the_mapping_files(tmp_path):
+    compiled = load_canonical_mappings(str(tmp_path))
+    # The second load reads the pickled artifact instead of the mapping files
+    assert load_canonical_mappings(str(tmp_path)) == compiled
+
+    for column, filepath in MAPPING_FILEPATHS.items():
+        parsed = process_mapping(load_mapping(filepath), column, column)
+        assert compiled[column] == parsed
+        # A sample of the raw and canonical names, as Series.replace scans the whole
+        # column once per mapped name
+        values = pd.Series(
+            list(parsed)[::20]
+            + list(parsed.values())[::20]
+            + ["Not in any mapping", None]
+        )
+
+        pd.testing.assert_series_equal(
+            canonicalize(values, compiled[column]), values.replace(parsed)
+        )
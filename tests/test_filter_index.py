@@ -0,0 +1,110 @@
+from itertools import product
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from utils.constants import CATEGORY_COLUMNS
+from utils.filter_index import FilterIndex
+
+CLUSTERS = ["Health", "Education", "Municipal"]
+ENTITIES = ["Hospital A", "Hospital B", "School Board", "Town Hall"]
+
+
+@pytest.fixture
+def tenders() -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    size = 500
+    start_dates = pd.to_datetime("2015-01-01") + pd.to_timedelta(
+        rng.integers(0, 9 * 365, size), unit="D"
+    )
+    return pd.DataFrame(
+        {
+            # Tender IDs repeat over the line items of a tender
+            "TENDER_ID": [f"T{i}" for i in rng.integers(0, 300, size)],
+            "ENTITY_CLUSTER_NAME": pd.Categorical(rng.choice(CLUSTERS, size)),
+            "ENTITY": pd.Categorical(rng.choice(ENTITIES, size)),
+            "TENDER_START_DATE": start_dates.where(rng.random(size) > 0.05),
+            **{column: rng.integers(0, 2, size) for column in CATEGORY_COLUMNS},
+        },
+        # The frame keeps the labels of its raw rows, which are not positions
+        index=rng.permutation(size) + 1000,
+    )
+
+
+def masked(df: pd.DataFrame, cluster, entity, categories, years, tender_id):
+    """Select the tenders of a combination of filters with boolean masks."""
+    mask = pd.Series(True, index=df.index)
+    if cluster is not None:
+        mask &= df["ENTITY_CLUSTER_NAME"] == cluster
+    if entity is not None:
+        mask &= df["ENTITY"] == entity
+    for column in categories or []:
+        mask &= df[column] == 1
+    if years is not None:
+        mask &= df["TENDER_START_DATE"].dt.year.between(*years)
+    if tender_id is not None:
+        mask &= df["TENDER_ID"] == tender_id
+    return df[mask]
+
+
+CATEGORY_SELECTIONS = [None, [], ["GOODS"], ["SERVICE", "GOODS"], CATEGORY_COLUMNS]
+YEAR_RANGES = [None, (2015, 2023), (2018, 2018), (2019, 2021), (2030, 2031)]
+
+
+@pytest.mark.parametrize(
+    "cluster, entity",
+    [
+        (None, None),
+        ("Health", None),
+        (None, "School Board"),
+        ("Health", "Town Hall"),
+        ("Not a cluster", None),
+    ],
+)
+def test_select_matches_boolean_masks(tenders, cluster, entity):
+    filter_index = FilterIndex(tenders)
+    for categories, years in product(CATEGORY_SELECTIONS, YEAR_RANGES):
+        expected = masked(tenders, cluster, entity, categories, years, None)
+        selected = filter_index.select(
+            cluster=cluster, entity=entity, categories=categories, years=years
+        )
+
+        pd.testing.assert_frame_equal(selected, expected)
+        assert np.array_equal(
+            filter_index.positions(
+                cluster=cluster, entity=entity, categories=categories, years=years
+            ),
+            tenders.index.get_indexer(expected.index),
+        )
+
+
+def test_tender_lookups_match_boolean_masks(tenders):
+    filter_index = FilterIndex(tenders)
+    for tender_id, cluster in product(["T7", "T150", "missing"], [None, "Health"]):
+        pd.testing.assert_frame_equal(
+            filter_index.select(cluster=cluster, tender_id=tender_id),
+            masked(tenders, cluster, None, None, None, tender_id),
+        )
+
+
+def test_selections_are_shared_whatever_the_checklist_order(tenders):
+    filter_index = FilterIndex(tenders)
+    first = filter_index.select(cluster="Health", categories=["SERVICE", "GOODS"])
+    second = filter_index.select(cluster="Health", categories=["GOODS", "SERVICE"])
+
+    assert second is first
+    assert filter_index.positions(
+        cluster="Health", categories=["GOODS", "SERVICE"]
+    ) is filter_index.positions(cluster="Health", categories=("SERVICE", "GOODS"))
+    assert (filter_index.selections.misses, filter_index.selections.hits) == (1, 3)
+
+
+def test_tender_lookups_do_not_evict_selections(tenders):
+    filter_index = FilterIndex(tenders, cache_size=2)
+    selected = filter_index.select(entity="Hospital A", years=[2016, 2020])
+    for tender_id in ["T1", "T2", "T3"]:
+        filter_index.select(tender_id=tender_id)
+
+    assert filter_index.select(entity="Hospital A", years=[2016, 2020]) is selected
+    assert filter_index.selections.misses == 1
@@ -0,0 +1,97 @@
+import nltk
+import pandas as pd
+import pytest
+
+from data_cleaning.data_loader import load_data, process_raw_data
+from data_cleaning.data_preprocess import encode_categorical_columns
+from data_cleaning.incremental import (
+    compute_row_keys,
+    find_new_rows,
+    merge_processed,
+    summarize_ingestion,
+)
+
+try:
+    nltk.data.find("corpora/stopwords")
+except LookupError:
+    pytest.skip("The NLTK stopwords data is not installed.", allow_module_level=True)
+
+COLUMNS = [
+    "TENDER_ID",
+    "TENDER_DESCRIPTION",
+    "ENTITY",
+    "TENDER_START_DATE",
+    "TENDER_CLOSE_DATE",
+    "AWARDED_DATE",
+    "AWARDED_AMOUNT",
+    "VENDOR",
+    "GOODS",
+    "SERVICE",
+    "CONSTRUCTION",
+]
+
+
+def tender(tender_id: str, description: str, amount: float, vendor: str) -> list:
+    return [
+        tender_id,
+        description,
+        "Department of Public Works",
+        "01/15/2023 12:00:00 AM",
+        "02/15/2023 12:00:00 AM",
+        "03/01/2023 12:00:00 AM",
+        amount,
+        vendor,
+        "Y",
+        "N",
+        "N",
+    ]
+
+
+STORED_ROWS = [
+    tender("T1", "Road salt supply", 1000.0, "Salt Co"),
+    tender("T2", "Janitorial services", 2000.0, "Clean Ltd"),
+    # Two line items of one tender, identical in every column
+    tender("T3", "Office chairs", 300.0, "Seats Inc"),
+    tender("T3", "Office chairs", 300.0, "Seats Inc"),
+    tender("T4", "Bridge inspection", 4000.0, "Span Engineering"),
+    tender("T5", "Snow removal", 5000.0, "Plow Bros"),
+]
+
+SNAPSHOT_ROWS = [
+    tender("T1", "Road salt supply", 1000.0, "Salt Co"),
+    # Changed: a new awarded amount and vendor
+    tender("T2", "Janitorial services", 2500.0, "Sparkle Ltd"),
+    tender("T3", "Office chairs", 300.0, "Seats Inc"),
+    tender("T3", "Office chairs", 300.0, "Seats Inc"),
+    # A third duplicate line item, and a new tender; T5 was removed
+    tender("T3", "Office chairs", 300.0, "Seats Inc"),
+    tender("T6", "Roof replacement", 6000.0, "Top Roofing"),
+    tender("T4", "Bridge inspection", 4000.0, "Span Engineering"),
+]
+
+
+def load_rows(rows: list, filepath) -> pd.DataFrame:
+    pd.DataFrame(rows, columns=COLUMNS).to_csv(filepath, index=False)
+    return load_data(str(filepath))
+
+
+def test_incremental_update_matches_a_full_rebuild(tmp_path):
+    stored_raw = load_rows(STORED_ROWS, tmp_path / "stored.csv")
+    raw_df = load_rows(SNAPSHOT_ROWS, tmp_path / "snapshot.csv")
+    stored_df = process_raw_data(stored_raw, use_memo=False)
+    stored_row_keys = compute_row_keys(stored_raw)
+    row_keys = compute_row_keys(raw_df)
+
+    new_positions = find_new_rows(row_keys, stored_row_keys)
+    processed_delta = process_raw_data(raw_df.iloc[new_positions], use_memo=False)
+    merged = encode_categorical_columns(
+        merge_processed(stored_df, stored_row_keys, row_keys, processed_delta)
+    )
+
+    assert new_positions.tolist() == [1, 4, 5]
+    pd.testing.assert_frame_equal(merged, process_raw_data(raw_df, use_memo=False))
+    assert summarize_ingestion(
+        raw_df, new_positions, stored_df, stored_row_keys, row_keys
+    ) == (
+        "Incremental ingestion: 7 rows in snapshot, 2 inserted, 1 changed, 1 removed."
+    )
@@ -0,0 +1,116 @@
+import threading
+
+import pytest
+
+from utils.lru_cache import LRUCache
+
+# Seconds a test waits for its threads before failing instead of hanging
+TIMEOUT = 5
+
+
+def run_threads(count: int, target) -> list:
+    """Run a function in several threads and return what each one returned."""
+    results = [None] * count
+
+    def run(i):
+        results[i] = target()
+
+    threads = [threading.Thread(target=run, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(TIMEOUT)
+        assert not thread.is_alive()
+    return results
+
+
+def test_concurrent_callers_wait_for_one_computation():
+    cache = LRUCache(4)
+    release = threading.Event()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        release.wait(TIMEOUT)
+        return {"value": 42}
+
+    # Release the computation only once every caller is queued on it
+    threading.Timer(0.2, release.set).start()
+    results = run_threads(8, lambda: cache.get_or_compute("key", compute))
+
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+    assert (cache.misses, cache.hits) == (1, 7)
+
+
+def test_results_are_evicted_least_recently_used_first():
+    cache = LRUCache(2)
+    cache.get_or_compute("a", lambda: 1)
+    cache.get_or_compute("b", lambda: 2)
+    cache.get_or_compute("a", lambda: 1)
+    cache.get_or_compute("c", lambda: 3)
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+
+def test_rejected_results_are_returned_but_not_cached():
+    cache = LRUCache(4, cacheable=lambda result: result["status"] != "failed")
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return {"status": "failed"}
+
+    assert cache.get_or_compute("key", compute) == {"status": "failed"}
+    assert cache.get_or_compute("key", compute) == {"status": "failed"}
+    assert len(calls) == 2
+    assert cache.get("key") is None
+
+
+def test_exceptions_reach_waiters_and_are_not_cached():
+    cache = LRUCache(4)
+    release = threading.Event()
+
+    def compute():
+        release.wait(TIMEOUT)
+        raise ValueError("fit failed")
+
+    def call():
+        try:
+            return cache.get_or_compute("key", compute)
+        except ValueError as e:
+            return e
+
+    threading.Timer(0.2, release.set).start()
+    results = run_threads(4, call)
+
+    assert all(isinstance(result, ValueError) for result in results)
+    assert cache.get_or_compute("key", lambda: "recomputed") == "recomputed"
+
+
+def test_interrupted_computation_is_taken_over_by_a_waiter():
+    cache = LRUCache(4)
+    started, release = threading.Event(), threading.Event()
+
+    def interrupted():
+        started.set()
+        release.wait(TIMEOUT)
+        raise KeyboardInterrupt
+
+    def owner():
+        with pytest.raises(KeyboardInterrupt):
+            cache.get_or_compute("key", interrupted)
+
+    owner_thread = threading.Thread(target=owner)
+    owner_thread.start()
+    started.wait(TIMEOUT)
+    threading.Timer(0.2, release.set).start()
+    # Waits for the interrupted computation, then computes the result itself
+    result = cache.get_or_compute("key", lambda: "computed by a waiter")
+    owner_thread.join(TIMEOUT)
+
+    assert result == "computed by a waiter"
+    assert cache.get("key") == "computed by a waiter"
+    assert not cache._in_flight
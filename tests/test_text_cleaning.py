@@ -0,0 +1,55 @@
+import nltk
+import pandas as pd
+import pytest
+
+from benchmarks.clean_text_benchmark import legacy_clean_text
+from data_cleaning.text_cleaning import clean_texts, clean_texts_parallel
+
+try:
+    nltk.data.find("corpora/stopwords")
+    nltk.data.find("tokenizers/punkt_tab/english/")
+except LookupError:
+    pytest.skip(
+        "The NLTK stopwords and punkt_tab data are not installed.",
+        allow_module_level=True,
+    )
+
+# Descriptions exercising every step of the cleaner: mentions, URLs, contractions,
+# plus signs, digits, single letters, punctuation, stopwords and empty texts
+DESCRIPTIONS = [
+    "Supply and delivery of road salt for the 2023-2024 winter season",
+    "RFP: Janitorial services @ Halifax (see http://novascotia.ca/tenders)",
+    "Contact @procurement or https://example.com/a?b=c for the N.S. addendum",
+    "Owner's engineer - can't/won't bid; C++ developer, a b c d",
+    "Replacement of HVAC units -- Phase II (Bldg #4), 100% design",
+    "o'neil's   road   e-mail   x-ray   wi-fi  re-roofing",
+    "Mécanique du bâtiment – réparation générale",
+    "THE AND OF a an to in",
+    "",
+    "   ",
+    "12345 678",
+    "IT'S the client's 'quoted' text",
+]
+
+
+def test_batch_cleaning_matches_the_legacy_cleaner():
+    # Descriptions reach the cleaner lowercased, as get_preprocessed_data feeds them
+    descriptions = pd.Series(DESCRIPTIONS, index=range(10, 10 + len(DESCRIPTIONS)))
+    descriptions = descriptions.str.lower()
+    expected = descriptions.apply(legacy_clean_text)
+
+    cleaned = clean_texts(descriptions)
+
+    assert cleaned.index.equals(descriptions.index)
+    assert cleaned.str.split().tolist() == expected.str.split().tolist()
+
+
+def test_parallel_cleaning_matches_the_batch_cleaner(monkeypatch):
+    # Parallelize inputs of any size, so the chunks are reassembled in order
+    monkeypatch.setattr("data_cleaning.text_cleaning.PARALLEL_MIN_ROWS", 0)
+    descriptions = pd.Series(DESCRIPTIONS * 20).str.lower()
+
+    cleaned = clean_texts_parallel(descriptions, workers=2)
+
+    assert cleaned.index.equals(descriptions.index)
+    assert cleaned.tolist() == clean_texts(descriptions).tolist()
@@ -0,0 +1,100 @@
+import os
+import time
+from concurrent.futures import CancelledError
+
+import pandas as pd
+import pytest
+
+from utils import topic_service
+from utils.topic_service import TopicService, TopicServiceBusy, _TopicRequests
+
+# Seconds a test waits for a job before failing instead of hanging
+TIMEOUT = 10
+
+
+def fake_fit(filtered_df, latency_target, submitted_at):
+    """Stand in for a topic fit: slow selections run until their worker is killed."""
+    if (filtered_df["TENDER_DESCRIPTION"] == "slow").any():
+        time.sleep(60)
+    return {"status": "ok", "pid": os.getpid()}
+
+
+def selection(description: str) -> pd.DataFrame:
+    return pd.DataFrame(
+        {column: [description] for column in topic_service.TOPIC_COLUMNS}
+    )
+
+
+def wait_until(condition):
+    deadline = time.monotonic() + TIMEOUT
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.05)
+
+
+@pytest.fixture
+def service(monkeypatch):
+    # Worker processes are forked, so they run the patched functions
+    monkeypatch.setattr(topic_service, "_load_worker_model", lambda model_name: None)
+    monkeypatch.setattr(topic_service, "_fit_job", fake_fit)
+    service = TopicService(workers=1, max_pending=2)
+    yield service
+    service.shutdown()
+
+
+def test_cancelling_a_queued_job_frees_its_slot(service):
+    running = service.submit(selection("slow"))
+    queued = service.submit(selection("quick"))
+    wait_until(running.running)
+    with pytest.raises(TopicServiceBusy):
+        service.submit(selection("quick"), timeout=0.1)
+
+    service.cancel(queued)
+    assert queued.cancelled()
+    replacement = service.submit(selection("quick"), timeout=0.1)
+
+    service.cancel(running)
+    assert replacement.result(TIMEOUT)["status"] == "ok"
+
+
+def test_cancelling_a_running_job_replaces_its_worker(service):
+    first_pid = service.fit(selection("quick"), timeout=TIMEOUT)["pid"]
+    running = service.submit(selection("slow"))
+    wait_until(running.running)
+
+    service.cancel(running)
+    with pytest.raises(CancelledError):
+        running.result(TIMEOUT)
+    # Both slots are free again, and a new worker process runs the next jobs
+    futures = [service.submit(selection("quick"), timeout=0.1) for _ in range(2)]
+    pids = {future.result(TIMEOUT)["pid"] for future in futures}
+    assert pids and first_pid not in pids
+
+
+def test_fit_is_cancelled_once_its_caller_gives_up(service):
+    start = time.monotonic()
+    with pytest.raises(CancelledError):
+        service.fit(selection("slow"), cancelled=lambda: time.monotonic() > start + 1)
+    assert service.fit(selection("quick"), timeout=TIMEOUT)["status"] == "ok"
+
+
+def test_requests_no_job_polls_are_cancelled(service, monkeypatch):
+    monkeypatch.setattr(topic_service, "TOPIC_REQUEST_LEASE", 0.5)
+    monkeypatch.setattr(_TopicRequests, "POLL_TIMEOUT", 0.1)
+    requests = _TopicRequests(
+        lambda description, cancelled: service.fit(
+            selection(description), cancelled=cancelled
+        )
+    )
+
+    assert requests.poll("slow") == (False, None)
+    wait_until(lambda: not requests._requests)
+    # The abandoned fit no longer holds a slot
+    futures = [service.submit(selection("quick"), timeout=TIMEOUT) for _ in range(2)]
+    assert all(future.result(TIMEOUT)["status"] == "ok" for future in futures)
+
+    while True:
+        done, result = requests.poll("quick")
+        if done:
+            break
+    assert result["status"] == "ok"
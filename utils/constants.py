@@ -1,6 +1,74 @@
 DATA_FILEPATH = "data/Awarded_Public_Tenders_20241004.csv"
+# Dated exports published by Nova Scotia; the newest one is loaded by default
+SNAPSHOT_GLOB = "data/Awarded_Public_Tenders_*.csv"
 ENTITY_FIXED_FILEPATH = "data/entity_mapping.txt"
 VENDOR_FIXED_FILEPATH = "data/vendor_mapping.txt"
+# Output of the fuzzy vendor deduplication (python -m data_cleaning.vendor_dedup), for review
+GENERATED_VENDOR_MAPPING_FILEPATH = "data/vendor_mapping_generated.txt"
+CLUSTER_MAPPING_FILEPATH = "utils/cluster_mapping.py"
+
+# Directory holding the processed store (preprocessed tender DataFrame and raw row keys)
+CACHE_DIR = "data/cache"
+# Disk cache of the background callback jobs (topic visualizations)
+BACKGROUND_CALLBACKS_DIR = "data/cache/background_callbacks"
+# Directory holding the versioned dashboard artifacts written by `python -m pipeline build`
+ARTIFACTS_DIR = "data/artifacts"
+# Number of topic results (one per cluster or entity and filter selection) kept in memory
+TOPIC_RESULT_CACHE_SIZE = 64
+# Number of entities with the largest total awarded amounts drawn as lines in the
+# Entity-Year average chart; the others are summarized by a band and shown on demand
+ENTITY_CHART_TOP_N = 15
+# Number of filtered views of the tenders (one per combination of dashboard filters)
+# kept in memory by the filter index
+FILTERED_VIEW_CACHE_SIZE = 16
+# Sentence embedding model of the BERTopic fits
+EMBEDDING_MODEL_NAME = "all-MiniLM-L6-v2"
+# Directory holding the stored sentence embeddings of tender descriptions, per model
+EMBEDDINGS_DIR = "data/embeddings"
+# Dimensionality reduction applied once to the stored embeddings (BERTopic's defaults);
+# reduced vectors are stored per parameter set
+UMAP_PARAMS = {
+    "n_neighbors": 15,
+    "n_components": 5,
+    "min_dist": 0.0,
+    "metric": "cosine",
+    "random_state": 42,
+}
+# Topic models served by the dashboard: "selection" fits one model per cluster or
+# entity and filter selection; "global" projects a single corpus-wide model onto the
+# selection, so topic ids are comparable across the dashboard
+TOPIC_MODE = "selection"
+# Topic engine of the dashboard: "bertopic" serves the BERTopic models built offline
+# (see TOPIC_MODE); "nmf" (TF-IDF + NMF, sub-second) and "lda" (slower on large
+# selections) fit coarser topics on the spot from the shared document-term matrix
+TOPIC_BACKEND = "bertopic"
+# Number of most frequent topics of a selection shown in "global" mode
+GLOBAL_TOP_TOPICS = 10
+# Directory holding the global topic model updated incrementally by every build
+GLOBAL_TOPICS_DIR = "data/global_topics"
+# The global topic model is refitted from scratch once the descriptions folded into it
+# since its last full fit reach this share of the descriptions it was fitted on
+GLOBAL_TOPIC_REFIT_SHARE = 0.2
+# Number of descriptions matching no global topic that are clustered into new topics
+GLOBAL_TOPIC_NEW_TOPIC_DOCUMENTS = 100
+# Latency target in seconds of a topic model fitted while the user waits; larger
+# selections are fitted on a stratified sample sized to meet it (None to fit all)
+TOPIC_LATENCY_TARGET = 10
+# Seconds of a topic chart's latency spent outside its fit (starting the background job,
+# polling it and drawing the charts), reserved from TOPIC_LATENCY_TARGET
+TOPIC_LATENCY_OVERHEAD = 2
+# Milliseconds between the page's polls of a background topic fit job
+TOPIC_JOB_POLL_INTERVAL = 500
+# Initial estimate of the fit time per tender, replaced by the first fit and refined by
+# every later one; the estimate is shared by the worker processes through a disk cache
+TOPIC_FIT_SECONDS_PER_DOCUMENT = 0.002
+# Seconds a dashboard request waits for a free slot in the topic modelling queue
+TOPIC_QUEUE_TIMEOUT = 5
+# Seconds without a poll from the background job after which its topic fit request is
+# abandoned, and the fit cancelled when no other job waits for it
+TOPIC_REQUEST_LEASE = 3
+# Category columns of the filter checklists; a tender has a category when its flag is 1
+CATEGORY_COLUMNS = ["GOODS", "SERVICE", "CONSTRUCTION"]
 
 # Cluster Names Mapping
 ENTITY_CLUSTER_NAME = {
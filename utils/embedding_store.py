@@ -0,0 +1,248 @@
+import hashlib
+import json
+import os
+import pickle
+
+import numpy as np
+import pandas as pd
+
+from utils.constants import EMBEDDING_MODEL_NAME, EMBEDDINGS_DIR, UMAP_PARAMS
+
+# Files making up an embedding store
+VECTORS_FILENAME = "vectors.f32"
+KEYS_FILENAME = "keys.npy"
+META_FILENAME = "meta.json"
+UMAP_MODEL_FILENAME = "umap.pkl"
+
+# Number of texts encoded per batch when new texts are added
+ENCODE_BATCH_SIZE = 256
+
+
+def text_keys(texts) -> np.ndarray:
+    """
+    Content-address texts by the BLAKE2b digest of their UTF-8 encoding.
+
+    Args:
+        texts (Iterable[str]): The texts to address.
+
+    Returns:
+        np.ndarray: One 32-character hexadecimal key (dtype 'S32') per text.
+    """
+    return np.array(
+        [hashlib.blake2b(text.encode(), digest_size=16).hexdigest() for text in texts],
+        dtype="S32",
+    )
+
+
+def store_dir(
+    model_name: str = EMBEDDING_MODEL_NAME, root: str = EMBEDDINGS_DIR
+) -> str:
+    """Return the directory of the embedding store of a model."""
+    return os.path.join(root, model_name.replace("/", "__"))
+
+
+class EmbeddingStore:
+    """
+    Sentence embeddings of tender descriptions, one float32 vector per unique text.
+
+    Vectors are appended to a flat file read through a memory map, and a key array
+    maps the content hash of each text to its row. The key array is replaced
+    atomically after the vectors are written, so readers only ever see complete rows.
+    """
+
+    def __init__(
+        self, model_name: str = EMBEDDING_MODEL_NAME, root: str = EMBEDDINGS_DIR
+    ):
+        self.model_name = model_name
+        self.directory = store_dir(model_name, root)
+        self.reload()
+
+    def reload(self):
+        """Re-read the keys and memory map the vectors, picking up texts added since."""
+        keys_filepath = os.path.join(self.directory, KEYS_FILENAME)
+        if not os.path.exists(keys_filepath):
+            self.key_array = np.array([], dtype="S32")
+            self.keys = pd.Index(self.key_array)
+            self.dimension = None
+            self.vectors = np.empty((0, 0), dtype=np.float32)
+            return
+
+        with open(os.path.join(self.directory, META_FILENAME), "r") as file:
+            self.dimension = json.load(file)["dimension"]
+        self.key_array = np.load(keys_filepath)
+        self.keys = pd.Index(self.key_array)
+        self.vectors = np.memmap(
+            os.path.join(self.directory, VECTORS_FILENAME),
+            dtype=np.float32,
+            mode="r",
+            shape=(len(self.keys), self.dimension),
+        )
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def missing(self, texts) -> list:
+        """Return the unique texts that have no stored embedding yet."""
+        unique_texts = pd.unique(pd.Series(texts, dtype=object))
+        positions = self.keys.get_indexer(text_keys(unique_texts))
+        return [text for text, position in zip(unique_texts, positions) if position < 0]
+
+    def add(self, texts, embedding_model) -> int:
+        """
+        Embed and store the texts that are not stored yet.
+
+        Args:
+            texts (Iterable[str]): The texts to store.
+            embedding_model: A sentence-transformers model encoding the new texts.
+
+        Returns:
+            int: Number of texts embedded.
+        """
+        new_texts = self.missing(texts)
+        if not new_texts:
+            return 0
+
+        os.makedirs(self.directory, exist_ok=True)
+        keys = [self.key_array]
+        with open(os.path.join(self.directory, VECTORS_FILENAME), "ab") as file:
+            # Drop any partial rows left by an interrupted write
+            file.truncate(len(self) * (self.dimension or 0) * 4)
+            for start in range(0, len(new_texts), ENCODE_BATCH_SIZE):
+                batch = new_texts[start : start + ENCODE_BATCH_SIZE]
+                vectors = np.asarray(
+                    embedding_model.encode(batch, show_progress_bar=False),
+                    dtype=np.float32,
+                )
+                if self.dimension is None:
+                    self.dimension = vectors.shape[1]
+                    self._save_meta()
+                file.write(vectors.tobytes())
+                keys.append(text_keys(batch))
+
+        tmp_filepath = os.path.join(self.directory, f"{KEYS_FILENAME}.tmp")
+        with open(tmp_filepath, "wb") as file:
+            np.save(file, np.concatenate(keys))
+        os.replace(tmp_filepath, os.path.join(self.directory, KEYS_FILENAME))
+        self.reload()
+        return len(new_texts)
+
+    def _save_meta(self):
+        with open(os.path.join(self.directory, META_FILENAME), "w") as file:
+            json.dump({"model": self.model_name, "dimension": self.dimension}, file)
+
+    def get(self, texts) -> np.ndarray:
+        """
+        Look up the embeddings of texts.
+
+        Args:
+            texts (Iterable[str]): The texts, possibly repeated.
+
+        Returns:
+            np.ndarray: One float32 row per text, in order.
+
+        Raises:
+            KeyError: When a text has no stored embedding.
+        """
+        positions = self.keys.get_indexer(text_keys(texts))
+        if (positions < 0).any():
+            raise KeyError(
+                f"{int((positions < 0).sum())} texts have no stored embedding."
+            )
+        return self.vectors[positions]
+
+
+def umap_version(params: dict) -> str:
+    """Identify a set of UMAP parameters by a short hash."""
+    return hashlib.sha256(json.dumps(params, sort_keys=True).encode()).hexdigest()[:12]
+
+
+class ReducedEmbeddings:
+    """
+    UMAP-reduced embeddings of an EmbeddingStore, one row per stored embedding.
+
+    The reduction is fitted once on every stored embedding, and embeddings added later
+    are projected with the saved UMAP model. Reduced vectors live in a subdirectory of
+    the store named after the UMAP parameters, so changing the parameters never reuses
+    stale vectors.
+    """
+
+    def __init__(self, store: EmbeddingStore, params: dict = UMAP_PARAMS):
+        self.store = store
+        self.params = params
+        self.directory = os.path.join(store.directory, "reduced", umap_version(params))
+        self.reload()
+
+    def reload(self):
+        """Memory map the reduced vectors written so far."""
+        meta_filepath = os.path.join(self.directory, META_FILENAME)
+        if not os.path.exists(meta_filepath):
+            self.vectors = np.empty((0, self.params["n_components"]), dtype=np.float32)
+            return
+        with open(meta_filepath, "r") as file:
+            rows = json.load(file)["rows"]
+        self.vectors = np.memmap(
+            os.path.join(self.directory, VECTORS_FILENAME),
+            dtype=np.float32,
+            mode="r",
+            shape=(rows, self.params["n_components"]),
+        )
+
+    def __len__(self) -> int:
+        return len(self.vectors)
+
+    def update(self) -> int:
+        """
+        Reduce the stored embeddings that have no reduced vector yet. The UMAP model is
+        fitted on every stored embedding the first time.
+
+        Returns:
+            int: Number of embeddings reduced.
+        """
+        start = len(self)
+        if start == len(self.store):
+            return 0
+
+        from umap import UMAP
+
+        os.makedirs(self.directory, exist_ok=True)
+        model_filepath = os.path.join(self.directory, UMAP_MODEL_FILENAME)
+        new_embeddings = np.asarray(self.store.vectors[start:])
+        if start == 0:
+            umap_model = UMAP(**self.params)
+            reduced = umap_model.fit_transform(new_embeddings)
+            with open(model_filepath, "wb") as file:
+                pickle.dump(umap_model, file)
+        else:
+            with open(model_filepath, "rb") as file:
+                umap_model = pickle.load(file)
+            reduced = umap_model.transform(new_embeddings)
+
+        with open(os.path.join(self.directory, VECTORS_FILENAME), "ab") as file:
+            # Drop any partial rows left by an interrupted write
+            file.truncate(start * self.params["n_components"] * 4)
+            file.write(np.asarray(reduced, dtype=np.float32).tobytes())
+        tmp_filepath = os.path.join(self.directory, f"{META_FILENAME}.tmp")
+        with open(tmp_filepath, "w") as file:
+            json.dump({"params": self.params, "rows": len(self.store)}, file)
+        os.replace(tmp_filepath, os.path.join(self.directory, META_FILENAME))
+        self.reload()
+        return len(self.store) - start
+
+    def get(self, texts) -> np.ndarray:
+        """
+        Look up the reduced embeddings of texts.
+
+        Args:
+            texts (Iterable[str]): The texts, possibly repeated.
+
+        Returns:
+            np.ndarray: One float32 row per text, in order.
+
+        Raises:
+            KeyError: When a text has no reduced embedding.
+        """
+        positions = self.store.keys.get_indexer(text_keys(texts))
+        missing = (positions < 0) | (positions >= len(self))
+        if missing.any():
+            raise KeyError(f"{int(missing.sum())} texts have no reduced embedding.")
+        return self.vectors[positions]
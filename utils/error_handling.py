@@ -17,3 +17,21 @@ def return_empty_plot():
             }
         ]
     )
+
+
+def return_busy_plot():
+    return go.Figure().update_layout(
+        annotations=[
+            {
+                "text": "Topic modelling is busy with other requests. Please try again in a moment.",
+                "xref": "paper",
+                "yref": "paper",
+                "x": 0.5,
+                "y": 0.5,
+                "xanchor": "center",
+                "yanchor": "middle",
+                "showarrow": False,
+                "font": {"size": 16, "color": "red"},
+            }
+        ]
+    )
@@ -0,0 +1,144 @@
+from functools import reduce
+
+import numpy as np
+import pandas as pd
+
+from utils.constants import CATEGORY_COLUMNS, FILTERED_VIEW_CACHE_SIZE
+from utils.lru_cache import LRUCache
+
+
+def _positions_by(values: pd.Series) -> dict:
+    """Map each value of a column to the sorted positions of the rows holding it."""
+    return values.groupby(values, observed=True, sort=False).indices
+
+
+class FilterIndex:
+    """
+    Sorted row positions of the tenders per cluster, entity, category flag and tender
+    start year, built once when the dashboard starts.
+
+    Any combination of dashboard filters resolves to row positions by intersecting
+    these arrays (year ranges by merging the arrays of their years), so callbacks
+    never scan the whole frame to select tenders. The most recently used selections
+    are memoized by their normalized filters, so the callbacks fired together by one
+    change of the dashboard's inputs share a single selection. Lookups of a tender ID
+    (the tender details) are resolved directly, so they never evict those selections.
+    """
+
+    def __init__(self, df: pd.DataFrame, cache_size: int = FILTERED_VIEW_CACHE_SIZE):
+        self.df = df
+        self.selections = LRUCache(cache_size)
+        self.clusters = _positions_by(df["ENTITY_CLUSTER_NAME"])
+        self.entities = _positions_by(df["ENTITY"])
+        self.categories = {
+            column: np.flatnonzero(df[column].to_numpy() == 1)
+            for column in CATEGORY_COLUMNS
+        }
+        self.years = {
+            int(year): positions
+            for year, positions in _positions_by(
+                df["TENDER_START_DATE"].dt.year
+            ).items()
+        }
+        self.tender_ids = pd.Index(df["TENDER_ID"])
+
+    def _resolve(self, cluster, entity, categories, years, tender_id) -> np.ndarray:
+        """Intersect the row positions of normalized filters (see positions)."""
+        empty = np.array([], dtype=np.intp)
+        selections = []
+        if cluster is not None:
+            selections.append(self.clusters.get(cluster, empty))
+        if entity is not None:
+            selections.append(self.entities.get(entity, empty))
+        for column in categories:
+            selections.append(self.categories[column])
+        if years is not None:
+            first_year, last_year = years
+            selections.append(
+                np.sort(
+                    np.concatenate(
+                        [empty]
+                        + [
+                            positions
+                            for year, positions in self.years.items()
+                            if first_year <= year <= last_year
+                        ]
+                    )
+                )
+            )
+        if tender_id is not None:
+            positions = self.tender_ids.get_indexer_for([tender_id])
+            selections.append(np.sort(positions[positions >= 0]))
+
+        if not selections:
+            return np.arange(len(self.df))
+        # Intersect the smallest arrays first, so intermediate results stay small
+        return reduce(
+            lambda left, right: np.intersect1d(left, right, assume_unique=True),
+            sorted(selections, key=len),
+        )
+
+    def _selection(self, cluster, entity, categories, years, tender_id) -> tuple:
+        """
+        Return the row positions and the tenders of a combination of filters, memoized
+        by the filters with the category list sorted, so the order the checklist was
+        clicked in does not matter. Selections of a tender ID are not memoized.
+        """
+        filters = (
+            cluster,
+            entity,
+            tuple(sorted(categories or [])),
+            None if years is None else tuple(years),
+        )
+        if tender_id is not None:
+            positions = self._resolve(*filters, tender_id)
+            return positions, self.df.iloc[positions]
+
+        def compute_selection():
+            positions = self._resolve(*filters, None)
+            return positions, self.df.iloc[positions]
+
+        return self.selections.get_or_compute(filters, compute_selection)
+
+    def positions(
+        self,
+        cluster: str = None,
+        entity: str = None,
+        categories=None,
+        years=None,
+        tender_id: str = None,
+    ) -> np.ndarray:
+        """
+        Resolve a combination of filters to row positions. Filters left to None are not
+        applied.
+
+        Args:
+            cluster (str): The selected cluster.
+            entity (str): The selected entity.
+            categories (list): The selected category filters; tenders must have every
+                selected category.
+            years (list): The first and last tender start year, inclusive.
+            tender_id (str): A tender ID.
+
+        Returns:
+            np.ndarray: The sorted positions of the matching tenders in the frame. The
+                array is shared between callers and must not be modified.
+        """
+        return self._selection(cluster, entity, categories, years, tender_id)[0]
+
+    def select(
+        self,
+        cluster: str = None,
+        entity: str = None,
+        categories=None,
+        years=None,
+        tender_id: str = None,
+    ) -> pd.DataFrame:
+        """
+        Select the tenders matching a combination of filters (see positions).
+
+        Returns:
+            pd.DataFrame: The matching tenders, in frame order. The frame is shared
+                between callers and must not be modified.
+        """
+        return self._selection(cluster, entity, categories, years, tender_id)[1]
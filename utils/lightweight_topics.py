@@ -0,0 +1,101 @@
+import numpy as np
+import pandas as pd
+from sklearn.decomposition import NMF, LatentDirichletAllocation
+from sklearn.feature_extraction.text import CountVectorizer, TfidfTransformer
+
+from utils.topic_model import (
+    MIN_UNIQUE_DESCRIPTIONS,
+    TOPICS_FAILED,
+    TOPICS_TOO_FEW,
+    topic_result,
+)
+
+# Upper bound on the topics of a selection; smaller selections get fewer
+MAX_TOPICS = 10
+# Unique descriptions per topic used to scale the number of topics to a selection
+DESCRIPTIONS_PER_TOPIC = 20
+# Keywords kept per topic, as BERTopic does
+KEYWORDS_PER_TOPIC = 10
+
+
+def document_term_matrix(descriptions: pd.Series):
+    """
+    Count the terms of every tender description once, to be shared by every
+    lightweight topic fit.
+
+    Args:
+        descriptions (pd.Series): The cleaned tender descriptions, in tender order.
+
+    Returns:
+        tuple[scipy.sparse.csr_matrix, list]: The term counts of each description
+            and the terms of the matrix columns.
+    """
+    vectorizer = CountVectorizer(
+        stop_words="english", min_df=2, max_df=0.95, max_features=20000
+    )
+    counts = vectorizer.fit_transform(descriptions.fillna(""))
+    return counts.tocsr(), vectorizer.get_feature_names_out().tolist()
+
+
+def fit_lightweight_topics(
+    filtered_df: pd.DataFrame, counts, terms: list, positions, method: str = "nmf"
+) -> dict:
+    """
+    Fit a TF-IDF + NMF (or term count + LDA) topic model on a selection, reusing the
+    shared document-term matrix. Coarser than BERTopic, but fast enough to answer
+    interactively; the result has the shape returned by utils.topic_model.fit_topics.
+
+    Args:
+        filtered_df (pd.DataFrame): The selected tenders.
+        counts (scipy.sparse.csr_matrix): The shared document-term matrix.
+        terms (list): The terms of the matrix columns.
+        positions (np.ndarray): The rows of the selected tenders in the matrix.
+        method (str): 'nmf' or 'lda'.
+
+    Returns:
+        dict: The topic model result. Tenders without any weight on a topic are
+            assigned to the outlier topic -1.
+    """
+    unique_descriptions = filtered_df["TENDER_DESCRIPTION"].dropna().unique()
+    if len(unique_descriptions) < MIN_UNIQUE_DESCRIPTIONS:
+        return {"status": TOPICS_TOO_FEW}
+
+    selected_counts = counts[positions]
+    n_topics = min(
+        MAX_TOPICS, max(2, len(unique_descriptions) // DESCRIPTIONS_PER_TOPIC)
+    )
+    try:
+        if method == "lda":
+            model = LatentDirichletAllocation(
+                n_components=n_topics, learning_method="online", random_state=0
+            )
+            weights = model.fit_transform(selected_counts)
+        else:
+            model = NMF(n_components=n_topics, init="nndsvd", random_state=0)
+            weights = model.fit_transform(
+                TfidfTransformer().fit_transform(selected_counts)
+            )
+    except Exception as e:
+        print(f"Lightweight topic modelling failed for {len(filtered_df)} tenders: {e}")
+        return {"status": TOPICS_FAILED}
+
+    # Tenders without any known term have no topic weight
+    has_terms = np.asarray(selected_counts.sum(axis=1)).ravel() > 0
+    topics = np.where(has_terms & (weights.max(axis=1) > 0), weights.argmax(axis=1), -1)
+
+    # Normalized term weights of each topic, strongest first
+    components = model.components_ / np.maximum(
+        model.components_.sum(axis=1, keepdims=True), 1e-12
+    )
+
+    def topic_words(topic_num):
+        if topic_num < 0:
+            return []
+        top_terms = np.argsort(components[topic_num])[::-1][:KEYWORDS_PER_TOPIC]
+        return [
+            (terms[term], float(components[topic_num, term]))
+            for term in top_terms
+            if components[topic_num, term] > 0
+        ]
+
+    return topic_result(filtered_df, topics, topic_words)
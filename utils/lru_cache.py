@@ -0,0 +1,91 @@
+import threading
+from collections import OrderedDict
+from concurrent.futures import CancelledError, Future
+
+
+class LRUCache:
+    """
+    Thread-safe memoization of expensive results with least-recently-used eviction.
+
+    Concurrent requests for a key that is being computed wait for that computation
+    instead of starting their own. Computations that raise are not cached, and neither
+    are results rejected by the cacheable predicate (e.g. failures reported as a status).
+    """
+
+    def __init__(self, maxsize: int, cacheable=None):
+        self.maxsize = maxsize
+        self.cacheable = cacheable
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._in_flight = {}
+        self._lock = threading.Lock()
+
+    def get_or_compute(self, key, compute):
+        """
+        Return the cached result for a key, computing it with compute() on a miss.
+
+        Args:
+            key: A hashable key identifying the result.
+            compute (callable): Function without arguments returning the result.
+
+        Returns:
+            The cached or computed result. Callers waiting for a computation get its
+            result even when it is not cached, and its exception when it raises; if
+            the computing caller is interrupted (e.g. KeyboardInterrupt or SystemExit),
+            one of them computes the result instead.
+        """
+        while True:
+            with self._lock:
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return self._entries[key]
+                future = self._in_flight.get(key)
+                owner = future is None
+                if owner:
+                    future = self._in_flight[key] = Future()
+                    self.misses += 1
+                else:
+                    self.hits += 1
+            if owner:
+                break
+            try:
+                return future.result()
+            except CancelledError:
+                # The computing caller was interrupted; take over the computation
+                continue
+
+        try:
+            result = compute()
+        except BaseException as e:
+            with self._lock:
+                del self._in_flight[key]
+            if isinstance(e, Exception):
+                future.set_exception(e)
+            else:
+                future.cancel()
+            raise
+
+        with self._lock:
+            if self.cacheable is None or self.cacheable(result):
+                self._entries[key] = result
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+            del self._in_flight[key]
+        future.set_result(result)
+        return result
+
+    def get(self, key, default=None):
+        """Return the cached result for a key, without computing or waiting for it."""
+        with self._lock:
+            if key not in self._entries:
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return self._entries[key]
+
+    def clear(self):
+        """Drop every cached result."""
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,200 @@
+import numpy as np
+import pandas as pd
+
+# Outcomes of topic modelling a selection of tenders
+TOPICS_OK = "ok"
+TOPICS_TOO_FEW = "too_few"
+TOPICS_FAILED = "failed"
+TOPICS_BUSY = "busy"
+
+# Minimum number of unique tender descriptions required for topic modelling
+MIN_UNIQUE_DESCRIPTIONS = 2
+
+# Columns the sample of a budgeted fit is stratified by, besides the awarded year
+SAMPLE_STRATA_COLUMNS = ["GOODS", "SERVICE", "CONSTRUCTION"]
+# Smallest number of tenders a budgeted fit is allowed to sample
+MIN_SAMPLE_SIZE = 500
+# BERTopic's default minimum topic size, and the share of a sample a topic must hold
+# at least, so the number of topics stays bounded as samples grow
+DEFAULT_MIN_TOPIC_SIZE = 10
+MIN_TOPIC_SHARE = 0.005
+
+
+def awarded_years(df: pd.DataFrame) -> pd.Series:
+    """Extract the awarded year of each tender; unparseable dates give NaN."""
+    return pd.to_datetime(df["AWARDED_DATE"], errors="coerce").dt.year
+
+
+def document_budget(seconds_left: float, seconds_per_document: float) -> int:
+    """
+    Return the number of tenders a fit can take in the seconds left of a latency
+    target, from an estimate of the fit time per tender.
+    """
+    return max(MIN_SAMPLE_SIZE, int(max(seconds_left, 0) / seconds_per_document))
+
+
+def stratified_sample(filtered_df: pd.DataFrame, size: int) -> np.ndarray:
+    """
+    Draw a sample of tenders stratified by awarded year and category flags, with every
+    stratum represented in proportion to its size and by at least one tender.
+
+    Args:
+        filtered_df (pd.DataFrame): The selected tenders.
+        size (int): The target sample size.
+
+    Returns:
+        np.ndarray: The sorted positions of the sampled tenders in filtered_df.
+    """
+    strata = [awarded_years(filtered_df).fillna(-1)] + [
+        filtered_df[column] for column in SAMPLE_STRATA_COLUMNS
+    ]
+    random_keys = pd.Series(
+        np.random.default_rng(0).random(len(filtered_df)), index=filtered_df.index
+    )
+    grouped = random_keys.groupby(strata)
+    # Each stratum keeps its tenders with the smallest random keys, up to its quota
+    quotas = np.maximum(
+        1, np.round(grouped.transform("size") * size / len(filtered_df))
+    )
+    ranks = grouped.rank(method="first")
+    return np.flatnonzero((ranks <= quotas).to_numpy())
+
+
+def fit_topics(
+    filtered_df: pd.DataFrame,
+    embedding_model=None,
+    embeddings=None,
+    reduced_embeddings=None,
+    max_documents: int = None,
+) -> dict:
+    """
+    Fit a BERTopic model on the tender descriptions of a selection and collect
+    everything the topic visualizations need from it.
+
+    A new BERTopic instance is created for every call, so fits never share state.
+
+    Args:
+        filtered_df (pd.DataFrame): The selected tenders.
+        embedding_model: Sentence embedding model passed to BERTopic. Reusing one
+            instance avoids reloading it for every fit; BERTopic's default is used
+            when None.
+        embeddings (np.ndarray): Precomputed embeddings of the descriptions, one row
+            per tender. The descriptions are encoded by the fit when None.
+        reduced_embeddings (np.ndarray): Precomputed UMAP-reduced embeddings, one row
+            per tender. When given, the fit skips dimensionality reduction and
+            clusters them directly; embeddings is then ignored.
+        max_documents (int): Budget of tenders the model is fitted on. Larger
+            selections are fitted on a stratified sample of that size, with a
+            minimum topic size scaled to the sample, and the remaining tenders are
+            assigned to the fitted topics afterwards. No limit when None.
+
+    Returns:
+        dict: 'status' (TOPICS_OK, TOPICS_TOO_FEW or TOPICS_FAILED) and, when the
+            fit succeeded, 'topics' (the topic of each tender, indexed like
+            filtered_df), 'keywords' (the (word, score) pairs of each topic, in order
+            of first appearance) and 'year_counts' (tenders per awarded year and
+            topic, with years as rows and topics as columns). A fit on a sample also
+            reports its 'sample_size'.
+    """
+    unique_descriptions = filtered_df["TENDER_DESCRIPTION"].dropna().unique()
+    if len(unique_descriptions) < MIN_UNIQUE_DESCRIPTIONS:
+        return {"status": TOPICS_TOO_FEW}
+
+    descriptions = filtered_df["TENDER_DESCRIPTION"].to_numpy()
+    if max_documents is not None and len(filtered_df) > max_documents:
+        sample = stratified_sample(filtered_df, max_documents)
+    else:
+        sample = np.arange(len(filtered_df))
+
+    try:
+        # BERTopic pulls in torch and the embedding models, so it is only imported by
+        # the processes that fit topics
+        from bertopic import BERTopic
+        from bertopic.dimensionality import BaseDimensionalityReduction
+
+        options = {}
+        if embedding_model is not None:
+            options["embedding_model"] = embedding_model
+        if reduced_embeddings is not None:
+            # An identity reduction, so HDBSCAN clusters the given vectors as they are
+            options["umap_model"] = BaseDimensionalityReduction()
+            embeddings = reduced_embeddings
+        if len(sample) < len(filtered_df):
+            options["min_topic_size"] = max(
+                DEFAULT_MIN_TOPIC_SIZE, int(len(sample) * MIN_TOPIC_SHARE)
+            )
+        topic_model = BERTopic(**options)
+
+        topics = np.empty(len(filtered_df), dtype=int)
+        topics[sample], _ = topic_model.fit_transform(
+            list(descriptions[sample]),
+            embeddings=None if embeddings is None else embeddings[sample],
+        )
+        rest = np.setdiff1d(np.arange(len(filtered_df)), sample)
+        if len(rest):
+            # Assign the tenders left out of the sample to the fitted topics
+            topics[rest], _ = topic_model.transform(
+                list(descriptions[rest]),
+                embeddings=None if embeddings is None else embeddings[rest],
+            )
+    except Exception as e:
+        print(f"Topic modelling failed for {len(filtered_df)} tenders: {e}")
+        return {"status": TOPICS_FAILED}
+
+    # get_topic returns False for a topic without representation
+    result = topic_result(
+        filtered_df, topics, lambda topic_num: topic_model.get_topic(topic_num) or []
+    )
+    if len(sample) < len(filtered_df):
+        result["sample_size"] = len(sample)
+    return result
+
+
+def topic_result(filtered_df: pd.DataFrame, topics, topic_words) -> dict:
+    """
+    Assemble the result of a successful topic model fit on a selection.
+
+    Args:
+        filtered_df (pd.DataFrame): The selected tenders.
+        topics (Iterable[int]): The topic of each selected tender, in order.
+        topic_words (callable): Returns the (word, score) pairs of a topic.
+
+    Returns:
+        dict: The result described in fit_topics.
+    """
+    topics = pd.Series(topics, index=filtered_df.index, name="TOPIC")
+    keywords = {}
+    for topic_num in topics.unique():
+        keywords[int(topic_num)] = list(topic_words(topic_num))
+
+    year_counts = (
+        pd.DataFrame({"AWARDED_YEAR": awarded_years(filtered_df), "TOPIC": topics})
+        .groupby(["AWARDED_YEAR", "TOPIC"])
+        .size()
+        .unstack(fill_value=0)
+    )
+    return {
+        "status": TOPICS_OK,
+        "topics": topics,
+        "keywords": keywords,
+        "year_counts": year_counts,
+    }
+
+
+def topic_word_cloud_text(topic_result: dict) -> str:
+    """Join the keywords of every topic of a result into the topic word cloud text."""
+    return " ".join(
+        word
+        for topic_words in topic_result["keywords"].values()
+        for word, _ in topic_words
+    )
+
+
+def topic_keyword_labels(topic_result: dict) -> dict:
+    """Label each topic of the timeline with its comma-separated keywords."""
+    return {
+        topic_num: ", ".join(
+            word for word, _ in topic_result["keywords"].get(topic_num, [])
+        )
+        for topic_num in topic_result["year_counts"].columns
+    }
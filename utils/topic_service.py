@@ -0,0 +1,484 @@
+import os
+import queue
+import signal
+import threading
+import time
+from concurrent.futures import CancelledError, Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing.managers import BaseManager
+
+import pandas as pd
+
+from utils.constants import (
+    BACKGROUND_CALLBACKS_DIR,
+    EMBEDDING_MODEL_NAME,
+    TOPIC_FIT_SECONDS_PER_DOCUMENT,
+    TOPIC_LATENCY_OVERHEAD,
+    TOPIC_LATENCY_TARGET,
+    TOPIC_REQUEST_LEASE,
+)
+from utils.embedding_store import EmbeddingStore, ReducedEmbeddings
+from utils.topic_model import TOPICS_OK, document_budget, fit_topics
+
+# Columns of the selected tenders sent to the worker processes
+TOPIC_COLUMNS = [
+    "TENDER_DESCRIPTION",
+    "AWARDED_DATE",
+    "GOODS",
+    "SERVICE",
+    "CONSTRUCTION",
+]
+
+# Weight of the latest fit in the running estimate of the fit time per tender
+FIT_TIME_SMOOTHING = 0.3
+# Seconds between checks of whether the caller waiting for a fit still wants it
+CANCEL_POLL_INTERVAL = 0.5
+
+# Embedding model, embedding store and reduced embeddings of the current worker
+# process, loaded once by _load_worker_model
+_worker_embedding_model = None
+_worker_embedding_store = None
+_worker_reduced_embeddings = None
+# Fit time estimate of the current worker process, opened on its first budgeted fit
+_worker_fit_times = None
+
+
+class TopicServiceBusy(Exception):
+    """Raised when no queue slot frees up for a topic modelling job in time."""
+
+
+def load_embedding_model(model_name: str = EMBEDDING_MODEL_NAME):
+    """
+    Load a sentence embedding model to be shared by the fits of a process.
+
+    Returns:
+        The embedding model, or None (BERTopic then loads its default model per fit)
+        when sentence-transformers is not installed.
+    """
+    try:
+        from sentence_transformers import SentenceTransformer
+    except ImportError:
+        return None
+    return SentenceTransformer(model_name)
+
+
+class FitTimeEstimate:
+    """
+    Running estimate of the wall time of a BERTopic fit per fitted tender, kept in a
+    disk cache so every process fitting topics for the dashboard updates and reads
+    the same estimate, and it survives restarts.
+    """
+
+    KEY = "topic-fit-seconds-per-document"
+
+    def __init__(self, cache):
+        self.cache = cache
+
+    def seconds_per_document(self) -> float:
+        """Return the current estimate, or the initial one before any fit."""
+        return self.cache.get(self.KEY, TOPIC_FIT_SECONDS_PER_DOCUMENT)
+
+    def record(self, fitted_documents: int, seconds: float):
+        """Fold a finished fit into the estimate; the first fit replaces the initial one."""
+        observed = seconds / fitted_documents
+        with self.cache.transact():
+            current = self.cache.get(self.KEY)
+            if current is not None:
+                observed = (
+                    1 - FIT_TIME_SMOOTHING
+                ) * current + FIT_TIME_SMOOTHING * observed
+            self.cache.set(self.KEY, observed)
+
+
+def _load_worker_model(model_name: str):
+    """Initialize a worker process with its own embedding model and embedding store."""
+    global _worker_embedding_model, _worker_embedding_store, _worker_reduced_embeddings
+    _worker_embedding_model = load_embedding_model(model_name)
+    _worker_embedding_store = EmbeddingStore(model_name)
+    _worker_reduced_embeddings = ReducedEmbeddings(_worker_embedding_store)
+
+
+def _stored_vectors(vectors, descriptions: pd.Series):
+    """
+    Look up the stored vectors of descriptions in an EmbeddingStore or
+    ReducedEmbeddings, re-reading the store once in case a build added them after the
+    worker started.
+
+    Returns:
+        np.ndarray | None: The vectors, or None when some are not stored.
+    """
+    try:
+        return vectors.get(descriptions)
+    except KeyError:
+        _worker_embedding_store.reload()
+        vectors.reload()
+    try:
+        return vectors.get(descriptions)
+    except KeyError:
+        return None
+
+
+def _fit_job(
+    filtered_df: pd.DataFrame, latency_target: float = None, submitted_at: float = None
+) -> dict:
+    """
+    Fit the topics of one selection in a worker process, on its stored reduced
+    embeddings when available and on its stored embeddings otherwise. With a latency
+    target, large selections are fitted on a sample sized to the time left of the
+    target since the job was submitted (time.time()), which includes waiting in the
+    queue, loading the worker's model and stores, and looking up the embeddings.
+    """
+    global _worker_fit_times
+    descriptions = filtered_df["TENDER_DESCRIPTION"]
+    reduced_embeddings = _stored_vectors(_worker_reduced_embeddings, descriptions)
+    embeddings = None
+    if reduced_embeddings is None:
+        embeddings = _stored_vectors(_worker_embedding_store, descriptions)
+    if latency_target is None:
+        return fit_topics(
+            filtered_df, _worker_embedding_model, embeddings, reduced_embeddings
+        )
+
+    if _worker_fit_times is None:
+        import diskcache
+
+        _worker_fit_times = FitTimeEstimate(diskcache.Cache(BACKGROUND_CALLBACKS_DIR))
+    max_documents = document_budget(
+        latency_target - (time.time() - submitted_at),
+        _worker_fit_times.seconds_per_document(),
+    )
+    start = time.perf_counter()
+    result = fit_topics(
+        filtered_df,
+        _worker_embedding_model,
+        embeddings,
+        reduced_embeddings,
+        max_documents,
+    )
+    if result["status"] == TOPICS_OK:
+        _worker_fit_times.record(
+            result.get("sample_size", len(filtered_df)), time.perf_counter() - start
+        )
+    return result
+
+
+class TopicService:
+    """
+    Runs topic modelling jobs on a bounded pool of worker processes.
+
+    Every job fits its own BERTopic instance in a worker process, so concurrent
+    selections never share model state, and throughput scales with the number of
+    workers. At most max_pending jobs are queued or running; further submissions
+    wait for a slot (back-pressure) and give up with TopicServiceBusy after timeout
+    seconds. With a latency target (seconds), large selections are fitted on a sample
+    (see utils.topic_model.fit_topics). Each worker process runs one job at a time
+    from a shared queue, so a cancelled job that is already running is stopped by
+    replacing the process running it, without disturbing the other jobs.
+    """
+
+    def __init__(
+        self,
+        workers: int = None,
+        max_pending: int = None,
+        embedding_model_name: str = EMBEDDING_MODEL_NAME,
+        latency_target: float = None,
+    ):
+        self.workers = workers or os.cpu_count() or 1
+        self.latency_target = latency_target
+        self.max_pending = max_pending or 2 * self.workers
+        self.embedding_model_name = embedding_model_name
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._jobs = queue.SimpleQueue()
+        # Process ID of the worker running each running job, and the running jobs
+        # cancelled since they started
+        self._running = {}
+        self._cancelled = set()
+        self._lock = threading.Lock()
+        self._threads = [
+            threading.Thread(target=self._run_worker, daemon=True)
+            for _ in range(self.workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def _start_worker(self) -> tuple:
+        """Start a worker process with its model loaded; return it and its process ID."""
+        executor = ProcessPoolExecutor(
+            max_workers=1,
+            initializer=_load_worker_model,
+            initargs=(self.embedding_model_name,),
+        )
+        try:
+            return executor, executor.submit(os.getpid).result()
+        except BaseException:
+            executor.shutdown(wait=False)
+            raise
+
+    def _run_worker(self):
+        """
+        Run queued jobs one after another on one worker process until shutdown,
+        replacing the process after a job running on it was cancelled or it died.
+        """
+        executor = pid = start_error = None
+        while True:
+            if executor is None:
+                try:
+                    executor, pid = self._start_worker()
+                except Exception as e:
+                    # Fail the next job, and try again after it
+                    start_error = e
+            job = self._jobs.get()
+            if job is None:
+                break
+            future, args = job
+            with self._lock:
+                if not future.set_running_or_notify_cancel():
+                    continue
+                if executor is not None:
+                    self._running[future] = pid
+            if executor is None:
+                future.set_exception(start_error)
+                continue
+
+            result, error = None, None
+            try:
+                result = executor.submit(_fit_job, *args).result()
+            except Exception as e:
+                error = e
+            with self._lock:
+                del self._running[future]
+                cancelled = future in self._cancelled
+                self._cancelled.discard(future)
+
+            if cancelled:
+                future.set_exception(CancelledError())
+            elif error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+            if cancelled or isinstance(error, BrokenProcessPool):
+                executor.shutdown(wait=False)
+                executor = None
+        if executor is not None:
+            executor.shutdown()
+
+    def submit(self, filtered_df: pd.DataFrame, timeout: float = None) -> Future:
+        """
+        Queue the topic modelling of a selection.
+
+        Args:
+            filtered_df (pd.DataFrame): The selected tenders.
+            timeout (float): Seconds to wait for a queue slot; waits indefinitely when
+                None.
+
+        Returns:
+            Future: Resolves to the result of utils.topic_model.fit_topics, or raises
+                CancelledError once the job is cancelled (see cancel).
+        """
+        # The latency budget of the job runs from here, including the wait for a slot
+        submitted_at = time.time()
+        if not self._slots.acquire(timeout=timeout):
+            raise TopicServiceBusy(
+                f"{self.max_pending} topic modelling jobs are already queued."
+            )
+        future = Future()
+        future.add_done_callback(lambda _: self._slots.release())
+        self._jobs.put(
+            (future, (filtered_df[TOPIC_COLUMNS], self.latency_target, submitted_at))
+        )
+        return future
+
+    def cancel(self, future: Future):
+        """
+        Cancel a job: a queued job is dropped, and the worker process running a
+        running job is killed and replaced. Either way the job's queue slot is freed
+        and the future raises CancelledError; finished jobs are left as they are.
+        """
+        with self._lock:
+            if future.cancel():
+                return
+            pid = self._running.get(future)
+            if pid is None or future in self._cancelled:
+                return
+            self._cancelled.add(future)
+            os.kill(pid, signal.SIGTERM)
+
+    def fit(
+        self, filtered_df: pd.DataFrame, timeout: float = None, cancelled=None
+    ) -> dict:
+        """
+        Queue the topic modelling of a selection and wait for its result.
+
+        Args:
+            filtered_df (pd.DataFrame): The selected tenders.
+            timeout (float): Seconds to wait for a queue slot (see submit).
+            cancelled (callable): Checked every CANCEL_POLL_INTERVAL seconds while the
+                job is queued or running; once it returns True, the job is cancelled
+                and CancelledError is raised.
+
+        Returns:
+            dict: The result of utils.topic_model.fit_topics.
+        """
+        future = self.submit(filtered_df, timeout)
+        while cancelled is not None:
+            try:
+                return future.result(timeout=CANCEL_POLL_INTERVAL)
+            except TimeoutError:
+                if cancelled():
+                    self.cancel(future)
+                    break
+        return future.result()
+
+    def shutdown(self):
+        """Stop the worker processes once the queued jobs are done."""
+        for _ in self._threads:
+            self._jobs.put(None)
+        for thread in self._threads:
+            thread.join()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.shutdown()
+
+
+_service = None
+_service_lock = threading.Lock()
+
+
+def get_topic_service() -> TopicService:
+    """Return the topic service of the web process, starting it on first use."""
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = TopicService(
+                latency_target=TOPIC_LATENCY_TARGET - TOPIC_LATENCY_OVERHEAD
+            )
+        return _service
+
+
+class TopicResultsManager(BaseManager):
+    """
+    Connects the background callback jobs of the dashboard to the topic results of
+    the web process, over a local socket authenticated with a per-process key.
+    """
+
+
+class _TopicRequests:
+    """
+    The topic result requests of the background callback jobs, as served by the web
+    process. Jobs poll for the result of a selection; the polls of one selection share
+    a single lookup or fit on a thread of the web process, which is cancelled (see
+    TopicService.fit) once no job has polled it for TOPIC_REQUEST_LEASE seconds, e.g.
+    because the jobs were cancelled or killed.
+    """
+
+    # Seconds a poll waits for the result before returning, so jobs poll well within
+    # their lease
+    POLL_TIMEOUT = TOPIC_REQUEST_LEASE / 3
+
+    def __init__(self, topic_result):
+        self.topic_result = topic_result
+        # The result future and the time of the last poll of each selection requested
+        self._requests = {}
+        self._lock = threading.Lock()
+
+    def _abandoned(self, args: tuple, request: dict) -> bool:
+        """Check whether no job polled a request within its lease, and drop it if so."""
+        with self._lock:
+            if time.monotonic() - request["polled"] <= TOPIC_REQUEST_LEASE:
+                return False
+            if self._requests.get(args) is request:
+                del self._requests[args]
+            return True
+
+    def _compute(self, args: tuple, request: dict):
+        try:
+            result = self.topic_result(
+                *args, cancelled=lambda: self._abandoned(args, request)
+            )
+        except Exception as e:
+            request["future"].set_exception(e)
+        else:
+            request["future"].set_result(result)
+        finally:
+            with self._lock:
+                if self._requests.get(args) is request:
+                    del self._requests[args]
+
+    def poll(self, *args) -> tuple:
+        """
+        Request the topic result of a selection, renewing the lease of the request.
+
+        Returns:
+            tuple: (True, the result) once it is ready, or (False, None) when it is
+                still being computed after POLL_TIMEOUT seconds.
+        """
+        with self._lock:
+            request = self._requests.get(args)
+            if request is None:
+                request = self._requests[args] = {"future": Future()}
+                threading.Thread(
+                    target=self._compute, args=(args, request), daemon=True
+                ).start()
+            request["polled"] = time.monotonic()
+        try:
+            return True, request["future"].result(timeout=self.POLL_TIMEOUT)
+        except TimeoutError:
+            return False, None
+
+
+# Address and key of the topic results served by the web process; background callback
+# jobs are forked from it and inherit both
+_results_address = None
+_results_authkey = None
+_results_lock = threading.Lock()
+
+
+def serve_topic_results(topic_result):
+    """
+    Serve the topic results of the web process to its background callback jobs, so
+    the fits they wait for run on the web process's long-lived worker pool and land in
+    its result cache. Called once in the web process before any job starts.
+
+    Args:
+        topic_result (callable): Returns the topic result of a selection; called with
+            the scope, name and sorted category filters jobs pass to
+            request_topic_result, and a cancelled callable to pass on to
+            TopicService.fit.
+    """
+    global _results_address, _results_authkey
+    with _results_lock:
+        if _results_address is not None:
+            return
+        _results_authkey = os.urandom(32)
+        # One object serves every job, so the proxies of killed jobs hold on to nothing
+        requests = _TopicRequests(topic_result)
+        TopicResultsManager.register("TopicRequests", callable=lambda: requests)
+        server = TopicResultsManager(
+            address=("127.0.0.1", 0), authkey=_results_authkey
+        ).get_server()
+        _results_address = server.address
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+
+def request_topic_result(scope: str, name: str, selected_filters) -> dict:
+    """
+    Request a topic result from the web process inside a background callback job,
+    waiting for it to be fitted when it has to be (see serve_topic_results). The job
+    polls the request while it waits, so a cancelled job's fit is cancelled too.
+    """
+    if _results_address is None:
+        raise RuntimeError("The topic results of the web process are not served.")
+    manager = TopicResultsManager(address=_results_address, authkey=_results_authkey)
+    manager.connect()
+    requests = manager.TopicRequests()
+    try:
+        while True:
+            done, result = requests.poll(scope, name, tuple(sorted(selected_filters)))
+            if done:
+                return result
+    finally:
+        # Release the proxy's reference to the served object right away
+        del requests
@@ -0,0 +1,128 @@
+import plotly.express as px
+import plotly.graph_objects as go
+import pandas as pd
+
+
+def create_awarded_amount_line_chart(data: pd.DataFrame, color: str) -> px.line:
+    """
+    Creates a line chart of awarded amounts over the awarded years, one line per entity
+    or cluster.
+
+    Parameters:
+        data (pd.DataFrame): DataFrame with 'AWARDED_DATE' (the awarded year),
+                             'AWARDED_AMOUNT' and the color column.
+        color (str): Column name drawn as one line per value (e.g., 'ENTITY' or
+                     'ENTITY_CLUSTER_NAME').
+
+    Returns:
+        px.line: A Plotly line chart.
+    """
+    # Validate input DataFrame
+    if color not in data.columns:
+        raise ValueError(f"Column '{color}' not found in the DataFrame.")
+
+    return px.line(
+        data,
+        x="AWARDED_DATE",
+        y="AWARDED_AMOUNT",
+        color=color,
+        labels={"AWARDED_DATE": "TENDER DATE", "AWARDED_AMOUNT": "TENDER AMOUNT"},
+    )
+
+
+def create_entity_year_avg_chart(
+    entity_year_avg: pd.DataFrame, top_entities: list, shown_entities: list = None
+) -> go.Figure:
+    """
+    Creates the line chart of average awarded amounts over the awarded years for many
+    entities. Lines are drawn with WebGL for the top entities and the entities shown on
+    demand only; every other entity is summarized by a band spanning their averages
+    each year, with their median as a dotted line.
+
+    Parameters:
+        entity_year_avg (pd.DataFrame): DataFrame with 'ENTITY', 'AWARDED_DATE' (the
+                                        awarded year) and 'AWARDED_AMOUNT'.
+        top_entities (list): Entities always drawn as lines, in legend order.
+        shown_entities (list): Further entities drawn as lines.
+
+    Returns:
+        go.Figure: A Plotly figure.
+    """
+    # Validate input DataFrame
+    if "ENTITY" not in entity_year_avg.columns:
+        raise ValueError("Column 'ENTITY' not found in the DataFrame.")
+
+    line_entities = list(top_entities) + [
+        entity for entity in shown_entities or [] if entity not in top_entities
+    ]
+    is_line = entity_year_avg["ENTITY"].isin(line_entities)
+
+    fig = go.Figure()
+    others = entity_year_avg[~is_line]
+    if not others.empty:
+        other_count = others["ENTITY"].nunique()
+        band = (
+            others.groupby("AWARDED_DATE")["AWARDED_AMOUNT"]
+            .agg(["min", "median", "max"])
+            .sort_index()
+        )
+        fig.add_trace(
+            go.Scattergl(
+                x=band.index,
+                y=band["max"],
+                mode="lines",
+                line={"width": 0},
+                legendgroup="others",
+                showlegend=False,
+                hoverinfo="skip",
+            )
+        )
+        fig.add_trace(
+            go.Scattergl(
+                x=band.index,
+                y=band["min"],
+                mode="lines",
+                line={"width": 0},
+                fill="tonexty",
+                fillcolor="rgba(128, 128, 128, 0.25)",
+                legendgroup="others",
+                name=f"All other entities ({other_count}): range",
+                hoverinfo="skip",
+            )
+        )
+        fig.add_trace(
+            go.Scattergl(
+                x=band.index,
+                y=band["median"],
+                mode="lines",
+                line={"color": "gray", "dash": "dot"},
+                legendgroup="others",
+                name=f"All other entities ({other_count}): median",
+                hovertemplate="TENDER DATE=%{x}<br>TENDER AMOUNT=%{y}",
+            )
+        )
+
+    entity_rows = dict(
+        list(entity_year_avg[is_line].groupby("ENTITY", observed=True, sort=False))
+    )
+    for entity in line_entities:
+        if entity not in entity_rows:
+            continue
+        rows = entity_rows[entity]
+        fig.add_trace(
+            go.Scattergl(
+                x=rows["AWARDED_DATE"],
+                y=rows["AWARDED_AMOUNT"],
+                mode="lines",
+                name=entity,
+                hovertemplate="TENDER DATE=%{x}<br>TENDER AMOUNT=%{y}",
+            )
+        )
+
+    fig.update_layout(
+        xaxis_title="TENDER DATE",
+        yaxis_title="TENDER AMOUNT",
+        legend_title_text="ENTITY",
+        template="plotly",
+    )
+    return fig
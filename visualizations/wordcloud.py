@@ -4,24 +4,37 @@ import io
 from wordcloud import WordCloud
 
 
-def create_word_cloud(text: str) -> go.Figure:
+def word_cloud_frequencies(text: str) -> dict:
     """
-    Creates a word cloud from the given text and embeds it in a Plotly Figure.
+    Computes the word frequencies a word cloud of the given text is drawn from.
 
     Parameters:
         text (str): The input text used to generate the word cloud.
 
+    Returns:
+        dict: Frequency of each word and collocation kept by WordCloud.
+    """
+    return WordCloud().process_text(text)
+
+
+def create_word_cloud_from_frequencies(frequencies: dict) -> go.Figure:
+    """
+    Creates a word cloud from precomputed word frequencies and embeds it in a Plotly Figure.
+
+    Parameters:
+        frequencies (dict): Word frequencies, as returned by word_cloud_frequencies.
+
     Returns:
         go.Figure: A Plotly figure containing the word cloud image.
     """
     # Validate input
-    if not text.strip():
-        raise ValueError("Input text must not be empty.")
+    if not frequencies:
+        raise ValueError("Input frequencies must not be empty.")
 
     # Generate the word cloud
-    wordcloud = WordCloud(width=800, height=400, background_color="white").generate(
-        text
-    )
+    wordcloud = WordCloud(
+        width=800, height=400, background_color="white"
+    ).generate_from_frequencies(frequencies)
 
     # Encode the image to base64
     img = io.BytesIO()
@@ -55,3 +68,20 @@ def create_word_cloud(text: str) -> go.Figure:
     )
 
     return fig
+
+
+def create_word_cloud(text: str) -> go.Figure:
+    """
+    Creates a word cloud from the given text and embeds it in a Plotly Figure.
+
+    Parameters:
+        text (str): The input text used to generate the word cloud.
+
+    Returns:
+        go.Figure: A Plotly figure containing the word cloud image.
+    """
+    # Validate input
+    if not text.strip():
+        raise ValueError("Input text must not be empty.")
+
+    return create_word_cloud_from_frequencies(word_cloud_frequencies(text))